@@ -0,0 +1,915 @@
+import re
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import numpy.typing as npt
+
+from pcgsepy.common.api_call import block_types
+from pcgsepy.common.vecs import (Orientation, Vec, _compute_rotation_matrix,
+                                 _orientation_from_vec_components,
+                                 get_rotation_matrix, orientation_from_str,
+                                 orientation_from_vec, orientation_pairs)
+from pcgsepy.common.regex_handler import MyMatch, extract_regex
+from pcgsepy.common.symmetry import (is_mirror_symmetric, mirror_symmetries,
+                                     symmetry_score)
+from pcgsepy.config import MAX_DENSE_VOXELS, PL_HIGH, PL_LOW
+from pcgsepy.hullbuilder import HullBuilder, _orientations
+from pcgsepy.lsystem.actions import AtomAction, Rotations, rotation_matrices
+from pcgsepy.lsystem.parser import HLParser, HLtoMLTranslator, LLParser
+from pcgsepy.lsystem.rules import StochasticRules
+from pcgsepy.lsystem.structure_maker import (LLStructureMaker, TileTemplate,
+                                             atoms_re)
+from pcgsepy.setup_utils import get_default_lsystem
+from pcgsepy.structure import (Block, IntersectionException, Structure,
+                               _enclosed_air_mask,
+                               _scatter_blocks)
+
+
+def _loop_air_mask(arr: npt.NDArray[np.uint16]) -> npt.NDArray[np.bool8]:
+    """Reference per-voxel implementation of the internal air mask.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The 3D grid array.
+
+    Returns:
+        npt.NDArray[np.bool8]: The boolean mask of internal air cells.
+    """
+    mask = np.zeros_like(arr, dtype=np.bool8)
+    i1, j1, k1 = arr.shape
+    for (i, j, k) in zip(*np.nonzero(arr == 0)):
+        mask[i, j, k] = np.sum(arr[0:i, j, k]) != 0 and \
+            np.sum(arr[i:i1, j, k]) != 0 and \
+            np.sum(arr[i, 0:j, k]) != 0 and \
+            np.sum(arr[i, j:j1, k]) != 0 and \
+            np.sum(arr[i, j, 0:k]) != 0 and \
+            np.sum(arr[i, j, k:k1]) != 0
+    return mask
+
+
+def _loop_rotate(structure: Structure,
+                 along: int,
+                 k: int) -> None:
+    """Reference per-block implementation of `Structure.rotate`.
+
+    Args:
+        structure (Structure): The structure.
+        along (int): The axis to rotate along (0, 1, 2).
+        k (int): How many times to rotate for in the ccw direction.
+    """
+    rotated_blocks = {}
+    along = along % 3
+    k = k % 4
+    if k > 0:
+        for idx, block in structure._blocks.items():
+            x, y, z = idx
+            if along == 0:
+                if k == 1: p1 = Vec(x=x, y=-z, z=-y)
+                elif k == 2: p1 = Vec(x=x, y=-y, z=z)
+                elif k == 3: p1 = Vec(x=x, y=-z, z=y)
+            elif along == 1:
+                if k == 1: p1 = Vec(x=z, y=y, z=x)
+                elif k == 2: p1 = Vec(x=-x, y=y, z=-z)
+                elif k == 3: p1 = Vec(x=-z, y=y, z=-x)
+            elif along == 2:
+                if k == 1: p1 = Vec(x=y, y=-x, z=z)
+                elif k == 2: p1 = Vec(x=-x, y=-y, z=z)
+                elif k == 3: p1 = Vec(x=-y, y=x, z=z)
+            rotated_blocks[p1.as_tuple()] = block
+        min_x, min_y, min_z = [min(v) for v in zip(*rotated_blocks.keys())]
+        updated_blocks = {}
+        for (x, y, z), block in rotated_blocks.items():
+            new_pos = Vec.v3i(x=x - min_x, y=y - min_y, z=z - min_z)
+            block.position = structure.origin_coords.sum(new_pos)
+            updated_blocks[new_pos.as_tuple()] = block
+        structure._blocks = updated_blocks
+        structure._scaled_arr = None
+        structure._arr = None
+        structure._air_gridmask = None
+
+
+def _loop_outer_neighbours(hull_builder: HullBuilder,
+                           arr: npt.NDArray[np.float32]) -> npt.NDArray[np.float32]:
+    """Reference per-voxel implementation of the neighbours count of the hull blocks.
+
+    Args:
+        hull_builder (HullBuilder): The hull builder, with the hull blocks set.
+        arr (npt.NDArray[np.float32]): The array.
+
+    Returns:
+        npt.NDArray[np.float32]: The number of adjacent hull blocks of each hull block.
+    """
+    n_neighbours = np.zeros_like(arr)
+    for idx, _ in np.ndenumerate(arr):
+        if hull_builder._blocks_set.get(idx, None):
+            for offset in _orientations:
+                pos = Vec.from_tuple(idx).sum(offset.value).as_tuple()
+                if hull_builder._blocks_set.get(pos, None):
+                    n_neighbours[idx] = n_neighbours[idx] + 1
+    return n_neighbours
+
+
+def _loop_hl_expand(parser: HLParser,
+                    string: str) -> str:
+    """Reference per-rule implementation of `HLParser.expand`.
+
+    Args:
+        parser (HLParser): The parser.
+        string (str): The string to expand.
+
+    Returns:
+        str: The expanded string.
+    """
+    matches: List[MyMatch] = []
+    for rule in parser.rules.get_lhs():
+        matches.extend([MyMatch(lhs=rule,
+                                span=match.span(),
+                                lhs_string=match.group()) for match in extract_regex(rule).finditer(string=string)])
+    matches.sort()
+    filtered_matches = [matches[0]]
+    for match in matches:
+        if match.start != filtered_matches[-1].start:
+            filtered_matches.append(match)
+    offset = 0
+    for match in filtered_matches:
+        rhs = parser.rules.get_rhs(lhs=match.lhs)
+        if '(x)' in rhs or '(X)' in rhs or '(Y)' in rhs:
+            n = [m for m in re.compile(r'\d').finditer(match.lhs_string)]
+            n = int(n[0].group()) if n else None
+            rhs = rhs.replace('(x)', f'({n})')
+            rhs_n = np.random.randint(PL_LOW, PL_HIGH)
+            rhs = rhs.replace('(X)', f'({rhs_n})')
+            if n is not None:
+                rhs = rhs.replace('(Y)', f'({max(1, n - rhs_n)})')
+        string = string[:match.start + offset] + rhs + string[match.end + offset:]
+        offset += len(rhs) - len(match.lhs_string)
+    return string
+
+
+def _loop_ll_expand(parser: LLParser,
+                    string: str) -> str:
+    """Reference per-character implementation of `LLParser.expand`.
+
+    Args:
+        parser (LLParser): The parser.
+        string (str): The string to expand.
+
+    Returns:
+        str: The expanded string.
+    """
+    i = 0
+    while i < len(string):
+        for k in reversed(list(parser.rules.lhs_alphabet)):
+            if string[i:].startswith(k):
+                rhs = parser.rules.get_rhs(lhs=k)
+                string = string[:i] + rhs + string[i + len(k):]
+                i += len(rhs) - 1
+                break
+        i += 1
+    return string
+
+
+def _loop_string_as_list(translator: HLtoMLTranslator,
+                         string: str) -> List[Dict[str, Any]]:
+    """Reference per-character implementation of `HLtoMLTranslator._string_as_list`.
+
+    Args:
+        translator (HLtoMLTranslator): The translator.
+        string (str): The high-level string.
+
+    Returns:
+        List[Dict[str, Any]]: The list of atoms (with multiplicity, if tiles).
+    """
+    atoms_list = []
+    i = 0
+    while i < len(string):
+        offset = 0
+        for k in translator.alphabet.keys():
+            if string[i:].startswith(k):
+                offset += len(k)
+                n = None
+                # check if there are parameters (multiplicity)
+                if i + offset < len(string) and string[i + offset] == '(':
+                    params = string[i + offset:
+                                    string.index(')', i + offset + 1) + 1]
+                    offset += len(params)
+                    n = int(params.replace('(', '').replace(')', ''))
+                atoms_list.append({'atom': k})
+                if k in translator.td.keys():
+                    atoms_list[-1]['n'] = n if n is not None else 1
+
+                i += len(k) + (len(f'({n})') if n is not None else 0) - 1
+                break
+        i += 1
+    return atoms_list
+
+
+def synthetic_structure(n_blocks: int,
+                        block_type: str = 'MyObjectBuilder_CubeBlock_LargeBlockArmorBlock',
+                        seed: int = 0) -> Structure:
+    """Create a synthetic structure with blocks at random grid positions.
+
+    Args:
+        n_blocks (int): The (maximum) number of blocks.
+        block_type (str, optional): The type of the blocks. Defaults to `'MyObjectBuilder_CubeBlock_LargeBlockArmorBlock'`.
+        seed (int, optional): The random seed. Defaults to `0`.
+
+    Returns:
+        Structure: The structure.
+    """
+    rng = np.random.default_rng(seed)
+    structure = Structure(origin=Vec.v3f(0., 0., 0.),
+                          orientation_forward=Orientation.FORWARD.value,
+                          orientation_up=Orientation.UP.value)
+    side = int(np.ceil(n_blocks ** (1 / 3))) * 2
+    for idx in rng.integers(low=0, high=side, size=(n_blocks, 3)) * structure.grid_size:
+        structure.add_block(block=Block(block_type=block_type),
+                            grid_position=tuple(idx.tolist()))
+    return structure
+
+
+def synthetic_hull(size: Tuple[int, int, int],
+                   fill: float = 0.05,
+                   seed: int = 0) -> npt.NDArray[np.uint16]:
+    """Create a synthetic hull: a closed box shell with sparse random blocks inside.
+
+    Args:
+        size (Tuple[int, int, int]): The shape of the grid array.
+        fill (float, optional): The fraction of internal cells occupied. Defaults to `0.05`.
+        seed (int, optional): The random seed. Defaults to `0`.
+
+    Returns:
+        npt.NDArray[np.uint16]: The grid array.
+    """
+    rng = np.random.default_rng(seed)
+    arr = np.ones(shape=size, dtype=np.uint16)
+    arr[1:-1, 1:-1, 1:-1] = (rng.random(size=tuple(s - 2 for s in size)) < fill).astype(np.uint16)
+    return arr
+
+
+def synthetic_frame(length: int,
+                    seed: int = 0) -> Structure:
+    """Create a synthetic sparse structure: the edges of a cube made of armor blocks.
+
+    Args:
+        length (int): The number of blocks along each edge.
+        seed (int, optional): The random seed used to shuffle the placement order. Defaults to `0`.
+
+    Returns:
+        Structure: The structure.
+    """
+    structure = Structure(origin=Vec.v3f(0., 0., 0.),
+                          orientation_forward=Orientation.FORWARD.value,
+                          orientation_up=Orientation.UP.value)
+    edges = set()
+    for i in range(length):
+        for a, b in [(0, 0), (0, length - 1), (length - 1, 0), (length - 1, length - 1)]:
+            edges.update([(i, a, b), (a, i, b), (a, b, i)])
+    edges = np.asarray(sorted(edges)) * structure.grid_size
+    for idx in np.random.default_rng(seed).permutation(edges):
+        structure.add_block(block=Block(block_type='MyObjectBuilder_CubeBlock_LargeBlockArmorBlock'),
+                            grid_position=tuple(idx.tolist()))
+    return structure
+
+
+def _loop_fill_structure(structure: Structure,
+                         string: str,
+                         atoms_alphabet: Dict[str, Dict[str, object]]) -> Structure:
+    """Reference per-atom dispatch implementation of `LLStructureMaker.fill_structure`.
+
+    Args:
+        structure (Structure): The structure to fill.
+        string (str): The low-level string.
+        atoms_alphabet (Dict[str, Dict[str, object]]): The atoms alphabet.
+
+    Returns:
+        Structure: The filled structure.
+    """
+    position, position_history, rotations = Vec.v3i(0, 0, 0), [], []
+
+    def apply_rotation(v: Vec) -> Vec:
+        arr = v.as_array()
+        for rot in reversed(rotations):
+            arr = rot.dot(arr)
+        return Vec.from_np(arr)
+
+    for g1, g2, _, g4, g5 in [match.groups() for match in atoms_re.finditer(string=string)]:
+        atom, params = (g1 or g2, '') if g1 is not None or g2 is not None else (g4, g5)
+        params = params.replace('(', '').replace(')', '').split(',')
+        action, args = atoms_alphabet[atom]['action'], atoms_alphabet[atom]['args']
+        if action == AtomAction.PLACE:
+            orientation_forward, orientation_up = orientation_from_str[params[0]], orientation_from_str[params[1]]
+            if rotations:
+                orientation_forward = orientation_from_vec(apply_rotation(orientation_forward.value))
+                orientation_up = orientation_from_vec(apply_rotation(orientation_up.value))
+            structure.add_block(block=Block(block_type=args[0],
+                                            orientation_forward=orientation_forward,
+                                            orientation_up=orientation_up),
+                                grid_position=position.as_tuple())
+        elif action == AtomAction.MOVE:
+            dpos = apply_rotation(args.value) if rotations else args.value
+            for _ in range(int(params[0])):
+                position = position.sum(dpos)
+        elif action == AtomAction.ROTATE:
+            rotations.append(rotation_matrices[args])
+        elif action == AtomAction.PUSH:
+            position_history.append(position)
+        elif action == AtomAction.POP:
+            position = position_history.pop(-1)
+            if rotations:
+                rotations.pop(-1)
+    structure.sanify()
+    return structure
+
+
+def _loop_symmetry_score(arr: npt.NDArray[np.uint16],
+                         midpoint: Tuple[int, int, int]) -> float:
+    """Reference implementation of the `symmetry` behavior, copying the flipped sides in new arrays.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The grid array.
+        midpoint (Tuple[int, int, int]): The midpoint.
+
+    Returns:
+        float: The symmetry.
+    """
+    mx, _, mz = midpoint
+    x_shape = max(mx, arr.shape[0] - mx)
+    upper = np.zeros((x_shape, arr.shape[1], arr.shape[2]))
+    lower = np.zeros((x_shape, arr.shape[1], arr.shape[2]))
+    upper[np.nonzero(np.flip(arr[mx:, :, :], 1))] = np.flip(arr[mx:, :, :], 1)[np.nonzero(np.flip(arr[mx:, :, :], 1))]
+    lower[np.nonzero(arr[:mx - 1, :, :])] = arr[np.nonzero(arr[:mx - 1, :, :])]
+    err_x = abs(np.sum(upper - lower))
+    z_shape = max(mz, arr.shape[2] - mz)
+    upper = np.zeros((arr.shape[0], arr.shape[1], z_shape))
+    lower = np.zeros((arr.shape[0], arr.shape[1], z_shape))
+    upper[np.nonzero(np.flip(arr[:, :, mz:], 2))] = np.flip(arr[:, :, mz:], 2)[np.nonzero(np.flip(arr[:, :, mz:], 2))]
+    lower[np.nonzero(arr[:, :, :mz - 1])] = arr[np.nonzero(arr[:, :, :mz - 1])]
+    err_z = abs(np.sum(upper - lower))
+    return 1 - (min(err_x, err_z) / np.sum(arr))
+
+
+def _time(f: Callable[[], object],
+          repeats: int) -> float:
+    """Get the best wall time of a function call.
+
+    Args:
+        f (Callable[[], object]): The function to time.
+        repeats (int): The number of repetitions.
+
+    Returns:
+        float: The best time, in seconds.
+    """
+    return min(timeit.repeat(f, number=1, repeat=repeats))
+
+
+def benchmark_air_blocks_gridmask(sizes: List[Tuple[int, int, int]] = [(10, 10, 20), (20, 20, 40), (30, 30, 60)],
+                                  repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the vectorized internal air mask against the per-voxel loop on synthetic hulls.
+
+    Args:
+        sizes (List[Tuple[int, int, int]], optional): The hull sizes to test. Defaults to `[(10, 10, 20), (20, 20, 40), (30, 30, 60)]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each size.
+    """
+    results = []
+    for size in sizes:
+        arr = synthetic_hull(size=size)
+        assert np.array_equal(_loop_air_mask(arr=arr), _enclosed_air_mask(arr=arr)), f'Air masks differ for size {size}'
+        t_loop = _time(lambda: _loop_air_mask(arr=arr), repeats=repeats)
+        t_vec = _time(lambda: _enclosed_air_mask(arr=arr), repeats=repeats)
+        results.append({'size': size, 'loop': t_loop, 'vectorized': t_vec, 'speedup': t_loop / t_vec})
+    return results
+
+
+def benchmark_rotate(sizes: List[int] = [1000, 5000, 20000],
+                     repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the vectorized `Structure.rotate` against the per-block loop on synthetic structures.
+
+    Args:
+        sizes (List[int], optional): The number of blocks to test. Defaults to `[1000, 5000, 20000]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds, also with the compact storage) and speedup for each size.
+    """
+    results = []
+    for size in sizes:
+        for along in range(3):
+            for k in range(1, 4):
+                s1, s2 = synthetic_structure(n_blocks=size), synthetic_structure(n_blocks=size)
+                s1.rotate(along=along, k=k)
+                _loop_rotate(structure=s2, along=along, k=k)
+                assert list(s1._blocks.keys()) == list(s2._blocks.keys()), f'Rotations differ for {along=}, {k=}'
+                assert all(b1.position == b2.position for b1, b2 in zip(s1._blocks.values(), s2._blocks.values())), f'Positions differ for {along=}, {k=}'
+        structure = synthetic_structure(n_blocks=size)
+        t_loop = _time(lambda: _loop_rotate(structure=structure, along=1, k=3), repeats=repeats)
+        t_vec = _time(lambda: structure.rotate(along=1, k=3), repeats=repeats)
+        structure.compact()
+        t_compact = _time(lambda: structure.rotate(along=1, k=3), repeats=repeats)
+        results.append({'size': size, 'loop': t_loop, 'vectorized': t_vec, 'compact': t_compact, 'speedup': t_loop / t_vec})
+    return results
+
+
+def benchmark_sparse_array(lengths: List[int] = [20, 60, 200],
+                           repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the memory used by the dense and the sparse `Structure.as_array` on synthetic frames.
+
+    Args:
+        lengths (List[int], optional): The number of blocks along each edge of the frames. Defaults to `[20, 60, 200]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The number of bytes of both arrays and the time to build the sparse one for each length.
+    """
+    results = []
+    for length in lengths:
+        structure = synthetic_frame(length=length)
+        positions, type_ids = structure._blocks_arrays()
+        shape = tuple(positions.max(axis=0) + structure.grid_size)
+        sizes, values = block_types.scaled_size[type_ids], (type_ids + 1).astype(np.uint16)
+        sparse, _ = _scatter_blocks(shape=shape, positions=positions, sizes=sizes, values=values, sparse=True)
+        if np.prod(shape) <= MAX_DENSE_VOXELS:
+            dense, _ = _scatter_blocks(shape=shape, positions=positions, sizes=sizes, values=values)
+            assert np.array_equal(np.asarray(sparse), dense), f'Arrays differ for {length=}'
+        t_sparse = _time(lambda: _scatter_blocks(shape=shape, positions=positions, sizes=sizes, values=values, sparse=True), repeats=repeats)
+        results.append({'length': length, 'dense_bytes': int(np.prod(shape)) * np.dtype(np.uint16).itemsize,
+                        'sparse_bytes': sparse.nbytes, 'sparse_time': t_sparse})
+    return results
+
+
+def benchmark_incremental_arrays(sizes: List[int] = [1000, 5000, 10000],
+                                 n_added: int = 500,
+                                 repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare updating the cached arrays of synthetic structures when adding blocks against rebuilding them.
+    Blocks are added in empty cells within the bounding box, followed by a `sanify` call, as done by the hull builder.
+
+    Args:
+        sizes (List[int], optional): The number of blocks to test. Defaults to `[1000, 5000, 10000]`.
+        n_added (int, optional): The number of blocks added. Defaults to `500`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each size.
+    """
+    def add_and_access(structure: Structure,
+                       positions: List[Tuple[int, int, int]],
+                       rebuild: bool) -> None:
+        _ = structure.as_array, structure.as_grid_array, structure.air_blocks_gridmask
+        for position in positions:
+            structure.add_block(block=Block(block_type='MyObjectBuilder_CubeBlock_LargeBlockArmorBlock'),
+                                grid_position=position)
+        structure.sanify()
+        if rebuild:
+            structure._scaled_arr, structure._arr, structure._air_gridmask = None, None, None
+        _ = structure.as_array, structure.as_grid_array, structure.air_blocks_gridmask
+
+    results = []
+    for size in sizes:
+        structure = synthetic_structure(n_blocks=size)
+        empty = np.argwhere(structure.as_grid_array == 0) * structure.grid_size
+        positions = [tuple(p) for p in np.random.default_rng(0).permutation(empty)[:n_added].tolist()]
+        s1, s2 = synthetic_structure(n_blocks=size), synthetic_structure(n_blocks=size)
+        add_and_access(structure=s1, positions=positions, rebuild=False)
+        add_and_access(structure=s2, positions=positions, rebuild=True)
+        assert np.array_equal(s1.as_array, s2.as_array) and np.array_equal(s1.air_blocks_gridmask, s2.air_blocks_gridmask), f'Arrays differ for {size=}'
+        t_rebuild = _time(lambda: add_and_access(structure=synthetic_structure(n_blocks=size), positions=positions, rebuild=True), repeats=repeats)
+        t_incremental = _time(lambda: add_and_access(structure=synthetic_structure(n_blocks=size), positions=positions, rebuild=False), repeats=repeats)
+        t_build = _time(lambda: synthetic_structure(n_blocks=size), repeats=repeats)
+        results.append({'size': size, 'rebuild': t_rebuild - t_build, 'incremental': t_incremental - t_build,
+                        'speedup': (t_rebuild - t_build) / (t_incremental - t_build)})
+    return results
+
+
+def benchmark_outer_indices(sizes: List[Tuple[int, int, int]] = [(10, 10, 20), (20, 20, 40), (30, 30, 60)],
+                            repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the batched neighbours count of `HullBuilder._get_outer_indices` against the per-voxel loop on synthetic hulls.
+
+    Args:
+        sizes (List[Tuple[int, int, int]], optional): The shapes of the hulls. Defaults to `[(10, 10, 20), (20, 20, 40), (30, 30, 60)]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each size.
+    """
+    results = []
+    for size in sizes:
+        arr = synthetic_hull(size=size).astype(np.float32)
+        hull_builder = HullBuilder(erosion_type='bin', apply_erosion=False, apply_smoothing=False)
+        hull_builder._blocks_set = {idx: Block(block_type=hull_builder.base_block) for idx in map(tuple, np.argwhere(arr).tolist())}
+        assert all(np.array_equal(a, b) for a, b in zip(hull_builder._get_outer_indices(arr=arr),
+                                                        np.nonzero(_loop_outer_neighbours(hull_builder=hull_builder, arr=arr)))), f'Indices differ for {size=}'
+        t_loop = _time(lambda: _loop_outer_neighbours(hull_builder=hull_builder, arr=arr), repeats=repeats)
+        t_vec = _time(lambda: hull_builder._get_outer_indices(arr=arr), repeats=repeats)
+        results.append({'size': size, 'loop': t_loop, 'vectorized': t_vec, 'speedup': t_loop / t_vec})
+    return results
+
+
+def benchmark_orientation_lookups(repeats: int = 3) -> Dict[str, float]:
+    """Compare the precomputed orientation and rotation matrix lookups against computing them, over all valid orientations.
+
+    Args:
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        Dict[str, float]: The timings (in seconds) and speedups.
+    """
+    pairs = [(of.value, ou.value) for of, ou in orientation_pairs] * 100
+    assert all(np.array_equal(get_rotation_matrix(forward=f, up=u), _compute_rotation_matrix(forward=f, up=u)) for f, u in pairs)
+    t_matrix_loop = _time(lambda: [_compute_rotation_matrix(forward=f, up=u) for f, u in pairs], repeats=repeats)
+    t_matrix_table = _time(lambda: [get_rotation_matrix(forward=f, up=u) for f, u in pairs], repeats=repeats)
+    t_orientation_loop = _time(lambda: [_orientation_from_vec_components(vec=u) for _, u in pairs], repeats=repeats)
+    t_orientation_table = _time(lambda: [orientation_from_vec(vec=u) for _, u in pairs], repeats=repeats)
+    return {'matrix_loop': t_matrix_loop, 'matrix_table': t_matrix_table, 'matrix_speedup': t_matrix_loop / t_matrix_table,
+            'orientation_loop': t_orientation_loop, 'orientation_table': t_orientation_table, 'orientation_speedup': t_orientation_loop / t_orientation_table}
+
+
+def benchmark_hl_expand(lengths: List[int] = [100, 1000, 5000],
+                        repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the single-regex `HLParser.expand` against the per-rule expansion on strings of corridors.
+
+    Args:
+        lengths (List[int], optional): The number of corridors in the strings. Defaults to `[100, 1000, 5000]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each length.
+    """
+    rules = StochasticRules()
+    rules.add_rule(lhs='corridorsimple(x)', rhs='corridorsimple(Y)corridorsimple(X)', p=0.5)
+    rules.add_rule(lhs='corridorsimple(x)', rhs='corridorsimple(x)', p=0.5)
+    rules.add_rule(lhs='corridorsimple(x)]', rhs='corridorsimple(1)thrusters(1)]', p=1.)
+    parser = HLParser(rules=rules)
+    results = []
+    for length in lengths:
+        string = ''.join([f'[corridorsimple({i % 9 + 1})]' if i % 5 == 0 else f'corridorsimple({i % 9 + 1})' for i in range(length)])
+        np.random.seed(0)
+        expected = _loop_hl_expand(parser=parser, string=string)
+        np.random.seed(0)
+        assert parser.expand(string=string) == expected, f'Expansions differ for {length=}'
+        t_loop = _time(lambda: _loop_hl_expand(parser=parser, string=string), repeats=repeats)
+        t_compiled = _time(lambda: parser.expand(string=string), repeats=repeats)
+        results.append({'length': length, 'loop': t_loop, 'compiled': t_compiled, 'speedup': t_loop / t_compiled})
+    return results
+
+
+def benchmark_ll_expand(lengths: List[int] = [100, 1000, 5000],
+                        repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the trie-based `LLParser.expand` against the per-character expansion on mid-level strings.
+
+    Args:
+        lengths (List[int], optional): The number of tiles in the strings. Defaults to `[100, 1000, 5000]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each length.
+    """
+    tiles = ['corridorsimple', 'corridorcargo', 'corridorwall', 'thrusters', 'YcwXintersection', 'YccwXYcwXintersection']
+    rules = StochasticRules()
+    for tile in tiles:
+        rules.add_rule(lhs=tile, rhs='MyObjectBuilder_CubeBlock_LargeBlockArmorBlock(F,U)+(5)' * 4, p=1.)
+    parser = LLParser(rules=rules)
+    results = []
+    for length in lengths:
+        string = ''.join([f'{tiles[i % len(tiles)]}!(25)' if i % 7 else f'[RotYcwX{tiles[i % len(tiles)]}!(25)]' for i in range(length)])
+        assert parser.expand(string=string) == _loop_ll_expand(parser=parser, string=string), f'Expansions differ for {length=}'
+        # unmatched characters and truncated keys are copied as-is
+        garbage = f'xyz{string[:40]}corridorsimpl(3)xyz{string[40:]}thruster'
+        assert parser.expand(string=garbage) == _loop_ll_expand(parser=parser, string=garbage), f'Expansions differ for {length=} (unmatched)'
+        t_loop = _time(lambda: _loop_ll_expand(parser=parser, string=string), repeats=repeats)
+        t_trie = _time(lambda: parser.expand(string=string), repeats=repeats)
+        results.append({'length': length, 'loop': t_loop, 'trie': t_trie, 'speedup': t_loop / t_trie})
+    return results
+
+def benchmark_string_as_list(lengths: List[int] = [100, 1000, 5000],
+                             repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the trie-based `HLtoMLTranslator._string_as_list` against the per-character scan on high-level strings.
+
+    Args:
+        lengths (List[int], optional): The number of tiles in the strings. Defaults to `[100, 1000, 5000]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each length.
+    """
+    tiles = ['corridorsimple', 'corridorcargo', 'corridorwall', 'thrusters', 'cockpit']
+    alphabet = {k: None for k in tiles + ['RotXcwY', 'RotXccwY', 'RotYcwX', 'RotYccwX', '[', ']', '!']}
+    translator = HLtoMLTranslator(alphabet=alphabet,
+                                  tiles_dims={k: Vec.v3i(25, 25, 25) for k in tiles},
+                                  tiles_block_offset={k: 25 for k in tiles})
+    results = []
+    for length in lengths:
+        string = ''.join([f'{tiles[i % len(tiles)]}({i % 9 + 1})' if i % 7 else f'[RotYcwX{tiles[i % len(tiles)]}]' for i in range(length)])
+        assert translator._string_as_list(string=string) == _loop_string_as_list(translator=translator, string=string), f'Atoms differ for {length=}'
+        # unmatched characters and truncated keys are skipped
+        garbage = f'xyz{string[:40]}corridorsimpl(3)xyz{string[40:]}Rot'
+        assert translator._string_as_list(string=garbage) == _loop_string_as_list(translator=translator, string=garbage), f'Atoms differ for {length=} (unmatched)'
+        t_loop = _time(lambda: _loop_string_as_list(translator=translator, string=string), repeats=repeats)
+        t_trie = _time(lambda: translator._string_as_list(string=string), repeats=repeats)
+        results.append({'length': length, 'loop': t_loop, 'trie': t_trie, 'speedup': t_loop / t_trie})
+    return results
+
+
+def check_default_tokenizers(n_strings: int = 60) -> Dict[str, float]:
+    """Check the trie-based `HLtoMLTranslator._string_as_list` and `LLParser.expand` against the per-character
+    references on seeded strings expanded with the default L-system rules.
+
+    Args:
+        n_strings (int, optional): The number of seeded strings. Defaults to `60`.
+
+    Returns:
+        Dict[str, float]: The number of strings checked and the total expansion timings (in seconds).
+    """
+    lsystem = get_default_lsystem(used_ll_blocks=list(block_types.types))
+    hl_parser, translator = lsystem.hl_solver.parser, lsystem.hl_solver.translator
+    ll_parser = LLParser(rules=lsystem.hl_solver.ll_rules)
+    checked, t_loop, t_trie = 0, 0., 0.
+    for seed in range(n_strings):
+        np.random.seed(seed)
+        string = 'headbodytail'
+        for _ in range(seed % 6 + 1):
+            string = hl_parser.expand(string=string)
+        for s in [string, f'xyzcorridorsimpl{string}Rot']:
+            assert translator._string_as_list(string=s) == _loop_string_as_list(translator=translator, string=s), f'Atoms differ for {seed=}'
+        try:
+            ml_string = translator.transform(string=string)
+        except Exception:
+            # strings that cannot be placed are not expanded further
+            continue
+        for s in [ml_string, f'{ml_string[:50]}corridorsimpl(3)xyz{ml_string[50:]}']:
+            np.random.seed(seed)
+            t_loop -= timeit.default_timer()
+            expected = _loop_ll_expand(parser=ll_parser, string=s)
+            t_loop += timeit.default_timer()
+            expected_state = np.random.random()
+            np.random.seed(seed)
+            t_trie -= timeit.default_timer()
+            assert ll_parser.expand(string=s) == expected, f'Expansions differ for {seed=}'
+            t_trie += timeit.default_timer()
+            assert np.random.random() == expected_state, f'Random draws differ for {seed=}'
+        checked += 1
+    return {'checked': checked, 'loop': t_loop, 'trie': t_trie, 'speedup': t_loop / t_trie}
+
+
+def benchmark_rule_sampling(n_draws: List[int] = [100, 1000, 10000],
+                            repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare selecting the RHS from the precompiled cumulative distributions against `np.random.choice`.
+
+    Args:
+        n_draws (List[int], optional): The number of RHS to select. Defaults to `[100, 1000, 10000]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedups for each number of draws.
+    """
+    rules = StochasticRules()
+    for lhs, rhs_p in [('corridorsimple(x)', [('corridorsimple(Y)corridorsimple(X)', 0.25), ('corridorsimple(x)', 0.6),
+                                              ('corridorsimple(1)corridorreactors(X)', 0.05), ('corridorsimple(1)corridorcargo(X)', 0.1)]),
+                       ('corridorsimple(x)]', [('corridorsimple(1)thrusters(1)]', 0.15), ('corridorsimple(Y)corridorsimple(1)]', 0.15),
+                                               ('corridorsimple(x)]', 0.7)]),
+                       ('body', [('corridorsimple(X)', 1.)])]:
+        for rhs, p in rhs_p:
+            rules.add_rule(lhs=lhs, rhs=rhs, p=p)
+    results = []
+    for n in n_draws:
+        lhs = [rules.get_lhs()[i % 3] for i in range(n)]
+        np.random.seed(0)
+        expected = [np.random.choice(rules._rules[k][0], p=rules._rules[k][1]) for k in lhs]
+        np.random.seed(0)
+        assert [rules.get_rhs(lhs=k) for k in lhs] == expected, f'Selections differ for {n=}'
+        np.random.seed(0)
+        assert rules.sample_rhs(lhs=lhs) == expected, f'Batched selections differ for {n=}'
+        t_choice = _time(lambda: [np.random.choice(rules._rules[k][0], p=rules._rules[k][1]) for k in lhs], repeats=repeats)
+        t_cdf = _time(lambda: [rules.get_rhs(lhs=k) for k in lhs], repeats=repeats)
+        t_batch = _time(lambda: rules.sample_rhs(lhs=lhs), repeats=repeats)
+        results.append({'n': n, 'choice': t_choice, 'cdf': t_cdf, 'batch': t_batch,
+                        'cdf_speedup': t_choice / t_cdf, 'batch_speedup': t_choice / t_batch})
+    return results
+
+
+def benchmark_tile_templates(lengths: List[int] = [20, 100, 500],
+                             repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare stamping tile templates against parsing the low-level string when filling a structure.
+
+    Args:
+        lengths (List[int], optional): The number of tiles in the strings. Defaults to `[20, 100, 500]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each length.
+    """
+    block_type = 'MyObjectBuilder_CubeBlock_LargeBlockArmorBlock'
+    alphabet = {
+        '+': {'action': AtomAction.MOVE, 'args': Orientation.RIGHT},
+        '!': {'action': AtomAction.MOVE, 'args': Orientation.UP},
+        '[': {'action': AtomAction.PUSH, 'args': []},
+        ']': {'action': AtomAction.POP, 'args': []},
+        'RotYcwX': {'action': AtomAction.ROTATE, 'args': Rotations.YcwX},
+        block_type: {'action': AtomAction.PLACE, 'args': [block_type]}
+    }
+    rhs = f'{block_type}(F,U)+(5)' * 10 + f'{block_type}(R,U)!(5)' * 10
+    rules = StochasticRules()
+    rules.add_rule(lhs='tile', rhs=rhs, p=1.)
+    templates = {'tile': TileTemplate.from_string(string=rhs, atoms_alphabet=alphabet)}
+
+    def fill(string: str = None,
+             segments: List[Tuple[str, str]] = None) -> Structure:
+        structure = Structure(origin=Vec.v3i(0, 0, 0),
+                              orientation_forward=Orientation.FORWARD.value,
+                              orientation_up=Orientation.UP.value)
+        structure_maker = LLStructureMaker(atoms_alphabet=alphabet,
+                                           position=Vec.v3i(0, 0, 0))
+        if segments is None:
+            return structure_maker.fill_structure(structure=structure, string=string)
+        return structure_maker.fill_structure_from_segments(structure=structure, segments=segments, templates=templates)
+
+    results = []
+    for length in lengths:
+        segments = LLParser(rules=rules).expand_segments(string=''.join(['tile!(25)' if i % 5 else '[RotYcwXtile!(25)]' for i in range(length)]))
+        string = ''.join([segment for segment, _ in segments])
+        blocks_parse, blocks_templates = [[(idx, b.block_type, b.orientation_forward.as_tuple(), b.orientation_up.as_tuple()) for idx, b in s._blocks.items()] for s in [fill(string=string), fill(segments=segments)]]
+        assert blocks_parse == blocks_templates, f'Structures differ for {length=}'
+        t_parse = _time(lambda: fill(string=string), repeats=repeats)
+        t_templates = _time(lambda: fill(segments=segments), repeats=repeats)
+        results.append({'length': length, 'parse': t_parse, 'templates': t_templates, 'speedup': t_parse / t_templates})
+    return results
+
+
+def benchmark_structure_program(lengths: List[int] = [20, 100, 500],
+                                repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare running the compiled low-level string against dispatching each parsed atom when filling a structure.
+
+    Args:
+        lengths (List[int], optional): The number of tiles in the strings. Defaults to `[20, 100, 500]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each length.
+    """
+    block_type = 'MyObjectBuilder_CubeBlock_LargeBlockArmorBlock'
+    alphabet = {
+        '+': {'action': AtomAction.MOVE, 'args': Orientation.RIGHT},
+        '!': {'action': AtomAction.MOVE, 'args': Orientation.UP},
+        '?': {'action': AtomAction.MOVE, 'args': Orientation.FORWARD},
+        '[': {'action': AtomAction.PUSH, 'args': []},
+        ']': {'action': AtomAction.POP, 'args': []},
+        'RotYcwX': {'action': AtomAction.ROTATE, 'args': Rotations.YcwX},
+        'RotZcwY': {'action': AtomAction.ROTATE, 'args': Rotations.ZcwY},
+        block_type: {'action': AtomAction.PLACE, 'args': [block_type]}
+    }
+    tile = f'{block_type}(F,U)+(5)' * 5 + f'{block_type}(R,U)?(5)' * 5 + '!(25)'
+
+    def new_structure() -> Structure:
+        return Structure(origin=Vec.v3i(0, 0, 0),
+                         orientation_forward=Orientation.FORWARD.value,
+                         orientation_up=Orientation.UP.value)
+
+    def fill(string: str) -> Structure:
+        return LLStructureMaker(atoms_alphabet=alphabet,
+                                position=Vec.v3i(0, 0, 0)).fill_structure(structure=new_structure(), string=string)
+
+    results = []
+    for length in lengths:
+        string = ''.join([tile if i % 5 else f'[RotYcwX{tile}[RotZcwY{tile}]]' for i in range(length)])
+        blocks_loop, blocks_program = [[(idx, b.block_type, b.orientation_forward.as_tuple(), b.orientation_up.as_tuple()) for idx, b in s._blocks.items()] for s in [_loop_fill_structure(structure=new_structure(), string=string, atoms_alphabet=alphabet), fill(string=string)]]
+        assert blocks_loop == blocks_program, f'Structures differ for {length=}'
+        t_loop = _time(lambda: _loop_fill_structure(structure=new_structure(), string=string, atoms_alphabet=alphabet), repeats=repeats)
+        t_program = _time(lambda: fill(string=string), repeats=repeats)
+        results.append({'length': length, 'loop': t_loop, 'program': t_program, 'speedup': t_loop / t_program})
+    return results
+
+
+def benchmark_intersections(lengths: List[int] = [20, 100, 500],
+                            repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare finding intersections while filling a structure against building its scaled array afterwards.
+
+    Args:
+        lengths (List[int], optional): The number of tiles in the strings. Defaults to `[20, 100, 500]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedup for each length, and the time to abort filling
+        when the first tile intersects.
+    """
+    block_type = 'MyObjectBuilder_CubeBlock_LargeBlockArmorBlock'
+    alphabet = {
+        '+': {'action': AtomAction.MOVE, 'args': Orientation.RIGHT},
+        '!': {'action': AtomAction.MOVE, 'args': Orientation.UP},
+        block_type: {'action': AtomAction.PLACE, 'args': [block_type]}
+    }
+    tile = f'{block_type}(F,U)+(5)' * 10 + '!(5)'
+
+    def fill(string: str,
+             abort_on_intersection: bool = False,
+             structure: Optional[Structure] = None) -> Structure:
+        structure = structure or Structure(origin=Vec.v3i(0, 0, 0),
+                                           orientation_forward=Orientation.FORWARD.value,
+                                           orientation_up=Orientation.UP.value)
+        return LLStructureMaker(atoms_alphabet=alphabet,
+                                position=Vec.v3i(0, 0, 0),
+                                abort_on_intersection=abort_on_intersection).fill_structure(structure=structure,
+                                                                                            string=string)
+
+    def from_array(string: str) -> bool:
+        structure = fill(string=string)
+        structure._has_intersections = None
+        return structure.has_intersections
+
+    def abort(string: str) -> Optional[Structure]:
+        structure = Structure(origin=Vec.v3i(0, 0, 0),
+                              orientation_forward=Orientation.FORWARD.value,
+                              orientation_up=Orientation.UP.value)
+        try:
+            fill(string=string, abort_on_intersection=True, structure=structure)
+        except IntersectionException:
+            return structure
+        return None
+
+    results = []
+    for length in lengths:
+        string = tile * length
+        # the first tile partially overlaps an extra block, which only the scaled array shows
+        intersecting = f'{block_type}(F,U)+(1)' + string
+        for s in [string, intersecting]:
+            assert fill(string=s).has_intersections == from_array(string=s), f'Intersections differ for {length=}'
+        assert abort(string=string) is None, f'Filling aborted for {length=}'
+        # only the block placed before the overlapping one is kept
+        partial = abort(string=intersecting)
+        assert partial is not None and len(partial._blocks) == 1 and partial.has_intersections, f'Filling not aborted early for {length=}'
+        t_array = _time(lambda: from_array(string=string), repeats=repeats)
+        t_fill = _time(lambda: fill(string=string).has_intersections, repeats=repeats)
+        t_abort = _time(lambda: abort(string=intersecting), repeats=repeats)
+        results.append({'length': length, 'array': t_array, 'fill': t_fill, 'abort': t_abort, 'speedup': t_array / t_fill})
+    return results
+
+
+def benchmark_symmetry(sizes: List[Tuple[int, int, int]] = [(40, 40, 80), (85, 165, 160), (85, 330, 160)],
+                       repeats: int = 3) -> List[Dict[str, float]]:
+    """Compare the cropped early-exit symmetry checks and the per-plane symmetry score against flipping the whole array.
+
+    Args:
+        sizes (List[Tuple[int, int, int]], optional): The shapes of the arrays. Defaults to `[(40, 40, 80), (85, 165, 160), (85, 330, 160)]`.
+        repeats (int, optional): The number of repetitions per timing. Defaults to `3`.
+
+    Returns:
+        List[Dict[str, float]]: The timings (in seconds) and speedups for each size.
+    """
+    results = []
+    for size in sizes:
+        asymmetric = synthetic_hull(size=size, fill=0.2) * np.random.default_rng(0).integers(low=1, high=5, size=size, dtype=np.uint16)
+        half = asymmetric[:size[0] // 2]
+        symmetric = np.concatenate([half, np.flip(half, axis=0)])
+        same_occupancy = symmetric.copy()
+        same_occupancy[tuple(np.argwhere(same_occupancy)[len(np.argwhere(same_occupancy)) // 3])] += 1
+        padded = np.pad(symmetric, pad_width=((1, 0), (0, 2), (3, 3)))
+        arrays = [asymmetric, symmetric, same_occupancy, padded, np.zeros(shape=size, dtype=np.uint16)]
+        for arr in arrays:
+            assert mirror_symmetries(arr=arr) == tuple(np.array_equal(arr, np.flip(arr, axis)) for axis in range(3)), f'Symmetries differ for {size=}'
+            assert is_mirror_symmetric(arr=arr) == any(mirror_symmetries(arr=arr))
+            if arr.any():
+                for midpoint in [(0, 0, 0), (size[0] // 2, 0, size[2] // 3), (size[0], 1, size[2] + 2)]:
+                    assert symmetry_score(arr=arr, midpoint=midpoint) == _loop_symmetry_score(arr=arr, midpoint=midpoint), f'Symmetry scores differ for {size=}'
+        t_flip = _time(lambda: [any(np.array_equal(arr, np.flip(arr, axis)) for axis in range(3)) for arr in arrays], repeats=repeats)
+        t_cropped = _time(lambda: [is_mirror_symmetric(arr=arr) for arr in arrays], repeats=repeats)
+        midpoint = (size[0] // 2, 0, size[2] // 2)
+        t_score_loop = _time(lambda: [_loop_symmetry_score(arr=arr, midpoint=midpoint) for arr in arrays[:-1]], repeats=repeats)
+        t_score = _time(lambda: [symmetry_score(arr=arr, midpoint=midpoint) for arr in arrays[:-1]], repeats=repeats)
+        results.append({'size': size, 'flip': t_flip, 'cropped': t_cropped, 'check_speedup': t_flip / t_cropped,
+                        'score_loop': t_score_loop, 'score': t_score, 'score_speedup': t_score_loop / t_score})
+    return results
+
+
+if __name__ == '__main__':
+    for r in benchmark_air_blocks_gridmask():
+        print(f'air_blocks_gridmask {r["size"]}: loop {r["loop"]:.4f}s, vectorized {r["vectorized"]:.6f}s ({r["speedup"]:.0f}x)')
+    for r in benchmark_rotate():
+        print(f'rotate ({r["size"]} blocks): loop {r["loop"]:.4f}s, vectorized {r["vectorized"]:.4f}s ({r["speedup"]:.1f}x), compact {r["compact"]:.4f}s')
+    for r in benchmark_outer_indices():
+        print(f'hull outer indices {r["size"]}: loop {r["loop"]:.4f}s, vectorized {r["vectorized"]:.4f}s ({r["speedup"]:.0f}x)')
+    r = benchmark_orientation_lookups()
+    print(f'rotation matrices: computed {r["matrix_loop"]:.4f}s, precomputed {r["matrix_table"]:.4f}s ({r["matrix_speedup"]:.0f}x)')
+    print(f'orientations from vectors: components {r["orientation_loop"]:.4f}s, precomputed {r["orientation_table"]:.4f}s ({r["orientation_speedup"]:.1f}x)')
+    for r in benchmark_hl_expand():
+        print(f'HLParser.expand ({r["length"]} corridors): per-rule {r["loop"]:.4f}s, compiled {r["compiled"]:.4f}s ({r["speedup"]:.1f}x)')
+    for r in benchmark_ll_expand():
+        print(f'LLParser.expand ({r["length"]} tiles): per-character {r["loop"]:.4f}s, trie {r["trie"]:.4f}s ({r["speedup"]:.1f}x)')
+    for r in benchmark_string_as_list():
+        print(f'HLtoMLTranslator._string_as_list ({r["length"]} tiles): per-character {r["loop"]:.4f}s, trie {r["trie"]:.4f}s ({r["speedup"]:.1f}x)')
+    r = check_default_tokenizers()
+    print(f'default rules ({r["checked"]} seeded strings): per-character {r["loop"]:.4f}s, trie {r["trie"]:.4f}s ({r["speedup"]:.1f}x)')
+    for r in benchmark_rule_sampling():
+        print(f'StochasticRules ({r["n"]} draws): np.random.choice {r["choice"]:.4f}s, precompiled {r["cdf"]:.4f}s ({r["cdf_speedup"]:.1f}x), batched {r["batch"]:.4f}s ({r["batch_speedup"]:.1f}x)')
+    for r in benchmark_tile_templates():
+        print(f'fill_structure ({r["length"]} tiles): parsed {r["parse"]:.4f}s, templates {r["templates"]:.4f}s ({r["speedup"]:.1f}x)')
+    for r in benchmark_structure_program():
+        print(f'fill_structure ({r["length"]} tiles): per-atom {r["loop"]:.4f}s, compiled {r["program"]:.4f}s ({r["speedup"]:.1f}x)')
+    for r in benchmark_intersections():
+        print(f'has_intersections ({r["length"]} tiles): scaled array {r["array"]:.4f}s, while filling {r["fill"]:.4f}s ({r["speedup"]:.1f}x), aborted {r["abort"]:.6f}s')
+    for r in benchmark_symmetry():
+        print(f'symmetry {r["size"]}: flipped {r["flip"]:.4f}s, cropped {r["cropped"]:.4f}s ({r["check_speedup"]:.1f}x); score copied {r["score_loop"]:.4f}s, per-plane {r["score"]:.4f}s ({r["score_speedup"]:.1f}x)')
+    for r in benchmark_incremental_arrays():
+        print(f'cached arrays after adding blocks ({r["size"]} blocks): rebuild {r["rebuild"]:.4f}s, incremental {r["incremental"]:.4f}s ({r["speedup"]:.1f}x)')
+    for r in benchmark_sparse_array():
+        print(f'as_array (frame of {r["length"]} blocks per edge): dense {r["dense_bytes"] / 2**20:.1f}MiB, sparse {r["sparse_bytes"] / 2**20:.1f}MiB ({r["sparse_time"]:.3f}s)')
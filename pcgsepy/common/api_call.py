@@ -4,6 +4,9 @@ import random
 from enum import Enum
 from typing import Any, Dict, List, Optional, Tuple
 
+import numpy as np
+import numpy.typing as npt
+
 from pcgsepy.common.jsonrpc import TransportTcpIp
 from pcgsepy.common.vecs import Vec
 from pcgsepy.config import HOST, PORT
@@ -91,6 +94,95 @@ else:
         block_definitions = json.load(f)
 
 
+# Sizes of blocks in grid spaces
+_blocks_sizes = {'Small': 1, 'Normal': 2, 'Large': 5}
+# Prefixes of the block types, removed when displaying labels
+_block_type_prefixes = ['MyObjectBuilder_CubeBlock_',
+                        'MyObjectBuilder_Gyro_',
+                        'MyObjectBuilder_Reactor_',
+                        'MyObjectBuilder_CargoContainer_',
+                        'MyObjectBuilder_Cockpit_',
+                        'MyObjectBuilder_Thrust_',
+                        'MyObjectBuilder_InteriorLight_']
+# Non-functional, structural blocks (as clean labels)
+_base_blocks = ['LargeBlockArmorCorner', 'LargeBlockArmorSlope',
+                'LargeBlockArmorCornerInv', 'LargeBlockArmorBlock']
+# Transparent blocks (as clean labels)
+_transparent_blocks = ['Window1x1Slope', 'Window1x1Flat']
+
+
+def clean_label(a: str) -> str:
+    """Remove prefix block type from label.
+
+    Args:
+        a (str): The label.
+
+    Returns:
+        str: The label without prefix.
+    """
+    for d in _block_type_prefixes:
+        a = a.replace(d, '')
+    return a
+
+
+class BlockTypeRegistry:
+    def __init__(self,
+                 definitions: Dict[str, Dict[str, Any]]) -> None:
+        """Create a registry of the block types. Each block type is assigned a dense integer id (its position in the
+        block definitions), and per-id properties are precomputed as NumPy tables indexed by the id.
+
+        Args:
+            definitions (Dict[str, Dict[str, Any]]): The block definitions.
+        """
+        self.types: List[str] = list(definitions.keys())
+        self._ids: Dict[str, int] = {block_type: i for i, block_type in enumerate(self.types)}
+        self.cube_size: npt.NDArray[np.str_] = np.asarray([definitions[t]['cube_size'] for t in self.types])
+        self.scaled_size: npt.NDArray[np.int64] = np.asarray([[definitions[t]['size'][k] * _blocks_sizes[definitions[t]['cube_size']] for k in 'XYZ'] for t in self.types],
+                                                             dtype=np.int64).reshape(-1, 3)
+        self.mass: npt.NDArray[np.float64] = np.asarray([float(definitions[t]['mass']) for t in self.types], dtype=np.float64)
+        self.volume: npt.NDArray[np.int64] = np.prod(self.scaled_size, axis=1)
+        self.clean_label: npt.NDArray[np.str_] = np.asarray([clean_label(a=t) for t in self.types])
+        self.is_armor: npt.NDArray[np.bool_] = np.asarray(['armor' in t.lower() for t in self.types], dtype=bool)
+        self.is_base: npt.NDArray[np.bool_] = np.isin(self.clean_label, _base_blocks)
+        self.is_transparent: npt.NDArray[np.bool_] = np.isin(self.clean_label, _transparent_blocks)
+        self.is_functional: npt.NDArray[np.bool_] = np.asarray([not t.startswith('MyObjectBuilder_CubeBlock_') for t in self.types], dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.types)
+
+    def __contains__(self,
+                     block_type: str) -> bool:
+        return block_type in self._ids
+
+    def get_id(self,
+               block_type: str) -> int:
+        """Get the id of a block type.
+
+        Args:
+            block_type (str): The block type.
+
+        Returns:
+            int: The id of the block type.
+        """
+        return self._ids[block_type]
+
+    def get_type(self,
+                 type_id: int) -> str:
+        """Get the block type from its id.
+
+        Args:
+            type_id (int): The id of the block type.
+
+        Returns:
+            str: The block type.
+        """
+        return self.types[type_id]
+
+
+# block types registry as a module-level variable
+block_types = BlockTypeRegistry(definitions=block_definitions)
+
+
 def get_base_values() -> Tuple[Vec, Vec, Vec]:
     """Get the position, orientation forward and orientation up of the player.
 
@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    __slots__ = ['max_size', 'hits', 'misses', '_items']
+
+    def __init__(self,
+                 max_size: int) -> None:
+        """Create a bounded cache that evicts the least recently used item when full.
+
+        Args:
+            max_size (int): The maximum number of items. If not positive, nothing is cached.
+        """
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._items: OrderedDict = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self,
+                     key: Hashable) -> bool:
+        return key in self._items
+
+    def get(self,
+            key: Hashable,
+            default: Optional[Any] = None) -> Any:
+        """Get the value of a key, marking it as the most recently used.
+
+        Args:
+            key (Hashable): The key.
+            default (Optional[Any], optional): The value returned if the key is not cached. Defaults to None.
+
+        Returns:
+            Any: The value.
+        """
+        if key in self._items:
+            self._items.move_to_end(key)
+            self.hits += 1
+            return self._items[key]
+        self.misses += 1
+        return default
+
+    def put(self,
+            key: Hashable,
+            value: Any) -> None:
+        """Cache the value of a key, evicting the least recently used item if the cache is full.
+
+        Args:
+            key (Hashable): The key.
+            value (Any): The value.
+        """
+        if self.max_size <= 0:
+            return
+        self._items[key] = value
+        self._items.move_to_end(key)
+        if len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        """Remove all items and reset the counters."""
+        self._items.clear()
+        self.hits = 0
+        self.misses = 0
@@ -1,8 +1,11 @@
 from copy import copy
 import re
-from typing import Tuple
+from typing import Dict, List, Optional, Tuple
 from functools import total_ordering
 
+import numpy as np
+from pcgsepy.config import PL_HIGH, PL_LOW
+
 
 @total_ordering
 class MyMatch:
@@ -51,4 +54,70 @@ def extract_regex(lhs: str) -> str:
     r = copy(lhs)
     for k, v in char_to_re.items():
         r = r.replace(k, v)
-    return re.compile(r)
\ No newline at end of file
+    return re.compile(r)
+
+
+# Numerical parameters placeholders in the RHS of rules
+_parameters_re = re.compile(r'(\(x\)|\(X\)|\(Y\))')
+_digit_re = re.compile(r'\d')
+
+
+class CompiledRules:
+    def __init__(self,
+                 lhs: List[str]) -> None:
+        """Compile the LHS of a rule set into a single regex, as an alternation of named groups.
+        Each LHS matches as many characters as it has (as placeholders match a single digit), so trying the longest LHS
+        first returns the leftmost-longest match at each position. LHS of the same length are tried in rule set order.
+
+        Args:
+            lhs (List[str]): The LHS of the rule set, in order.
+        """
+        self.lhs = list(lhs)
+        order = sorted(range(len(self.lhs)), key=lambda i: -len(self.lhs[i]))
+        self.pattern = re.compile('|'.join([f'(?P<_{i}>{extract_regex(self.lhs[i]).pattern})' for i in order]))
+        self._groups: Dict[str, str] = {f'_{i}': lhs for i, lhs in enumerate(self.lhs)}
+        self._templates: Dict[str, List[str]] = {}
+
+    def matches(self,
+                string: str) -> List[MyMatch]:
+        """Get the non-overlapping leftmost-longest matches of the LHS in the string, sorted by position.
+
+        Args:
+            string (str): The string.
+
+        Returns:
+            List[MyMatch]: The matches.
+        """
+        return [MyMatch(lhs=self._groups[match.lastgroup],
+                        span=match.span(),
+                        lhs_string=match.group()) for match in self.pattern.finditer(string)]
+
+    def fill_parameters(self,
+                        rhs: str,
+                        lhs_string: str,
+                        rng: Optional[np.random.Generator] = None) -> str:
+        """Replace the numerical parameters placeholders in the RHS.
+        `(x)` is the parameter of the matched LHS, `(X)` is sampled in `[PL_LOW, PL_HIGH)` and `(Y)` is the remainder
+        of the LHS parameter. A value is sampled only if the RHS has placeholders.
+
+        Args:
+            rhs (str): The RHS.
+            lhs_string (str): The matched LHS.
+            rng (Optional[np.random.Generator], optional): The random generator used to sample `(X)`. If `None`, the global NumPy random state is used. Defaults to None.
+
+        Returns:
+            str: The RHS with parameters.
+        """
+        template = self._templates.get(rhs, None)
+        if template is None:
+            template = self._templates[rhs] = _parameters_re.split(rhs)
+        if len(template) == 1:
+            return rhs
+        n: Optional[re.Match] = _digit_re.search(lhs_string)
+        n = int(n.group()) if n else None
+        rhs_n = np.random.randint(PL_LOW, PL_HIGH) if rng is None else int(rng.integers(PL_LOW, PL_HIGH))
+        values = {'(x)': f'({n})',
+                  '(X)': f'({rhs_n})',
+                  '(Y)': f'({max(1, n - rhs_n)})' if n is not None else '(Y)'}
+        # placeholders are at odd positions in the template
+        return ''.join([values[part] if i % 2 else part for i, part in enumerate(template)])
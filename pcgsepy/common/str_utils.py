@@ -1,4 +1,4 @@
-from typing import List, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
 
 
 def get_atom_indexes(string: str,
@@ -25,19 +25,79 @@ def get_matching_brackets(string: str) -> List[Tuple[int, int]]:
     Args:
         string (str): The string.
 
+    Raises:
+        ValueError: Raised if an opening bracket is not closed.
+
     Returns:
-        List[Tuple[int, int]]: The list of pair indexes.
+        List[Tuple[int, int]]: The list of pair indexes, sorted by opening bracket.
     """
-    brackets = []
+    brackets, stack = [], []
     for i, c in enumerate(string):
         if c == '[':
-            # find first closing bracket
-            idx_c = string.index(']', i)
-            # update closing bracket position in case of nested brackets
-            ni_o = string.find('[', i + 1)
-            while ni_o != -1 and string.find('[', ni_o) < idx_c:
-                idx_c = string.index(']', idx_c + 1)
-                ni_o = string.find('[', ni_o + 1)
-            # add to list of brackets
-            brackets.append((i, idx_c))
-    return brackets
+            stack.append(len(brackets))
+            brackets.append([i, -1])
+        # unmatched closing brackets are ignored
+        elif c == ']' and stack:
+            brackets[stack.pop()][1] = i
+    if stack:
+        raise ValueError(f'Unmatched opening bracket at {brackets[stack[-1]][0]}.')
+    return [(i, j) for i, j in brackets]
+
+
+class PrefixTrie:
+    __slots__ = ['keys', '_root']
+
+    def __init__(self,
+                 keys: Iterable[str]) -> None:
+        """Create a prefix trie of the given keys, used to tokenize strings by longest match.
+
+        Args:
+            keys (Iterable[str]): The keys (e.g.: the alphabet of a ruleset).
+        """
+        self.keys = frozenset(keys)
+        self._root: Dict[str, Any] = {}
+        for key in self.keys:
+            node = self._root
+            for c in key:
+                node = node.setdefault(c, {})
+            # the empty string is never a character, so it marks the end of a key
+            node[''] = key
+
+    def longest_match(self,
+                      string: str,
+                      start: int = 0) -> Optional[str]:
+        """Get the longest key the string starts with at the given position.
+
+        Args:
+            string (str): The string.
+            start (int, optional): The position in the string. Defaults to 0.
+
+        Returns:
+            Optional[str]: The key, if any.
+        """
+        node, match = self._root, None
+        for i in range(start, len(string)):
+            node = node.get(string[i], None)
+            if node is None:
+                break
+            match = node.get('', match)
+        return match
+
+    def matches(self,
+                string: str) -> Iterator[Tuple[int, str]]:
+        """Tokenize the string left to right, by longest match. Characters not starting any key are skipped.
+
+        Args:
+            string (str): The string.
+
+        Yields:
+            Iterator[Tuple[int, str]]: The position and the key of each match.
+        """
+        i, n = 0, len(string)
+        while i < n:
+            key = self.longest_match(string=string, start=i) if string[i] in self._root else None
+            if key is None:
+                i += 1
+            else:
+                yield i, key
+                i += len(key)
@@ -0,0 +1,141 @@
+from typing import Iterator, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from pcgsepy.common.voxelgrid import ChunkedVoxelGrid
+
+
+def _occupied_range(arr: npt.NDArray[np.uint16],
+                    axis: int) -> Optional[Tuple[int, int]]:
+    """Get the first and last non-empty plane of an array along an axis, scanning inwards from both ends.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The 3D array.
+        axis (int): The axis.
+
+    Returns:
+        Optional[Tuple[int, int]]: The indices of the planes, or `None` if the array is empty.
+    """
+    planes = np.moveaxis(arr, axis, 0)
+    n = planes.shape[0]
+    lo = 0
+    while lo < n and not planes[lo].any():
+        lo += 1
+    if lo == n:
+        return None
+    hi = n - 1
+    while not planes[hi].any():
+        hi -= 1
+    return lo, hi
+
+
+def _mirrored_planes_equal(arr: npt.NDArray[np.uint16],
+                           axis: int) -> bool:
+    """Compare the planes of an array along an axis with their mirrored ones, from the outermost inwards.
+    Planes are compared in blocks of doubling size, so a mismatch in the outer planes is found after a few planes.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The 3D array.
+        axis (int): The axis.
+
+    Returns:
+        bool: Whether all mirrored planes are equal.
+    """
+    planes = np.moveaxis(arr, axis, 0)
+    n = planes.shape[0]
+    start, block = 0, 1
+    while start < n // 2:
+        stop = min(start + block, n // 2)
+        if not np.array_equal(planes[start:stop], planes[n - 1 - start:n - 1 - stop:-1]):
+            return False
+        start, block = stop, 2 * block
+    return True
+
+
+def _iter_mirror_symmetries(arr: Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]) -> Iterator[bool]:
+    """Check along each axis in turn whether the array is equal to itself flipped (see `mirror_symmetries`).
+
+    Args:
+        arr (Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]): The 3D array.
+
+    Returns:
+        Iterator[bool]: Whether the array is symmetric along each axis.
+    """
+    if isinstance(arr, ChunkedVoxelGrid):
+        for axis in range(3):
+            yield bool(np.array_equal(arr, np.flip(arr, axis)))
+        return
+    bbox = []
+    for axis in range(3):
+        occupied = _occupied_range(arr=arr, axis=axis)
+        if occupied is None:
+            yield from (True, True, True)
+            return
+        bbox.append(occupied)
+    cropped = arr[tuple(slice(lo, hi + 1) for lo, hi in bbox)]
+    for axis, (lo, hi) in enumerate(bbox):
+        # the empty planes before the box are mirrored by the ones after it only if there are as many
+        yield lo == arr.shape[axis] - 1 - hi and _mirrored_planes_equal(arr=cropped, axis=axis)
+
+
+def mirror_symmetries(arr: Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]) -> Tuple[bool, bool, bool]:
+    """Check along each axis whether the array is equal to itself flipped, as `np.array_equal(arr, np.flip(arr, axis))`.
+    The array is cropped to the bounding box of its non-empty cells, so the empty planes around it are never compared,
+    and no flipped copy is made: mirrored planes are compared from the outermost ones, stopping at the first mismatch.
+
+    Args:
+        arr (Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]): The 3D array.
+
+    Returns:
+        Tuple[bool, bool, bool]: Whether the array is symmetric along each axis.
+    """
+    return tuple(_iter_mirror_symmetries(arr=arr))
+
+
+def is_mirror_symmetric(arr: Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]) -> bool:
+    """Check whether the array is equal to itself flipped along any axis, stopping at the first symmetric axis.
+
+    Args:
+        arr (Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]): The 3D array.
+
+    Returns:
+        bool: Whether the array is symmetric along at least one axis.
+    """
+    return any(_iter_mirror_symmetries(arr=arr))
+
+
+def mass_balance_error(arr: npt.NDArray[np.uint16],
+                       axis: int,
+                       midpoint: int) -> float:
+    """Get the difference between the sums of the values on the two sides of a midpoint along an axis: the cells from
+    the midpoint onwards against the cells before the plane preceding the midpoint (as `arr[:midpoint - 1]`).
+    Values are summed per plane, so the sides are never copied or flipped.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The 3D array.
+        axis (int): The axis.
+        midpoint (int): The index of the midpoint along the axis.
+
+    Returns:
+        float: The absolute difference of the sums.
+    """
+    planes = arr.sum(axis=tuple(a for a in range(arr.ndim) if a != axis), dtype=np.int64)
+    return float(abs(int(planes[midpoint:].sum()) - int(planes[:midpoint - 1].sum())))
+
+
+def symmetry_score(arr: npt.NDArray[np.uint16],
+                   midpoint: Tuple[int, int, int]) -> float:
+    """Get the symmetry of an array around a midpoint, as the `symmetry` behavior: one minus the smaller mass balance
+    error along the X and Z axes, relative to the total mass.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The 3D array.
+        midpoint (Tuple[int, int, int]): The midpoint.
+
+    Returns:
+        float: The symmetry.
+    """
+    err_x = np.float64(mass_balance_error(arr=arr, axis=0, midpoint=midpoint[0]))
+    err_z = np.float64(mass_balance_error(arr=arr, axis=2, midpoint=midpoint[2]))
+    return 1 - (min(err_x, err_z) / np.sum(arr))
@@ -1,14 +1,13 @@
 from enum import Enum
-from functools import cached_property
-from multiprocessing.sharedctypes import Value
-from os import stat
-from typing import Any, Dict, Optional, Tuple, Union
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
 
 import numpy as np
 import numpy.typing as npt
 
 
 class Vec:
+    __slots__ = ['x', 'y', 'z']
+
     def __init__(self,
                  x: Union[int, float],
                  y: Union[int, float],
@@ -24,16 +23,25 @@ class Vec:
         self.y = y
         self.z = z
 
+    def __setstate__(self,
+                     state: Union[Dict[str, Any], Tuple[Optional[Dict[str, Any]], Dict[str, Any]]]) -> None:
+        # vectors pickled before `__slots__` hold their `__dict__` instead of the `(None, slots)` pair
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        self.x = state['x']
+        self.y = state['y']
+        self.z = state.get('z', None)
+
     def __str__(self) -> str:
         return str(self.as_dict())
 
     def __repr__(self) -> str:
-        return str(self.__dict__)
+        return str({'x': self.x, 'y': self.y, 'z': self.z})
 
     def __eq__(self,
                other: 'Vec') -> bool:
         if isinstance(other, self.__class__):
-            return self.__dict__ == other.__dict__
+            return self.x == other.x and self.y == other.y and self.z == other.z
         else:
             return False
 
@@ -206,24 +214,6 @@ class Vec:
                    y=np.floor(self.y),
                    z=np.floor(self.z) if self.z is not None else None)
     
-    @cached_property
-    def max(self) -> Union[int, float]:
-        """Compute the largest dimension of the vector.
-
-        Returns:
-            Union[int, float]: The largest dimension.
-        """
-        return max(self.x, self.y) if self.z is None else max(self.x, self.y, self.z)
-
-    @cached_property
-    def min(self) -> Union[int, float]:
-        """Compute the smallest dimension of the vector.
-
-        Returns:
-            Union[int, float]: The smallest dimension.
-        """
-        return min(self.x, self.y) if self.z is None else min(self.x, self.y, self.z)
-
     def abs(self) -> "Vec":
         """Compute the absolute value of the vector.
 
@@ -240,7 +230,7 @@ class Vec:
         Returns:
             Vec: The normalized vector.
         """
-        m = self.max()
+        m = max(self.as_tuple())
         return Vec(x=self.x / m,
                    y=self.y / m,
                    z=self.z / m if self.z is not None else None)
@@ -394,6 +384,151 @@ class Vec:
                    z=min(v1.z, v2.z) if v1.z is not None and v2.z is not None else None)
 
 
+class VecArray:
+    __slots__ = ['arr']
+
+    def __init__(self,
+                 arr: Union[npt.NDArray[np.int64], npt.NDArray[np.float64]]) -> None:
+        """Create an array of 3D vectors, backed by a N×3 NumPy array.
+        Operations are applied to all vectors at once, without creating intermediate `Vec` objects.
+
+        Args:
+            arr (Union[npt.NDArray[np.int64], npt.NDArray[np.float64]]): The N×3 array.
+        """
+        self.arr = np.asarray(arr).reshape(-1, 3)
+
+    @classmethod
+    def from_vecs(cls,
+                  vecs: Iterable[Vec]) -> 'VecArray':
+        """Create an array of vectors from 3D vectors.
+
+        Args:
+            vecs (Iterable[Vec]): The vectors.
+
+        Returns:
+            VecArray: The array of vectors.
+        """
+        return cls(np.asarray([(v.x, v.y, v.z) for v in vecs]))
+
+    @classmethod
+    def from_tuples(cls,
+                    tups: Iterable[Tuple[int, int, int]]) -> 'VecArray':
+        """Create an array of vectors from 3D tuples.
+
+        Args:
+            tups (Iterable[Tuple[int, int, int]]): The tuples.
+
+        Returns:
+            VecArray: The array of vectors.
+        """
+        return cls(np.asarray(list(tups)))
+
+    def __len__(self) -> int:
+        return self.arr.shape[0]
+
+    def __getitem__(self,
+                    i: int) -> Vec:
+        return Vec(*self.arr[i].tolist())
+
+    def __iter__(self):
+        return iter(self.as_vecs())
+
+    def __repr__(self) -> str:
+        return f'VecArray({self.arr.tolist()})'
+
+    def as_tuples(self) -> List[Tuple[int, int, int]]:
+        """Convert the vectors to tuples of Python numbers.
+
+        Returns:
+            List[Tuple[int, int, int]]: The vectors as tuples.
+        """
+        return list(map(tuple, self.arr.tolist()))
+
+    def as_vecs(self) -> List[Vec]:
+        """Convert the vectors to `Vec` objects of Python numbers.
+
+        Returns:
+            List[Vec]: The vectors.
+        """
+        return [Vec(x, y, z) for x, y, z in self.arr.tolist()]
+
+    def add(self,
+            v: Union[float, int]) -> 'VecArray':
+        """Add a scalar to all vectors.
+
+        Args:
+            v (Union[float, int]): The scalar.
+
+        Returns:
+            VecArray: The new vectors.
+        """
+        return VecArray(self.arr + v)
+
+    def sum(self,
+            other: Union[Vec, 'VecArray']) -> 'VecArray':
+        """Compute the sum with a single vector or element-wise with another array of vectors.
+
+        Args:
+            other (Union[Vec, VecArray]): The other vector(s).
+
+        Returns:
+            VecArray: The resulting vectors.
+        """
+        return VecArray(self.arr + (other.arr if isinstance(other, VecArray) else np.asarray(other.as_tuple())))
+
+    def diff(self,
+             other: Union[Vec, 'VecArray']) -> 'VecArray':
+        """Compute the difference with a single vector or element-wise with another array of vectors.
+
+        Args:
+            other (Union[Vec, VecArray]): The other vector(s).
+
+        Returns:
+            VecArray: The resulting vectors.
+        """
+        return VecArray(self.arr - (other.arr if isinstance(other, VecArray) else np.asarray(other.as_tuple())))
+
+    def scale(self,
+              v: float) -> 'VecArray':
+        """Scale all vectors by a value.
+
+        Args:
+            v (float): The scale factor.
+
+        Returns:
+            VecArray: The scaled vectors.
+        """
+        return VecArray(self.arr * v)
+
+    def floor(self) -> 'VecArray':
+        """Apply the floor function to all vectors.
+
+        Returns:
+            VecArray: The floored vectors.
+        """
+        return VecArray(np.floor(self.arr))
+
+    def to_veci(self) -> 'VecArray':
+        """Round all vectors to ints, as `Vec.to_veci`.
+
+        Returns:
+            VecArray: The vectors of ints.
+        """
+        return VecArray(np.rint(self.arr).astype(np.int32))
+
+    def rotate(self,
+               rotation_matrix: npt.NDArray[np.float32]) -> 'VecArray':
+        """Rotate all vectors using a rotation matrix.
+
+        Args:
+            rotation_matrix (npt.NDArray[np.float32]): The rotation matrix.
+
+        Returns:
+            VecArray: The rotated vectors.
+        """
+        return VecArray(self.arr @ np.asarray(rotation_matrix).T)
+
+
 class Orientation(Enum):
     """Enum of different orientations. Values are the same used in the Space Engineer's API."""
     UP = Vec.v3i(0, 1, 0)
@@ -414,8 +549,8 @@ orientation_from_str = {
 }
 
 
-def orientation_from_vec(vec: Vec) -> Orientation:
-    """Get the orientation given its Vec.
+def _orientation_from_vec_components(vec: Vec) -> Orientation:
+    """Get the orientation given its Vec, by checking its components.
 
     Args:
         vec (Vec): The vector orientation.
@@ -450,11 +585,8 @@ def orientation_from_vec(vec: Vec) -> Orientation:
         raise ValueError(f'Vector {vec} is not a valid orientation vector.')
 
 
-character_camera_dist = Vec.v3f(0., 1.6369286, 0.)
-
-
-def get_rotation_matrix(forward: Vec,
-                        up: Vec) -> npt.NDArray[np.float32]:
+def _compute_rotation_matrix(forward: Vec,
+                             up: Vec) -> npt.NDArray[np.float32]:
     """Compute the rotation matrix from the forward and up vectors.
 
     Args:
@@ -472,6 +604,114 @@ def get_rotation_matrix(forward: Vec,
     return np.column_stack((x, y, -z))
 
 
+# Orientations by their vector, as tuple
+_orientations_from_tuples: Dict[Tuple[int, int, int], Orientation] = {o.value.as_tuple(): o for o in Orientation}
+# The 24 valid (forward, up) orientation pairs; the position in the list is the orientation code
+orientation_pairs: List[Tuple[Orientation, Orientation]] = [(of, ou) for of in Orientation for ou in Orientation if np.dot(of.value.as_array(), ou.value.as_array()) == 0]
+# Orientation codes by their (forward, up) vectors, as tuples
+_orientation_codes: Dict[Tuple[Tuple[int, int, int], Tuple[int, int, int]], int] = {(of.value.as_tuple(), ou.value.as_tuple()): code for code, (of, ou) in enumerate(orientation_pairs)}
+# Integer rotation matrices, indexed by orientation code
+rotation_matrices: npt.NDArray[np.int64] = np.stack([np.rint(_compute_rotation_matrix(forward=of.value, up=ou.value)).astype(np.int64) for of, ou in orientation_pairs])
+# Rotation matrices as computed by `_compute_rotation_matrix`, indexed by orientation code
+_float_rotation_matrices: List[npt.NDArray[np.float32]] = [_compute_rotation_matrix(forward=of.value, up=ou.value) for of, ou in orientation_pairs]
+for _m in _float_rotation_matrices:
+    _m.setflags(write=False)
+_codes_from_matrices: Dict[bytes, int] = {m.tobytes(): code for code, m in enumerate(rotation_matrices)}
+# Code of the inverse rotation, indexed by orientation code
+inverse_codes: List[int] = [_codes_from_matrices[m.T.copy().tobytes()] for m in rotation_matrices]
+# Code of the rotation `a` applied after the rotation `b`, as `composition_table[a][b]`
+composition_table: List[List[int]] = [[_codes_from_matrices[(ma @ mb).tobytes()] for mb in rotation_matrices] for ma in rotation_matrices]
+# Orientation obtained by rotating an orientation, as `_rotated_orientations[code][orientation]`
+_rotated_orientations: List[Dict[Orientation, Orientation]] = [{o: _orientations_from_tuples[tuple((m @ o.value.as_array()).tolist())] for o in Orientation} for m in rotation_matrices]
+
+
+def orientation_from_vec(vec: Vec) -> Orientation:
+    """Get the orientation given its Vec.
+
+    Args:
+        vec (Vec): The vector orientation.
+
+    Raises:
+        ValueError: Raised if the vector is not a valid orientation.
+
+    Returns:
+        Orientation: The corresponding orientation.
+    """
+    orientation = _orientations_from_tuples.get(vec.as_tuple(), None)
+    return orientation if orientation is not None else _orientation_from_vec_components(vec=vec)
+
+
+def orientation_code(forward: Vec,
+                     up: Vec) -> int:
+    """Get the orientation code of the forward and up vectors.
+
+    Args:
+        forward (Vec): The forward vector.
+        up (Vec): The up vector.
+
+    Raises:
+        ValueError: Raised if the vectors are not a valid orientation pair.
+
+    Returns:
+        int: The orientation code.
+    """
+    code = _orientation_codes.get((forward.as_tuple(), up.as_tuple()), None)
+    if code is None:
+        raise ValueError(f'Vectors {forward} and {up} are not a valid orientation pair.')
+    return code
+
+
+def rotation_code(matrix: npt.NDArray[np.int64]) -> int:
+    """Get the orientation code of an integer rotation matrix.
+
+    Args:
+        matrix (npt.NDArray[np.int64]): The rotation matrix.
+
+    Raises:
+        ValueError: Raised if the matrix is not one of the 24 rotations between orientations.
+
+    Returns:
+        int: The orientation code.
+    """
+    code = _codes_from_matrices.get(np.asarray(matrix, dtype=np.int64).tobytes(), None)
+    if code is None:
+        raise ValueError(f'Matrix {matrix.tolist()} is not a rotation between orientations.')
+    return code
+
+
+def rotate_orientation(code: int,
+                       orientation: Orientation) -> Orientation:
+    """Rotate an orientation by the rotation of an orientation code.
+
+    Args:
+        code (int): The orientation code.
+        orientation (Orientation): The orientation.
+
+    Returns:
+        Orientation: The rotated orientation.
+    """
+    return _rotated_orientations[code][orientation]
+
+
+character_camera_dist = Vec.v3f(0., 1.6369286, 0.)
+
+
+def get_rotation_matrix(forward: Vec,
+                        up: Vec) -> npt.NDArray[np.float32]:
+    """Compute the rotation matrix from the forward and up vectors.
+    Matrices of valid orientation pairs are precomputed and must not be modified.
+
+    Args:
+        forward (Vec): The forward vector.
+        up (Vec): The up vector.
+
+    Returns:
+        npt.NDArray[np.float32]: The rotation matrix.
+    """
+    code = _orientation_codes.get((forward.as_tuple(), up.as_tuple()), None)
+    return _float_rotation_matrices[code] if code is not None else _compute_rotation_matrix(forward=forward, up=up)
+
+
 def rotate(rotation_matrix: npt.NDArray[np.float32],
            vector: Vec) -> Vec:
     """Rotate a vector using a rotation matrix.
@@ -483,6 +723,8 @@ def rotate(rotation_matrix: npt.NDArray[np.float32],
     Returns:
         Vec: The rotated vector.
     """
-    v = vector.as_array()
-    v = np.dot(rotation_matrix, v)
-    return Vec.from_np(v)
+    (r00, r01, r02), (r10, r11, r12), (r20, r21, r22) = rotation_matrix.tolist()
+    x, y, z = vector.x, vector.y, vector.z
+    return Vec(x=r00 * x + r01 * y + r02 * z,
+               y=r10 * x + r11 * y + r12 * z,
+               z=r20 * x + r21 * y + r22 * z)
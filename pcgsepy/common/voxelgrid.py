@@ -0,0 +1,273 @@
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+
+# Side of the cubic chunks the grid is split into
+CHUNK_SIZE = 16
+
+# NumPy functions that `ChunkedVoxelGrid` implements without densifying
+_handled_functions: Dict[Callable, Callable] = {}
+
+
+def _implements(np_function: Callable) -> Callable:
+    """Register a function as the `ChunkedVoxelGrid` implementation of a NumPy function.
+
+    Args:
+        np_function (Callable): The NumPy function.
+
+    Returns:
+        Callable: The decorator.
+    """
+    def decorator(func: Callable) -> Callable:
+        _handled_functions[np_function] = func
+        return func
+    return decorator
+
+
+class ChunkedVoxelGrid:
+    __slots__ = ['shape', 'dtype', 'chunks']
+
+    def __init__(self,
+                 shape: Tuple[int, int, int],
+                 dtype: npt.DTypeLike = np.uint16) -> None:
+        """Create an empty sparse 3D grid. The grid is split in cubic chunks of `CHUNK_SIZE` cells and only chunks
+        with at least one non-zero cell are stored, so memory scales with the occupied cells instead of the volume.
+        The grid can be passed to `np.flip`, `np.array_equal`, `np.nonzero` and `np.count_nonzero`, while
+        `np.asarray` returns the equivalent dense array.
+
+        Args:
+            shape (Tuple[int, int, int]): The shape of the grid.
+            dtype (npt.DTypeLike, optional): The type of the cells. Defaults to `np.uint16`.
+        """
+        self.shape = tuple(int(s) for s in shape)
+        self.dtype = np.dtype(dtype)
+        self.chunks: Dict[Tuple[int, int, int], npt.NDArray[Any]] = {}
+
+    @classmethod
+    def from_cells(cls,
+                   shape: Tuple[int, int, int],
+                   cells: npt.NDArray[np.int64],
+                   values: npt.NDArray[Any],
+                   dtype: npt.DTypeLike = np.uint16) -> 'ChunkedVoxelGrid':
+        """Create a grid with the given cells set.
+
+        Args:
+            shape (Tuple[int, int, int]): The shape of the grid.
+            cells (npt.NDArray[np.int64]): The N×3 indices of the cells. Indices must be unique and within the shape.
+            values (npt.NDArray[Any]): The N values of the cells.
+            dtype (npt.DTypeLike, optional): The type of the cells. Defaults to `np.uint16`.
+
+        Returns:
+            ChunkedVoxelGrid: The grid.
+        """
+        grid = cls(shape=shape, dtype=dtype)
+        nonzero = values != 0
+        cells, values = cells[nonzero], values[nonzero]
+        if len(cells) > 0:
+            keys, local = np.divmod(cells, CHUNK_SIZE)
+            # group the cells by chunk using the flat index of the chunks
+            chunks_shape = tuple(-(-s // CHUNK_SIZE) for s in grid.shape)
+            flat_keys = np.ravel_multi_index(keys.T, chunks_shape)
+            order = np.argsort(flat_keys, kind='stable')
+            unique_keys, bounds = np.unique(flat_keys[order], return_index=True)
+            bounds = np.append(bounds, len(order))
+            for n, key in enumerate(zip(*np.unravel_index(unique_keys, chunks_shape))):
+                idxs = order[bounds[n]:bounds[n + 1]]
+                key = tuple(int(x) for x in key)
+                chunk = np.zeros(shape=(CHUNK_SIZE, CHUNK_SIZE, CHUNK_SIZE), dtype=grid.dtype)
+                chunk[tuple(local[idxs].T)] = values[idxs]
+                grid.chunks[key] = chunk
+        return grid
+
+    @classmethod
+    def from_dense(cls,
+                   arr: npt.NDArray[Any]) -> 'ChunkedVoxelGrid':
+        """Create a grid from a dense 3D array.
+
+        Args:
+            arr (npt.NDArray[Any]): The dense array.
+
+        Returns:
+            ChunkedVoxelGrid: The grid.
+        """
+        cells = np.argwhere(arr)
+        return cls.from_cells(shape=arr.shape,
+                              cells=cells,
+                              values=arr[tuple(cells.T)],
+                              dtype=arr.dtype)
+
+    def __repr__(self) -> str:
+        return f'ChunkedVoxelGrid(shape={self.shape}, dtype={self.dtype}, chunks={len(self.chunks)})'
+
+    @property
+    def ndim(self) -> int:
+        """Get the number of dimensions of the grid.
+
+        Returns:
+            int: The number of dimensions.
+        """
+        return len(self.shape)
+
+    @property
+    def size(self) -> int:
+        """Get the number of cells of the equivalent dense array.
+
+        Returns:
+            int: The number of cells.
+        """
+        return int(np.prod(self.shape))
+
+    @property
+    def nbytes(self) -> int:
+        """Get the memory used by the stored chunks.
+
+        Returns:
+            int: The number of bytes.
+        """
+        return sum(chunk.nbytes for chunk in self.chunks.values())
+
+    def items(self) -> Tuple[npt.NDArray[np.int64], npt.NDArray[Any]]:
+        """Get the non-zero cells and their values, in C order (as `np.nonzero` on the dense array).
+
+        Returns:
+            Tuple[npt.NDArray[np.int64], npt.NDArray[Any]]: The N×3 indices and the N values.
+        """
+        if not self.chunks:
+            return np.zeros(shape=(0, 3), dtype=np.int64), np.zeros(shape=0, dtype=self.dtype)
+        cells, values = [], []
+        for key, chunk in self.chunks.items():
+            local = np.argwhere(chunk)
+            cells.append(local + np.asarray(key) * CHUNK_SIZE)
+            values.append(chunk[tuple(local.T)])
+        cells, values = np.concatenate(cells), np.concatenate(values)
+        order = np.argsort(np.ravel_multi_index(cells.T, self.shape))
+        return cells[order], values[order]
+
+    def nonzero(self) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Get the indices of the non-zero cells, as `np.nonzero` on the dense array.
+
+        Returns:
+            Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]: The indices along each axis.
+        """
+        cells, _ = self.items()
+        return tuple(cells.T)
+
+    def count_nonzero(self) -> int:
+        """Count the non-zero cells.
+
+        Returns:
+            int: The number of non-zero cells.
+        """
+        return sum(int(np.count_nonzero(chunk)) for chunk in self.chunks.values())
+
+    def __getitem__(self,
+                    idx: Tuple[Union[int, npt.NDArray[np.int64]], ...]) -> Union[int, npt.NDArray[Any]]:
+        """Get the values of cells. Only (arrays of) integer indices are supported, slices are not.
+
+        Args:
+            idx (Tuple[Union[int, npt.NDArray[np.int64]], ...]): The indices along each axis.
+
+        Raises:
+            IndexError: Raised if an index is out of bounds.
+
+        Returns:
+            Union[int, npt.NDArray[Any]]: The value(s).
+        """
+        cells = np.stack(np.broadcast_arrays(*[np.asarray(i, dtype=np.int64) for i in idx]), axis=-1)
+        if np.any((cells < 0) | (cells >= self.shape)):
+            raise IndexError(f'Index {idx} is out of bounds for grid with shape {self.shape}')
+        keys, local = np.divmod(cells.reshape(-1, 3), CHUNK_SIZE)
+        values = np.zeros(shape=len(keys), dtype=self.dtype)
+        for n, (key, (i, j, k)) in enumerate(zip(map(tuple, keys.tolist()), local.tolist())):
+            chunk = self.chunks.get(key)
+            if chunk is not None:
+                values[n] = chunk[i, j, k]
+        values = values.reshape(cells.shape[:-1])
+        return values if values.ndim > 0 else values.item()
+
+    def flip(self,
+             axis: int) -> 'ChunkedVoxelGrid':
+        """Reverse the order of the cells along an axis.
+
+        Args:
+            axis (int): The axis.
+
+        Returns:
+            ChunkedVoxelGrid: The flipped grid.
+        """
+        cells, values = self.items()
+        cells[:, axis] = self.shape[axis] - 1 - cells[:, axis]
+        return ChunkedVoxelGrid.from_cells(shape=self.shape,
+                                           cells=cells,
+                                           values=values,
+                                           dtype=self.dtype)
+
+    def to_dense(self) -> npt.NDArray[Any]:
+        """Convert the grid to the equivalent dense array.
+
+        Returns:
+            npt.NDArray[Any]: The dense array.
+        """
+        arr = np.zeros(shape=self.shape, dtype=self.dtype)
+        for (i, j, k), chunk in self.chunks.items():
+            view = arr[i * CHUNK_SIZE:(i + 1) * CHUNK_SIZE, j * CHUNK_SIZE:(j + 1) * CHUNK_SIZE, k * CHUNK_SIZE:(k + 1) * CHUNK_SIZE]
+            view[...] = chunk[:view.shape[0], :view.shape[1], :view.shape[2]]
+        return arr
+
+    def __array__(self,
+                  dtype: Optional[npt.DTypeLike] = None) -> npt.NDArray[Any]:
+        arr = self.to_dense()
+        return arr if dtype is None else arr.astype(dtype)
+
+    def __array_function__(self,
+                           func: Callable,
+                           types: Tuple[type, ...],
+                           args: Tuple[Any, ...],
+                           kwargs: Dict[str, Any]) -> Any:
+        # any other NumPy function must densify explicitly via `np.asarray`
+        if func not in _handled_functions:
+            return NotImplemented
+        return _handled_functions[func](*args, **kwargs)
+
+
+@_implements(np.flip)
+def _flip(m: ChunkedVoxelGrid,
+          axis: Optional[int] = None) -> ChunkedVoxelGrid:
+    if axis is None:
+        for ax in range(m.ndim):
+            m = m.flip(axis=ax)
+        return m
+    return m.flip(axis=axis % m.ndim)
+
+
+@_implements(np.array_equal)
+def _array_equal(a1: Union[ChunkedVoxelGrid, npt.NDArray[Any]],
+                 a2: Union[ChunkedVoxelGrid, npt.NDArray[Any]],
+                 equal_nan: bool = False) -> bool:
+    if tuple(a1.shape) != tuple(a2.shape):
+        return False
+    cells1, values1 = a1.items() if isinstance(a1, ChunkedVoxelGrid) else ChunkedVoxelGrid.from_dense(arr=np.asarray(a1)).items()
+    cells2, values2 = a2.items() if isinstance(a2, ChunkedVoxelGrid) else ChunkedVoxelGrid.from_dense(arr=np.asarray(a2)).items()
+    return np.array_equal(cells1, cells2) and np.array_equal(values1, values2)
+
+
+@_implements(np.nonzero)
+def _nonzero(a: ChunkedVoxelGrid) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+    return a.nonzero()
+
+
+@_implements(np.count_nonzero)
+def _count_nonzero(a: ChunkedVoxelGrid,
+                   axis: Optional[int] = None,
+                   *,
+                   keepdims: bool = False) -> int:
+    if axis is not None:
+        raise NotImplementedError('ChunkedVoxelGrid only supports counting over the whole grid.')
+    return a.count_nonzero()
+
+
+@_implements(np.shape)
+def _shape(a: ChunkedVoxelGrid) -> Tuple[int, int, int]:
+    return a.shape
@@ -7,6 +7,8 @@ config.read(os.path.join(curr_dir, 'configs.ini'))
 
 USE_TORCH = config['LIBRARY'].getboolean('use_torch')
 ACTIVE_LOGGERS = [x for x in config['LIBRARY'].get('active_loggers').split(',')]
+# maximum number of cells of a dense structure array (larger structures use a sparse chunked grid)
+MAX_DENSE_VOXELS = config['LIBRARY'].getint('max_dense_voxels', fallback=16777216)
 
 HOST = config['API'].get('host')
 PORT = config['API'].getint('port')
@@ -25,6 +27,16 @@ REQ_TILES = config['L-SYSTEM'].get('req_tiles').split(',')
 N_ITERATIONS = config['L-SYSTEM'].getint('n_iterations')
 # number of axioms generated at each expansion step
 N_SPE = config['L-SYSTEM'].getint('n_axioms_generated')
+# number of module translations cached by the high-level to mid-level translator
+ML_CACHE_SIZE = config['L-SYSTEM'].getint('ml_cache_size', fallback=1024)
+# number of constraint results cached, by constraint and solution string or content
+CONSTRAINT_CACHE_SIZE = config['L-SYSTEM'].getint('constraint_cache_size', fallback=4096)
+# maximum number of strings kept after each expansion step (0 keeps all of them)
+BEAM_WIDTH = config['L-SYSTEM'].getint('beam_width', fallback=0)
+# policy used to choose the strings kept after each expansion step
+BEAM_POLICY = config['L-SYSTEM'].get('beam_policy', fallback='random')
+# whether structures stop being built at their first intersection, making the solution infeasible
+ABORT_ON_INTERSECTION = config['L-SYSTEM'].getboolean('abort_on_intersection', fallback=False)
 
 # initial mutation probability
 MUTATION_INITIAL_P = config['GENOPS'].getfloat('mutations_initial_p')
@@ -80,6 +92,8 @@ BIN_SMALLEST_PERC = config['MAPELITES'].getfloat('bin_min_resolution')
 USE_LINEAR_ESTIMATOR = config['MAPELITES'].getboolean('use_linear_estimator')
 
 N_EPOCHS = config['MAPELITES'].getint('n_epochs')
+# skip offspring whose content is the same as a solution already in the archive
+SKIP_DUPLICATE_CONTENT = config['MAPELITES'].getboolean('skip_duplicate_content', fallback=True)
 
 # number of experiments to run
 N_RUNS = config['EXPERIMENT'].getint('n_runs')
@@ -56,7 +56,7 @@ def box_filling_fitness(cs: CandidateSolution) -> float:
     Returns:
         float: The fitness value.
     """
-    return tovo_es.evaluate(sum([b.volume for b in cs.content._blocks.values()]) / math.prod(cs.content.as_array.shape))[0] / tovo_max
+    return tovo_es.evaluate(cs.content.stats.volume / math.prod(cs.content.as_array.shape))[0] / tovo_max
 
 
 def func_blocks_fitness(cs: CandidateSolution) -> float:
@@ -69,11 +69,8 @@ def func_blocks_fitness(cs: CandidateSolution) -> float:
     Returns:
         float: The fitness value.
     """
-    fu, to = 0., 0.
-    for b in cs.content._blocks.values():
-        fu += b.volume if not b.block_type.startswith('MyObjectBuilder_CubeBlock_') else 0
-        to += b.volume
-    return futo_es.evaluate(fu / to)[0] / futo_max
+    stats = cs.content.stats
+    return futo_es.evaluate(stats.functional_volume / stats.volume)[0] / futo_max
 
 
 def mame_fitness(cs: CandidateSolution) -> float:
@@ -4,11 +4,9 @@ from random import choices, random, sample
 import re
 from typing import List, Tuple
 
-import numpy as np
-from pcgsepy.common.regex_handler import MyMatch, extract_regex
+from pcgsepy.common.regex_handler import CompiledRules
 from pcgsepy.common.str_utils import get_matching_brackets
-from pcgsepy.config import (CROSSOVER_P, MUTATION_DECAY, MUTATION_INITIAL_P,
-                            PL_HIGH, PL_LOW)
+from pcgsepy.config import CROSSOVER_P, MUTATION_DECAY, MUTATION_INITIAL_P
 from pcgsepy.lsystem.rules import StochasticRules
 from pcgsepy.lsystem.solution import CandidateSolution, string_merging
 
@@ -48,7 +46,7 @@ def roulette_wheel_selection(pop: List[CandidateSolution],
 class SimplifiedExpander:
     def __init__(self):
         self.rules: StochasticRules = None
-        self.compiled_lhs = None
+        self.compiled_rules: CompiledRules = None
 
     def initialize(self,
                    rules: StochasticRules):
@@ -58,7 +56,7 @@ class SimplifiedExpander:
             rules (StochasticRules): The set of expansion rules.
         """
         self.rules = rules
-        self.compiled_lhs = [extract_regex(lhs) for lhs in rules.get_lhs()]
+        self.compiled_rules = CompiledRules(lhs=rules.get_lhs())
 
 
 # module-scoped uninitialized variable
@@ -89,41 +87,20 @@ def mutate(cs: CandidateSolution,
             # ->
             # ...[RotYccwZ [RotYcwX corridorsimple] corridorsimple][RotYcwZ [RotYcwX corridorsimple] corridorsimple]...
             # get all matches with regex
-            matches: List[MyMatch] = []
-            for r, rule in zip(expander.compiled_lhs, expander.rules.get_lhs()):
-                matches.extend([MyMatch(lhs=rule,
-                                        span=match.span(),
-                                        lhs_string=match.group()) for match in r.finditer(string=cs.hls_mod[module]['string'])])
+            matches = expander.compiled_rules.matches(string=cs.hls_mod[module]['string'])
             logging.getLogger('genops').debug(f'[{__name__}.mutate] {len(matches)=}')
-            # sort matches in-place
-            matches.sort()
             if matches:
-                # filter out matches
-                filtered_matches = [matches[0]]
-                for match in matches:
-                    logging.getLogger('genops').debug(f'[{__name__}.mutate] {match=}; {filtered_matches=}')
-                    if match.start != filtered_matches[-1].start:
-                        filtered_matches.append(match)
-                        logging.getLogger('genops').debug(f'[{__name__}.mutate] {match=} appended')
                 p = max(MUTATION_INITIAL_P / math.exp(n_iteration * MUTATION_DECAY), 0)
-                to_mutate = math.ceil(p * len(filtered_matches))
-                for_mutation = sample(population=filtered_matches,
+                to_mutate = math.ceil(p * len(matches))
+                for_mutation = sample(population=matches,
                                       k=to_mutate)
                 for_mutation = sorted(for_mutation)
                 logging.getLogger('genops').debug(f'[{__name__}.mutate] {p=}; {to_mutate=} {len(for_mutation)=}')
                 offset = 0
                 for match in for_mutation:
-                    rhs = expander.rules.get_rhs(lhs=match.lhs)
-                    # update numerical parameters
-                    if '(x)' in rhs or '(X)' in rhs or '(Y)' in rhs:
-                        n = [m for m in re.compile(r'\d').finditer(match.lhs_string)]
-                        n = int(n[0].group()) if n else None
-                        # update rhs to include parameters
-                        rhs = rhs.replace('(x)', f'({n})')
-                        rhs_n = np.random.randint(PL_LOW, PL_HIGH)
-                        rhs = rhs.replace('(X)', f'({rhs_n})')
-                        if n is not None:
-                            rhs = rhs.replace('(Y)', f'({max(1, n - rhs_n)})')
+                    rhs = expander.compiled_rules.fill_parameters(rhs=expander.rules.get_rhs(lhs=match.lhs),
+                                                                  lhs_string=match.lhs_string,
+                                                                  rng=expander.rules.rng)
                     # apply expansion in string
                     cs.hls_mod[module]['string'] = cs.hls_mod[module]['string'][:match.start + offset] + rhs + cs.hls_mod[module]['string'][match.end + offset:]
                     offset += len(rhs) - len(match.lhs_string)
@@ -69,20 +69,24 @@ class FI2PopSolver:
         self.lsystem.disable_sat_check()
         with trange(n_retries, desc='FI-2Pop populations initialization ') as iterations:
             for i in iterations:
-                solutions = self.lsystem.apply_rules(starting_strings=['head', 'body', 'tail'],
-                                                     iterations=[1, N_ITERATIONS, 1],
-                                                     create_structures=False,
-                                                     make_graph=False)
-                subdivide_solutions(lcs=solutions,
-                                    lsystem=self.lsystem)
-                for cs in solutions:
-                    if cs.is_feasible and len(feasible_pop) < pops_size and cs not in feasible_pop:
-                        feasible_pop.append(cs)
-                        cs.fitness = self._compute_fitness(cs=cs)
-                        cs.c_fitness = sum(cs.fitness) + (self.nsc - cs.ncv)
-                    elif not cs.is_feasible and len(infeasible_pop) < pops_size and cs not in feasible_pop:
-                        cs.c_fitness = cs.ncv
-                        infeasible_pop.append(cs)
+                for cs in self.lsystem.iter_solutions(starting_strings=['head', 'body', 'tail'],
+                                                      iterations=[1, N_ITERATIONS, 1],
+                                                      create_structures=False,
+                                                      make_graph=False):
+                    solutions = [cs]
+                    subdivide_solutions(lcs=solutions,
+                                        lsystem=self.lsystem)
+                    for cs in solutions:
+                        if cs.is_feasible and len(feasible_pop) < pops_size and cs not in feasible_pop:
+                            feasible_pop.append(cs)
+                            cs.fitness = self._compute_fitness(cs=cs)
+                            cs.c_fitness = sum(cs.fitness) + (self.nsc - cs.ncv)
+                        elif not cs.is_feasible and len(infeasible_pop) < pops_size and cs not in feasible_pop:
+                            cs.c_fitness = cs.ncv
+                            infeasible_pop.append(cs)
+                    # stop expanding once both populations are full
+                    if len(feasible_pop) == pops_size and len(infeasible_pop) == pops_size:
+                        break
                 iterations.set_postfix(ordered_dict={'fpop-size': f'{len(feasible_pop)}/{pops_size}',
                                                      'ipop-size': f'{len(infeasible_pop)}/{pops_size}'},
                                        refresh=True)
@@ -6,7 +6,8 @@ import numpy as np
 from pcgsepy.config import GEN_PATIENCE, MAX_STRING_LEN, POP_SIZE
 from pcgsepy.evo.genops import (EvoException, crossover, mutate,
                                 roulette_wheel_selection)
-from pcgsepy.lsystem.constraints import ConstraintLevel, ConstraintTime
+from pcgsepy.lsystem.constraints import (ConstraintLevel, ConstraintTime,
+                                         constraint_cache_stats)
 from pcgsepy.lsystem.lsystem import LSystem
 from pcgsepy.lsystem.solution import CandidateSolution
 from pcgsepy.structure import IntersectionException
@@ -23,11 +24,14 @@ def subdivide_solutions(lcs: List[CandidateSolution],
     """
     lsystem.hl_solver.set_constraints(cs=lsystem.all_hl_constraints)
     lsystem.ll_solver.set_constraints(cs=lsystem.all_ll_constraints)
-    removable = []
     logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] Initial {len(lcs)=}.')
-    for i, cs in enumerate(lcs):
+    for cs in lcs:
+        if not cs.is_feasible and cs.content.has_intersections:
+            # the structure stopped being built at its first intersection, so its content is partial
+            logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] {cs.string} is infeasible: aborted on intersection.')
+            cs.ncv += 1
+            continue
         try:
-            _ = cs.content.as_array
             for t in [ConstraintTime.DURING, ConstraintTime.END]:
                 sat = lsystem.hl_solver._check_constraints(cs=cs,
                                                            when=t,
@@ -44,14 +48,10 @@ def subdivide_solutions(lcs: List[CandidateSolution],
                     cs.ncv += sat[ConstraintLevel.HARD_CONSTRAINT][1]
                     cs.ncv += sat[ConstraintLevel.SOFT_CONSTRAINT][1]
         except IntersectionException:
-            logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] {cs.string} removed: intersection.')
-            pass
-        except (MemoryError, np.core._exceptions._ArrayMemoryError) as e:
-            logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] {cs.string} removed: too large ({type(e).__name__}).')
-            removable.append(i)
-    for i in list(reversed(removable)):
-        lcs.pop(i)
+            logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] {cs.string} is infeasible: intersection.')
+            cs.is_feasible = False
     logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] Final {len(lcs)=}.')
+    logging.getLogger('fi2pop').debug(f'[{__name__}.subdivide_solutions] Constraint results cache: {constraint_cache_stats()}.')
 
 
 def create_new_pool(population: List[CandidateSolution],
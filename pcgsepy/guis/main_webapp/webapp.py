@@ -23,7 +23,7 @@ import numpy as np
 import plotly.graph_objects as go
 from dash import ALL, dcc, html
 from dash.dependencies import Input, Output, State
-from pcgsepy.common.api_call import block_definitions
+from pcgsepy.common.api_call import block_types
 from pcgsepy.common.jsonifier import json_dumps
 from pcgsepy.common.vecs import Vec
 from pcgsepy.config import (MY_EMITTERS, N_GENS_ALLOWED)
@@ -1945,12 +1945,10 @@ def _get_elite_content(mapelites: MAPElites,
         fig = go.Figure()
 
         cs = [content[i, j, k] for i, j, k in zip(x, y, z)]
-        unique_blocks = {v: structure._clean_label(
-            list(block_definitions.keys())[v - 1]) for v in cs}
+        unique_blocks = {v: block_types.clean_label[v - 1] for v in cs}
 
         if not show_voxel:
-            ss = [structure._clean_label(
-                list(block_definitions.keys())[v - 1]) for v in cs]
+            ss = [block_types.clean_label[v - 1] for v in cs]
             custom_colors = []
             for (i, j, k) in zip(x, y, z):
                 b = structure._blocks[(
@@ -1994,10 +1992,8 @@ def _get_elite_content(mapelites: MAPElites,
 
             # add voxel plot
             voxels = VoxelData(opaque_blocks)
-            ss = [structure._clean_label(list(block_definitions.keys())[
-                                         v - 1]) for v in voxels.intensities]
-            indices = {structure._clean_label(
-                n): i + 1 for i, n in enumerate(list(block_definitions.keys()))}
+            ss = [block_types.clean_label[v - 1] for v in voxels.intensities]
+            indices = {n: i + 1 for i, n in enumerate(block_types.clean_label)}
             custom_colors = {}
             for k, v in block_to_colour.items():
                 if k in indices:
@@ -2029,10 +2025,8 @@ def _get_elite_content(mapelites: MAPElites,
                                              fresnel=0.25))
 
             voxels = VoxelData(transparent_blocks)
-            ss = [structure._clean_label(list(block_definitions.keys())[
-                                         v - 1]) for v in voxels.intensities]
-            indices = {structure._clean_label(
-                n): i + 1 for i, n in enumerate(list(block_definitions.keys()))}
+            ss = [block_types.clean_label[v - 1] for v in voxels.intensities]
+            indices = {n: i + 1 for i, n in enumerate(block_types.clean_label)}
             custom_colors = {}
             for k, v in block_to_colour.items():
                 if k in indices:
@@ -13,7 +13,7 @@ import plotly.express as px
 import plotly.graph_objects as go
 from dash import ALL, dcc, html
 from dash.dependencies import Input, Output, State
-from pcgsepy.common.api_call import block_definitions
+from pcgsepy.common.api_call import block_types
 from pcgsepy.common.vecs import Vec
 from pcgsepy.evo.genops import expander
 from pcgsepy.guis.ships_comparator.modals_msgs import (rankings_assigned,
@@ -208,7 +208,7 @@ def get_content_plot(spaceship: CandidateSolution) -> go.Figure:
     arr = np.nonzero(content)
     x, y, z = arr
     cs = [content[i, j, k] for i, j, k in zip(x, y, z)]
-    ss = [spaceship.content._clean_label(list(block_definitions.keys())[v - 1]) for v in cs]
+    ss = [block_types.clean_label[v - 1] for v in cs]
     custom_colors = []
     for (i, j, k) in zip(x, y, z):
         b = spaceship.content._blocks[(i * spaceship.content.grid_size, j * spaceship.content.grid_size, k * spaceship.content.grid_size)]
@@ -1,13 +1,15 @@
 import logging
 from scipy.spatial import ConvexHull, Delaunay
-from scipy.ndimage import grey_erosion, binary_erosion, binary_dilation
+from scipy.ndimage import grey_erosion, binary_erosion, binary_dilation, label
 import numpy as np
 import numpy.typing as npt
 from pcgsepy.common.str_utils import get_matching_brackets
-from pcgsepy.common.vecs import Orientation, Vec, orientation_from_vec
+from pcgsepy.common.vecs import (Orientation, Vec, VecArray, inverse_codes,
+                                 orientation_code, orientation_from_vec,
+                                 rotate_orientation)
 from pcgsepy.structure import Block, Structure, MountPoint
 from typing import List, Optional, Tuple
-from itertools import product
+from itertools import chain, product
 from pcgsepy.common.vecs import rotate, get_rotation_matrix
 from enum import IntEnum
 
@@ -33,6 +35,7 @@ block_value_types = {
 
 _orientations = [Orientation.FORWARD, Orientation.BACKWARD, Orientation.UP, Orientation.DOWN, Orientation.LEFT, Orientation.RIGHT]
 _valid_orientations = [(of, ou) for (of, ou) in list(product(_orientations, _orientations)) if of != ou and of != orientation_from_vec(ou.value.opposite())]
+_valid_orientations_idxs = {oo: i for i, oo in enumerate(_valid_orientations)}
 # _smoothing_order = {
 #     BlockValue.BASE_BLOCK: [BlockValue.SLOPE_BLOCK, BlockValue.CORNERSQUARE_BLOCK, BlockValue.CORNER_BLOCK],
 #     BlockValue.CORNERSQUAREINV_BLOCK: [],
@@ -170,24 +173,29 @@ class HullBuilder:
         return not self._exists_block(idx=loc.as_tuple(), structure=structure) and\
             (self._within_hull(loc=loc.scale(1 / structure.grid_size).to_veci(), hull=hull) and hull[loc.scale(1 / structure.grid_size).to_veci().as_tuple()] == BlockValue.AIR_BLOCK)
     
-    def _next_to_target(self,
-                        loc: Vec,
-                        structure: Structure,
-                        direction: Vec) -> bool:
-        """Check if the block is next to a target block along a direction.
+    def _next_to_targets(self,
+                         locs: VecArray,
+                         structure: Structure,
+                         direction: Vec) -> npt.NDArray[np.bool8]:
+        """Check which blocks are next to a target block along a direction.
 
         Args:
-            loc (Vec): The index to check at.
+            locs (VecArray): The indices to check at.
             structure (Structure): The structure.
             direction (Vec): The direction to check at.
 
         Returns:
-            bool: Whether the block is next to a target block.
+            npt.NDArray[np.bool8]: Whether each block is next to a target block.
         """
-        dloc = loc.sum(direction)
-        if self._exists_block(idx=dloc.as_tuple(), structure=structure):
-            obs_block = structure._blocks.get(dloc.as_tuple())
-            return any([target.lower() in obs_block.block_type.lower() for target in self.obstruction_targets])
+        is_target = {}
+        ntts = np.zeros(shape=len(locs), dtype=np.bool8)
+        for n, dloc in enumerate(locs.sum(direction).as_tuples()):
+            obs_block = structure._blocks.get(dloc, None)
+            if obs_block is not None:
+                if obs_block.block_type not in is_target:
+                    is_target[obs_block.block_type] = any([target.lower() in obs_block.block_type.lower() for target in self.obstruction_targets])
+                ntts[n] = is_target[obs_block.block_type]
+        return ntts
     
     def _remove_in_direction(self,
                              loc: Vec,
@@ -228,19 +236,21 @@ class HullBuilder:
             npt.NDArray[np.float32]: The modified hull array.
         """
         scale = structure.grid_size
-        for (i, j, k) in list(self._blocks_set.keys()):
+        idxs = list(self._blocks_set.keys())
+        # the structure is not modified here, so obstructions are checked for all blocks at once
+        locs = VecArray.from_tuples(idxs).scale(scale)
+        ntts = [self._next_to_targets(locs=locs,
+                                      structure=structure,
+                                      direction=direction.value.scale(scale)) for direction in _orientations]
+        for n, (i, j, k) in enumerate(idxs):
             if hull[i, j, k] != BlockValue.AIR_BLOCK:  # skip removed blocks
-                loc = Vec.from_tuple((scale * i, scale * j, scale * k))
-                for direction in _orientations:
-                    ntt = self._next_to_target(loc=loc,
-                                               structure=structure,
-                                               direction=direction.value.scale(scale))
-                    if ntt:
+                for direction, ntt in zip(_orientations, ntts):
+                    if ntt[n]:
                         hull[i, j, k] = BlockValue.AIR_BLOCK
                         self._blocks_set.pop((i, j, k))
-                        hull = self._remove_in_direction(loc=loc.scale(v=1 / structure.grid_size).to_veci(),
-                                                            hull=hull,
-                                                            direction=direction.value.opposite())
+                        hull = self._remove_in_direction(loc=Vec.v3i(i, j, k),
+                                                         hull=hull,
+                                                         direction=direction.value.opposite())
                         break
         return hull
     
@@ -260,7 +270,6 @@ class HullBuilder:
             npt.NDArray[np.float32]: The modified hull array.
         """
         structure_arr = structure.as_grid_array
-        structure_shape = Vec.from_tuple(structure_arr.shape)
         # mask of all blocks
         mask = np.zeros_like(structure_arr, dtype=np.uint8)
         mask[np.nonzero(hull)] = BlockValue.BASE_BLOCK
@@ -268,20 +277,12 @@ class HullBuilder:
         # pivot position defines the region to keep
         pivot_position = [x for x in structure._blocks.values() if x.block_type == pivot_blocktype][0].position
         pivot_idx = pivot_position.scale(1 / structure.grid_size).to_veci().as_tuple()
-        # get the region to keep defined by blocks connected to pivot position
-        connected_blocks = set()
-        to_check = [pivot_idx]
-        while to_check:
-            to_add = set()
-            for block_position in to_check:
-                if mask[block_position] == BlockValue.BASE_BLOCK:
-                    connected_blocks.add(block_position)
-                    for direction in _orientations:
-                        dpos = Vec.from_tuple(block_position).sum(direction.value)
-                        if 0 <= dpos.x < structure_shape.x and 0 <= dpos.y < structure_shape.y and 0 <= dpos.z < structure_shape.z:
-                            to_add.add(dpos.as_tuple())
-            to_add = to_add.difference(to_add.intersection(connected_blocks))
-            to_check = list(to_add)
+        # get the region to keep defined by blocks connected to pivot position (face-connected components)
+        components, _ = label(mask == BlockValue.BASE_BLOCK)
+        if mask[pivot_idx] == BlockValue.BASE_BLOCK:
+            connected_blocks = set(VecArray(np.argwhere(components == components[pivot_idx])).as_tuples())
+        else:
+            connected_blocks = set()
         # disconnected blocks are the difference between all blocks and blocks connected to pivot block
         disconnected_blocks = set(self._blocks_set.keys()) - connected_blocks
         # remove disconnected blocks
@@ -305,12 +306,10 @@ class HullBuilder:
             Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], npt.NDArray[np.int64]]: The indices of the outer blocks.
         """
         n_neighbours = np.zeros_like(arr)
-        for idx, _ in np.ndenumerate(arr):
-            if self._blocks_set.get(idx, None):
-                for offset in _orientations:
-                    pos = Vec.from_tuple(idx).sum(offset.value).as_tuple()
-                    if self._blocks_set.get(pos, None):
-                        n_neighbours[idx] = n_neighbours[idx] + 1
+        if self._blocks_set:
+            idxs = VecArray.from_tuples(self._blocks_set.keys())
+            for offset in _orientations:
+                n_neighbours[tuple(idxs.arr.T)] += [pos in self._blocks_set for pos in idxs.sum(offset.value).as_tuples()]
         if corners_only:
             return np.nonzero(np.where(n_neighbours < 2, n_neighbours, 0))
         elif edges_only:
@@ -494,7 +493,10 @@ class HullBuilder:
         """
         rot_mat = get_rotation_matrix(forward=block.orientation_forward,
                                       up=block.orientation_up)
-        mp1 = [mp for mp in block.mountpoints if rotate(rot_mat, mp.face) == direction.value]
+        # a mountpoint faces `direction` once rotated if its face is `direction` rotated back
+        inv_code = inverse_codes[orientation_code(forward=block.orientation_forward,
+                                                  up=block.orientation_up)]
+        mp1 = [mp for mp in block.mountpoints if mp.face == rotate_orientation(code=inv_code, orientation=direction).value]
         starts1, ends1, planes1 = self._get_mountpoint_limits(mountpoints=mp1,
                                                               block_center=block.center,
                                                               rotation_matrix=rot_mat)
@@ -504,7 +506,7 @@ class HullBuilder:
         opposite_direction = orientation_from_vec(direction.value.opposite())
         if other_block is None:
             if mp1 == []:
-                mp2 = [mp for mp in block.mountpoints if rotate(rot_mat, mp.face) == opposite_direction.value]
+                mp2 = [mp for mp in block.mountpoints if mp.face == rotate_orientation(code=inv_code, orientation=opposite_direction).value]
                 _, _, planes2 = self._get_mountpoint_limits(mountpoints=mp2,
                                                             block_center=block.center,
                                                             rotation_matrix=rot_mat)
@@ -518,7 +520,9 @@ class HullBuilder:
             else:
                 rot_mat_other = get_rotation_matrix(forward=other_block.orientation_forward,
                                                     up=other_block.orientation_up)
-                mp2 = [mp for mp in other_block.mountpoints if rotate(rot_mat_other, mp.face) == opposite_direction.value]
+                inv_code_other = inverse_codes[orientation_code(forward=other_block.orientation_forward,
+                                                                up=other_block.orientation_up)]
+                mp2 = [mp for mp in other_block.mountpoints if mp.face == rotate_orientation(code=inv_code_other, orientation=opposite_direction).value]
                 if mp2 == []:
                     return False, 0
                 starts2, ends2, planes2 = self._get_mountpoint_limits(mountpoints=mp2,
@@ -599,7 +603,7 @@ class HullBuilder:
             for other_block in neighbourhood:                
                 oo = (orientation_from_vec(other_block.orientation_forward),
                         orientation_from_vec(other_block.orientation_up))
-                priority_scores[_valid_orientations.index(oo)] = priority_scores[_valid_orientations.index(oo)] + (1 if other_block.block_type == block_type else 0)
+                priority_scores[_valid_orientations_idxs[oo]] = priority_scores[_valid_orientations_idxs[oo]] + (1 if other_block.block_type == block_type else 0)
             idxs = [x for _, x in sorted(zip(priority_scores, np.arange(len(_valid_orientations)).tolist()))]
             priority_orientations = [_valid_orientations[i] for i in idxs]
             for possible_type in _smoothing_order[block_type]:
@@ -662,13 +666,13 @@ class HullBuilder:
         logging.getLogger('hullbuilder').debug(f'[{__name__}.add_external_hull] Applied erosion.')
                 
         # add blocks to self._blocks_set
-        for (i, j, k), _ in np.ndenumerate(hull):
-            if hull[i, j, k] != BlockValue.AIR_BLOCK:
-                self._add_block(block_type=self.base_block,
-                                idx=(i, j, k),
-                                pos=Vec.v3i(i, j, k).scale(v=structure.grid_size),
-                                orientation_forward=Orientation.FORWARD,
-                                orientation_up=Orientation.UP)
+        idxs = VecArray(np.argwhere(hull != BlockValue.AIR_BLOCK))
+        for idx, pos in zip(idxs.as_tuples(), idxs.scale(v=structure.grid_size).as_vecs()):
+            self._add_block(block_type=self.base_block,
+                            idx=idx,
+                            pos=pos,
+                            orientation_forward=Orientation.FORWARD,
+                            orientation_up=Orientation.UP)
         
         # remove all blocks that obstruct target block type
         hull = self._remove_obstructing_blocks(hull=hull,
@@ -682,14 +686,16 @@ class HullBuilder:
         logging.getLogger('hullbuilder').debug(f'[{__name__}.add_external_hull] Removed non-connected blocks.')
 
         # replace structure's blocks if adjacent to hull
-        for idx in self._blocks_set.keys():
-            for direction in _orientations:
-                new_idx = Vec.from_tuple(idx).sum(direction.value).scale(structure.grid_size).as_tuple()
-                if new_idx in structure._blocks.keys():
-                    curr_block = structure._blocks[new_idx]
-                    structure._blocks[new_idx] = Block(block_type=block_value_types[BlockValue.BASE_BLOCK],
-                                                       orientation_forward=orientation_from_vec(curr_block.orientation_forward),
-                                                       orientation_up=orientation_from_vec(curr_block.orientation_up))
+        idxs = VecArray.from_tuples(self._blocks_set.keys())
+        adjs = [idxs.sum(direction.value).scale(structure.grid_size).as_tuples() for direction in _orientations]
+        # replacing a block twice yields the same block, so each adjacent block is replaced once
+        for new_idx in dict.fromkeys(chain.from_iterable(zip(*adjs))):
+            if new_idx in structure._blocks.keys():
+                curr_block = structure._blocks[new_idx]
+                structure.replace_block(block=Block(block_type=block_value_types[BlockValue.BASE_BLOCK],
+                                                    orientation_forward=orientation_from_vec(curr_block.orientation_forward),
+                                                    orientation_up=orientation_from_vec(curr_block.orientation_up)),
+                                        grid_position=new_idx)
         logging.getLogger('hullbuilder').debug(f'[{__name__}.add_external_hull] Replaced existing adjacent structure blocks.')
         
         # apply iterative smoothing algorithm
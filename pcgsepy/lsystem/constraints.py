@@ -1,6 +1,9 @@
+import time
 from enum import IntEnum, auto
-from typing import Any, Callable, Dict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
 
+from pcgsepy.common.cache import LRUCache
+from pcgsepy.config import CONSTRAINT_CACHE_SIZE
 from pcgsepy.lsystem.constraints_funcs import *
 from pcgsepy.lsystem.solution import CandidateSolution
 
@@ -12,6 +15,34 @@ constraint_funcs = {
     'axis_constraint': axis_constraint,
 }
 
+# Estimated relative cost of each constraint function and whether it needs the solution content
+constraint_costs: Dict[str, Tuple[float, bool]] = {
+    'components_constraint': (1., False),
+    'intersection_constraint': (10., True),
+    'axis_constraint': (20., True),
+    'symmetry_constraint': (100., True),
+}
+# Cost and content requirement assumed for functions not in `constraint_costs`
+_default_cost = (100., True)
+
+# Results of the constraints, shared by all solvers and evolution loops
+constraint_results = LRUCache(max_size=CONSTRAINT_CACHE_SIZE)
+
+
+def constraint_cache_stats() -> Dict[str, float]:
+    """Get the statistics of the constraint results cache.
+
+    Returns:
+        Dict[str, float]: The number of cached results, hits and misses, and the hit rate.
+    """
+    n = constraint_results.hits + constraint_results.misses
+    return {
+        'size': len(constraint_results),
+        'hits': constraint_results.hits,
+        'misses': constraint_results.misses,
+        'hit_rate': constraint_results.hits / n if n else 0.
+    }
+
 
 class ConstraintLevel(IntEnum):
     SOFT_CONSTRAINT = auto()
@@ -31,17 +62,109 @@ class ConstraintHandler:
                  when: ConstraintTime,
                  f: Callable[[CandidateSolution, Dict[str, Any]], bool],
                  extra_args: Dict[str, Any],
-                 needs_ll: bool = False):
+                 needs_ll: bool = False,
+                 cost: Optional[float] = None,
+                 needs_content: Optional[bool] = None):
+        """Create a constraint.
+
+        Args:
+            name (str): The name of the constraint.
+            level (ConstraintLevel): The level of the constraint.
+            when (ConstraintTime): When the constraint is checked.
+            f (Callable[[CandidateSolution, Dict[str, Any]], bool]): The constraint function.
+            extra_args (Dict[str, Any]): The extra arguments of the constraint function.
+            needs_ll (bool, optional): Whether the constraint needs the low-level string. Defaults to False.
+            cost (Optional[float], optional): The estimated relative cost of the constraint, used to check cheaper
+            constraints first. Defaults to the cost of `f` in `constraint_costs`.
+            needs_content (Optional[bool], optional): Whether the constraint needs the solution content. Defaults to
+            the requirement of `f` in `constraint_costs`.
+        """
         self.name = name
         self.level = level
         self.when = when
         self.needs_ll = needs_ll
         self.constraint = f
         self.extra_args = extra_args
+        default_cost, default_needs_content = constraint_costs.get(f.__name__, _default_cost)
+        self.cost = default_cost if cost is None else cost
+        self.needs_content = default_needs_content if needs_content is None else needs_content
+        self._args_hash: Optional[int] = None
+        self.reset_stats()
 
     def __repr__(self) -> str:
         return str(self.__dict__)
 
+    def _cache_key(self,
+                   cs: CandidateSolution) -> Optional[Hashable]:
+        """Get the key of the result of the constraint on a solution in `constraint_results`.
+        Constraints on the content are keyed by its fingerprint, so solutions with different strings but the same
+        blocks share the result; blocks placed over others are part of the fingerprint, as they are not in the content.
+
+        Args:
+            cs (CandidateSolution): The solution.
+
+        Returns:
+            Optional[Hashable]: The key, or `None` if the constraint needs the content and the solution has none.
+        """
+        if self._args_hash is None:
+            self._args_hash = hash(str(self.extra_args))
+        if self.needs_content:
+            if cs._content is None:
+                return None
+            fingerprint = (cs._content.content_hash, cs._content._has_intersections is True)
+        else:
+            fingerprint = cs.string
+        return self.name, self.constraint.__name__, self._args_hash, fingerprint
+
+    def evaluate(self,
+                 cs: CandidateSolution) -> bool:
+        """Check the constraint on a solution, updating the evaluations, rejections and time counters.
+        Results are cached in `constraint_results`; `extra_args` must not change once the constraint is evaluated.
+
+        Args:
+            cs (CandidateSolution): The solution.
+
+        Returns:
+            bool: Whether the solution satisfies the constraint.
+        """
+        key = self._cache_key(cs=cs)
+        sat = constraint_results.get(key) if key is not None else None
+        if sat is not None:
+            self.n_cache_hits += 1
+        else:
+            start = time.perf_counter()
+            sat = self.constraint(cs=cs,
+                                  extra_args=self.extra_args)
+            self.time += time.perf_counter() - start
+            self.n_evaluations += 1
+            if key is not None:
+                constraint_results.put(key, sat)
+        self.n_rejections += 0 if sat else 1
+        return sat
+
+    def reset_stats(self) -> None:
+        """Reset the evaluations, rejections, cache hits and time counters."""
+        self.n_evaluations = 0
+        self.n_cache_hits = 0
+        self.n_rejections = 0
+        self.time = 0.
+
+    @property
+    def stats(self) -> Dict[str, float]:
+        """Get the counters of the constraint, to tune its cost.
+
+        Returns:
+            Dict[str, float]: The number of evaluations (excluding cached results), cache hits and rejections, the
+            total and mean evaluation time (in seconds).
+        """
+        return {
+            'evaluations': self.n_evaluations,
+            'cache_hits': self.n_cache_hits,
+            'rejections': self.n_rejections,
+            'time': self.time,
+            'mean_time': self.time / self.n_evaluations if self.n_evaluations else 0.
+        }
+
     def __str__(self) -> str:
         return f'Constraint {self.name} ({self.level.name}) at {self.when.name}'
 
@@ -59,7 +182,9 @@ class ConstraintHandler:
             'when': self.when.value,
             'needs_ll': self.needs_ll,
             'constraint': self.constraint.__name__,
-            'extra_args': self.extra_args
+            'extra_args': self.extra_args,
+            'cost': self.cost,
+            'needs_content': self.needs_content
         }
 
     @staticmethod
@@ -69,4 +194,6 @@ class ConstraintHandler:
                                  when=ConstraintTime(my_args['when']),
                                  f=constraint_funcs[my_args['constraint']],
                                  extra_args=my_args['extra_args'],
-                                 needs_ll=my_args['needs_ll'])
+                                 needs_ll=my_args['needs_ll'],
+                                 cost=my_args.get('cost', None),
+                                 needs_content=my_args.get('needs_content', None))
@@ -1,6 +1,7 @@
+import logging
 from typing import Any, Dict
 
-import numpy as np
+from pcgsepy.common.symmetry import is_mirror_symmetric
 from pcgsepy.config import MAME_MEAN, MAME_STD, MAMI_MEAN, MAMI_STD
 from pcgsepy.lsystem.solution import CandidateSolution
 
@@ -21,16 +22,20 @@ def intersection_constraint(cs: CandidateSolution,
 
 def symmetry_constraint(cs: CandidateSolution,
                         extra_args: Dict[str, Any]) -> bool:
-    structure = cs.content.as_array
-    is_symmetric = False
-    for dim in range(3):
-        is_symmetric |= np.array_equal(structure, np.flip(structure, axis=dim))
-    return is_symmetric
+    try:
+        return is_mirror_symmetric(arr=cs.content.as_array)
+    except MemoryError as e:
+        logging.getLogger('constraints').debug(f'[{__name__}.symmetry_constraint] {cs.string} is not satisfied: too large ({type(e).__name__}).')
+        return False
 
 
 def axis_constraint(cs: CandidateSolution,
                     extra_args: Dict[str, Any]) -> bool:
-    volume = cs.content.as_array.shape
+    try:
+        volume = cs.content.as_array.shape
+    except MemoryError as e:
+        logging.getLogger('constraints').debug(f'[{__name__}.axis_constraint] {cs.string} is not satisfied: too large ({type(e).__name__}).')
+        return False
     largest_axis, medium_axis, smallest_axis = reversed(sorted(list(volume)))
     mame = largest_axis / medium_axis
     mami = largest_axis / smallest_axis
@@ -1,16 +1,22 @@
 import itertools
 import logging
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 import numpy as np
 import numpy.typing as npt
+from pcgsepy.common.cache import LRUCache
 from pcgsepy.common.vecs import Orientation, Vec
-from pcgsepy.config import N_SPE
+from pcgsepy.config import ABORT_ON_INTERSECTION, N_SPE
 from pcgsepy.lsystem.constraints import ConstraintHandler
-from pcgsepy.lsystem.solution import CandidateSolution, merge_solutions
+from pcgsepy.lsystem.solution import CandidateSolution, merge_solutions, string_merging
+from pcgsepy.lsystem.parser import LLParser
 from pcgsepy.lsystem.solver import LSolver
-from pcgsepy.lsystem.structure_maker import LLStructureMaker
-from pcgsepy.structure import Structure
+from pcgsepy.lsystem.structure_maker import LLStructureMaker, StructureProgram, TileTemplate
+from pcgsepy.structure import IntersectionException, Structure
+
+
+# Number of low-level strings whose segments are kept until their structure is set
+_LL_SEGMENTS_CACHE_SIZE = 64
 
 
 class LSystemModule:
@@ -72,16 +78,17 @@ class LSystemModule:
                                    check_sat=self.check_sat)
 
     def _get_ml_strings(self,
-                        hl_strings: List[str]) -> List[str]:
+                        hl_solutions: List[CandidateSolution]) -> List[str]:
         """Convert the high-level strings to mid-level.
 
         Args:
-            hl_strings (List[str]): The high-level strings.
+            hl_solutions (List[CandidateSolution]): The high-level solutions.
 
         Returns:
             List[str]: The list of mid-level strings.
         """
-        return [self.hlsolver.translator.transform(string=hl_string) for hl_string in hl_strings]
+        return [self.hlsolver.translator.transform(string=cs.string,
+                                                   tokens=cs.tokens) for cs in hl_solutions]
 
     def _get_ll_solutions(self,
                           cs: List[CandidateSolution]) -> Tuple[List[CandidateSolution], npt.NDArray[np.bool8]]:
@@ -123,7 +130,7 @@ class LSystemModule:
         hl_solutions = self._get_hl_solutions(starting_string=starting_string,
                                               iterations=iterations)
         logging.getLogger('lsystem').debug(f'[{__name__}.create_new_pool] Converting HL strings to ML...')
-        ml_strings = self._get_ml_strings([cs.string for cs in hl_solutions])
+        ml_strings = self._get_ml_strings(hl_solutions)
         logging.getLogger('lsystem').debug(f'[{__name__}.create_new_pool] Started low level solving...')
         _, to_keep = self._get_ll_solutions([CandidateSolution(string=s,
                                                                content=hl_cs._content) for s, hl_cs in zip(ml_strings, hl_solutions)])
@@ -178,6 +185,13 @@ class LSystem:
         self.all_hl_constraints = set()
         self.all_ll_constraints = set()
 
+        # templates of the deterministic low-level tiles and programs of the others, compiled on first use
+        self._tile_templates: Optional[Dict[str, TileTemplate]] = None
+        self._tile_programs: Optional[Dict[str, StructureProgram]] = None
+        self._ll_segments = LRUCache(max_size=_LL_SEGMENTS_CACHE_SIZE)
+        # whether to stop building a structure at its first intersection, marking the solution as infeasible
+        self.abort_on_intersection = ABORT_ON_INTERSECTION
+
     def enable_sat_check(self):
         """Enable constraints satisfaction"""
         self.check_sat = True
@@ -234,17 +248,31 @@ class LSystem:
                                   iterations=iterations)
 
     def _produce_solutions_combinations(self,
-                                        lcs: List[CandidateSolution]) -> List[CandidateSolution]:
+                                        lcs: List[List[CandidateSolution]]) -> List[CandidateSolution]:
         """Produce the combination of solutions' strings.
 
         Args:
-            lcs (List[CandidateSolution]): The list of solutions.
+            lcs (List[List[CandidateSolution]]): The solutions of each module.
 
         Returns:
             List[CandidateSolution]: The list of solutions.
         """
+        return list(self._iter_solutions_combinations(lcs=lcs))
+
+    def _iter_solutions_combinations(self,
+                                     lcs: List[List[CandidateSolution]]) -> Iterator[CandidateSolution]:
+        """Produce the combination of solutions' strings lazily, in the same order as `_produce_solutions_combinations`.
+
+        Args:
+            lcs (List[List[CandidateSolution]]): The solutions of each module.
+
+        Returns:
+            Iterator[CandidateSolution]: The merged solutions.
+        """
+        modules_names, modules_active = [m.name for m in self.modules], [m.active for m in self.modules]
         # Cartesian product of all strings, return merged string
-        return [merge_solutions(lcs=x, modules_names=[m.name for m in self.modules], modules_active=[m.active for m in self.modules]) for x in list(itertools.product(*lcs))]
+        for x in itertools.product(*lcs):
+            yield merge_solutions(lcs=x, modules_names=modules_names, modules_active=modules_active)
 
     def _add_ll_strings(self,
                         cs: CandidateSolution) -> CandidateSolution:
@@ -256,17 +284,75 @@ class LSystem:
         Returns:
             CandidateSolution: The solution with the low-level string set.
         """
-        ml_string = self.hl_solver.translator.transform(string=cs.string)
-        cs.ll_string = self.ll_solver.solve(string=ml_string,
-                                            iterations=1,
-                                            strings_per_iteration=1,
-                                            check_sat=False)[0].string
+        modules_strings = [x['string'] for x in cs.hls_mod.values()]
+        # translate each module on its own if the solution string is still their merge
+        if modules_strings and string_merging(ls=modules_strings) == cs.string:
+            ml_string = self.hl_solver.translator.transform_modules(strings=modules_strings)
+        else:
+            ml_string = self.hl_solver.translator.transform(string=cs.string,
+                                                            tokens=cs.tokens)
+        if isinstance(self.ll_solver.parser, LLParser):
+            # same as solving for one iteration without constraints, but the tiles expansions are kept for `_set_structure`
+            segments = self.ll_solver.parser.expand_segments(string=ml_string)
+            cs.ll_string = ''.join([segment for segment, _ in segments])
+            self._ll_segments.put(cs.ll_string, segments)
+        else:
+            cs.ll_string = self.ll_solver.solve(string=ml_string,
+                                                iterations=1,
+                                                strings_per_iteration=1,
+                                                check_sat=False)[0].string
         return cs
 
+    def _compile_tiles(self) -> None:
+        """Compile the low-level tiles: tiles with a single expansion to templates, the expansions of the others to
+        programs.
+        """
+        self._tile_templates, self._tile_programs = {}, {}
+        rules = self.ll_solver.parser.rules
+        alphabet = self.ll_solver.atoms_alphabet
+        for lhs in rules.get_lhs():
+            rhs = rules.get_deterministic_rhs(lhs=lhs)
+            template = TileTemplate.from_string(string=rhs,
+                                                atoms_alphabet=alphabet) if rhs is not None else None
+            if template is not None:
+                self._tile_templates[lhs] = template
+                continue
+            for rhs in rules.get_all_rhs(lhs=lhs):
+                try:
+                    program = StructureProgram.from_string(string=rhs,
+                                                           atoms_alphabet=alphabet,
+                                                           strict=True)
+                except (KeyError, IndexError, ValueError):
+                    program = None
+                if program is not None:
+                    self._tile_programs[rhs] = program
+
+    def _get_tile_templates(self) -> Dict[str, TileTemplate]:
+        """Get the templates of the low-level tiles with a single expansion.
+
+        Returns:
+            Dict[str, TileTemplate]: The templates, by tile.
+        """
+        if self._tile_templates is None:
+            self._compile_tiles()
+        return self._tile_templates
+
+    def _get_tile_programs(self) -> Dict[str, StructureProgram]:
+        """Get the programs of the expansions of the low-level tiles without a template.
+
+        Returns:
+            Dict[str, StructureProgram]: The programs, by expansion.
+        """
+        if self._tile_programs is None:
+            self._compile_tiles()
+        return self._tile_programs
+
     def _set_structure(self,
                        cs: CandidateSolution,
                        make_graph: bool = False) -> CandidateSolution:
         """Set the structure of the solution.
+        If `abort_on_intersection` is set, the structure stops being built at its first intersection: the solution
+        gets the partial structure and is marked as infeasible.
 
         Args:
             cs (CandidateSolution): The solution
@@ -279,15 +365,67 @@ class LSystem:
         structure = Structure(origin=base_position,
                               orientation_forward=orientation_forward,
                               orientation_up=orientation_up)
-        structure = LLStructureMaker(atoms_alphabet=self.ll_solver.atoms_alphabet,
-                                     position=base_position).fill_structure(structure=structure,
-                                                                            string=cs.ll_string)
+        structure_maker = LLStructureMaker(atoms_alphabet=self.ll_solver.atoms_alphabet,
+                                           position=base_position,
+                                           abort_on_intersection=self.abort_on_intersection)
+        try:
+            # stamp the tiles templates if the low-level string was just generated
+            segments = self._ll_segments.get(cs.ll_string)
+            filled = structure_maker.fill_structure_from_segments(structure=structure,
+                                                                  segments=segments,
+                                                                  templates=self._get_tile_templates(),
+                                                                  programs=self._get_tile_programs()) if segments is not None else None
+            structure = filled if filled is not None else structure_maker.fill_structure(structure=structure,
+                                                                                         string=cs.ll_string)
+        except IntersectionException:
+            logging.getLogger('lsystem').debug(f'[{__name__}._set_structure] {cs.string} is infeasible: intersection.')
+            cs.is_feasible = False
 
         cs.set_content(content=structure)
         if make_graph:
             structure.show(title=cs.string)
         return cs
 
+    def iter_solutions(self,
+                       starting_strings: List[str],
+                       iterations: List[int],
+                       create_structures: bool = False,
+                       make_graph: bool = False,
+                       unique: bool = True) -> Iterator[CandidateSolution]:
+        """Apply the expansion rules for the hierarchical L-system, producing the combined solutions lazily.
+        The high-level expansion of every module still runs in full on the first request, since each combination needs
+        the solutions of all modules. Only merging a combination, setting its low-level string and (if enabled) building
+        its structure are deferred until it is requested, so callers that stop early skip those steps for the rest.
+
+        Args:
+            starting_strings (List[str]): The starting strings (one per module).
+            iterations (List[int]): The number of iterations to expand for (one per module).
+            create_structures (bool, optional): Whether to create structures for each solution. Defaults to False.
+            make_graph (bool, optional): Whether to plot the structure. Defaults to False.
+            unique (bool, optional): Whether to skip solutions with the same string as an earlier one. Defaults to True.
+
+        Returns:
+            Iterator[CandidateSolution]: The solutions.
+        """
+        assert len(starting_strings) == len(self.modules), f'Assumed wrong number of modules: have {len(self.modules)}, passed {len(starting_strings)}.'
+        assert len(iterations) == len(self.modules), f'Assumed wrong number of modules: have {len(self.modules)}, passed {len(iterations)}.'
+        # create solutions for each module
+        modules_solutions = [self.process_module(module=module,
+                                                 starting_string=starting_string,
+                                                 iterations=n_iterations) for module, starting_string, n_iterations in zip(self.modules, starting_strings, iterations)]
+        seen = set()
+        for cs in self._iter_solutions_combinations(lcs=modules_solutions):
+            if unique:
+                if cs.string in seen:
+                    continue
+                seen.add(cs.string)
+            # set low-level string
+            cs = self._add_ll_strings(cs=cs)
+            # if enabled, create the structure
+            if create_structures:
+                cs = self._set_structure(cs=cs, make_graph=make_graph)
+            yield cs
+
     def apply_rules(self,
                     starting_strings: List[str],
                     iterations: List[int],
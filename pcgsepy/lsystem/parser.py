@@ -1,13 +1,15 @@
 import logging
-import re
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
 
-import numpy as np
-from pcgsepy.common.regex_handler import MyMatch, extract_regex
-from pcgsepy.config import PL_HIGH, PL_LOW
+from pcgsepy.common.cache import LRUCache
+from pcgsepy.common.regex_handler import CompiledRules
+from pcgsepy.common.str_utils import PrefixTrie, get_matching_brackets
+from pcgsepy.config import ML_CACHE_SIZE
 from pcgsepy.lsystem.actions import Rotations
 from pcgsepy.lsystem.rules import StochasticRules
+from pcgsepy.lsystem.tokens import NO_PARAM, TokenizedString, TokenRules
 
 
 class LParser(ABC):
@@ -19,7 +21,6 @@ class LParser(ABC):
             rules (StochasticRules): The set of expansion rules.
         """
         self.rules = rules
-        self.compiled_lhs = [extract_regex(lhs) for lhs in rules.get_lhs()]
 
     @abstractmethod
     def expand(self,
@@ -36,44 +37,72 @@ class LParser(ABC):
 
 
 class HLParser(LParser):
+    def __init__(self,
+                 rules: StochasticRules):
+        """Create a high-level parser.
+
+        Args:
+            rules (StochasticRules): The set of expansion rules.
+        """
+        super().__init__(rules=rules)
+        self.compiled_rules = CompiledRules(lhs=rules.get_lhs())
+        # token rules depend on the atoms the strings are tokenized with
+        self._token_rules: Dict[frozenset, TokenRules] = {}
+
     def expand(self,
                string: str) -> str:
         logging.getLogger('parser').debug(f'[{__name__}.expand] Initial {string=}.')
-        # get all matches with regex
-        matches: List[MyMatch] = []
-        for r, rule in zip(self.compiled_lhs, self.rules.get_lhs()):
-            matches.extend([MyMatch(lhs=rule,
-                                    span=match.span(),
-                                    lhs_string=match.group()) for match in r.finditer(string=string)])
+        matches = self.compiled_rules.matches(string=string)
         logging.getLogger('parser').debug(f'[{__name__}.expand] {len(matches)=}.')
-        # sort matches in-place
-        matches.sort()
-        # filter out matches
-        filtered_matches = [matches[0]]
+        # expand in a single pass, copying the unmatched substrings
+        expanded, last = [], 0
         for match in matches:
-            if match.start != filtered_matches[-1].start:
-                filtered_matches.append(match)
-        logging.getLogger('parser').debug(f'[{__name__}.expand] {len(filtered_matches)=}.')
-        # expand using filtered_matches
-        offset = 0
-        for match in filtered_matches:
-            rhs = self.rules.get_rhs(lhs=match.lhs)
-            # update numerical parameters
-            if '(x)' in rhs or '(X)' in rhs or '(Y)' in rhs:
-                n = [m for m in re.compile(r'\d').finditer(match.lhs_string)]
-                n = int(n[0].group()) if n else None
-                # update rhs to include parameters
-                rhs = rhs.replace('(x)', f'({n})')
-                rhs_n = np.random.randint(PL_LOW, PL_HIGH)
-                rhs = rhs.replace('(X)', f'({rhs_n})')
-                if n is not None:
-                    rhs = rhs.replace('(Y)', f'({max(1, n - rhs_n)})')
-            # apply expansion in string
-            string = string[:match.start + offset] + rhs + string[match.end + offset:]
-            offset += len(rhs) - len(match.lhs_string)
+            rhs = self.compiled_rules.fill_parameters(rhs=self.rules.get_rhs(lhs=match.lhs),
+                                                      lhs_string=match.lhs_string,
+                                                      rng=self.rules.rng)
+            expanded.extend([string[last:match.start], rhs])
+            last = match.end
+        expanded.append(string[last:])
+        string = ''.join(expanded)
         logging.getLogger('parser').debug(f'[{__name__}.expand] Final {string=}.')
         return string
 
+    def expand_tokens(self,
+                      tokens: TokenizedString) -> TokenizedString:
+        """Expand a tokenized string using the parser rules. Equivalent to `expand` on the rendered string,
+        including the random draws.
+
+        Args:
+            tokens (TokenizedString): The tokenized string to expand.
+
+        Returns:
+            TokenizedString: The expanded tokenized string.
+        """
+        token_rules = self._token_rules.get(tokens.trie.keys, None)
+        if token_rules is None:
+            token_rules = self._token_rules[tokens.trie.keys] = TokenRules(lhs=self.rules.get_lhs(),
+                                                                           trie=tokens.trie)
+        matches = token_rules.matches(ts=tokens)
+        logging.getLogger('parser').debug(f'[{__name__}.expand_tokens] {len(matches)=}.')
+        if not matches:
+            return tokens
+        atoms, params = tokens.atoms.tolist(), tokens.params.tolist()
+        new_atoms, new_params, last = [], [], 0
+        for start, end, lhs, digit in matches:
+            rhs_atoms, rhs_params = token_rules.fill_parameters(rhs=self.rules.get_rhs(lhs=lhs),
+                                                                digit=digit,
+                                                                rng=self.rules.rng)
+            new_atoms.extend(atoms[last:start])
+            new_atoms.extend(rhs_atoms)
+            new_params.extend(params[last:start])
+            new_params.extend(rhs_params)
+            last = end
+        new_atoms.extend(atoms[last:])
+        new_params.extend(params[last:])
+        return TokenizedString.from_lists(atoms=new_atoms,
+                                          params=new_params,
+                                          trie=tokens.trie)
+
 
 class HLtoMLTranslator:
 
@@ -84,39 +113,60 @@ class HLtoMLTranslator:
         self.alphabet = alphabet
         self.td = tiles_dims
         self.tbo = tiles_block_offset
+        self._trie = PrefixTrie(keys=alphabet.keys())
+        self._atoms_cache = LRUCache(max_size=ML_CACHE_SIZE)
+        self._modules_cache = LRUCache(max_size=ML_CACHE_SIZE)
 
     def _string_as_list(self,
                         string: str) -> List[Dict[str, Any]]:
+        if self._trie.keys != self.alphabet.keys():
+            self._trie = PrefixTrie(keys=self.alphabet.keys())
         atoms_list = []
         i = 0
         while i < len(string):
             offset = 0
-            for k in self.alphabet.keys():
-                if string[i:].startswith(k):
-                    offset += len(k)
-                    n = None
-                    # check if there are parameters (multiplicity)
-                    if i + offset < len(string) and string[i + offset] == '(':
-                        params = string[i + offset:
-                                        string.index(')', i + offset + 1) + 1]
-                        offset += len(params)
-                        n = int(params.replace('(', '').replace(')', ''))
-                    atoms_list.append({'atom': k})
-                    if k in self.td.keys():
-                        atoms_list[-1]['n'] = n if n is not None else 1
-
-                    i += len(k) + (len(f'({n})') if n is not None else 0) - 1
-                    break
+            k = self._trie.longest_match(string=string, start=i)
+            if k is not None:
+                offset += len(k)
+                n = None
+                # check if there are parameters (multiplicity)
+                if i + offset < len(string) and string[i + offset] == '(':
+                    params = string[i + offset:
+                                    string.index(')', i + offset + 1) + 1]
+                    offset += len(params)
+                    n = int(params.replace('(', '').replace(')', ''))
+                atoms_list.append({'atom': k})
+                if k in self.td.keys():
+                    atoms_list[-1]['n'] = n if n is not None else 1
+
+                i += len(k) + (len(f'({n})') if n is not None else 0) - 1
             i += 1
         return atoms_list
 
+    def _tokens_as_list(self,
+                        tokens: TokenizedString) -> List[Dict[str, Any]]:
+        atoms_list = []
+        for k, n in zip(tokens.atoms_names(), tokens.params.tolist()):
+            # characters outside of the alphabet are skipped, as in `_string_as_list`
+            if k in self.alphabet:
+                atoms_list.append({'atom': k})
+                if k in self.td.keys():
+                    atoms_list[-1]['n'] = n if n != NO_PARAM else 1
+        return atoms_list
+
     def _to_midlvl(self,
-                   atoms_list: List[Dict[str, Any]]) -> str:
-        last_parents = []
+                   atoms_list: List[Dict[str, Any]],
+                   start: int = 0,
+                   end: Optional[int] = None,
+                   last_parents: Optional[List[str]] = None) -> str:
+        # a range of the atoms can be translated on its own, given the parents at its start
+        last_parents = [] if last_parents is None else last_parents
+        end = len(atoms_list) if end is None else end
         new_string = ''
         rotations = []
 
-        for i, atom in enumerate(atoms_list):
+        for i in range(start, end):
+            atom = atoms_list[i]
             a = atom['atom']
             n = atom.get('n', None)
             # tile dimensions (either current or parent's)
@@ -185,18 +235,7 @@ class HLtoMLTranslator:
 
     def _add_intersections(self,
                            string: str) -> str:
-        brackets = []
-        for i, c in enumerate(string):
-            if c == '[':
-                # find first closing bracket
-                idx_c = string.index(']', i)
-                # update closing bracket position in case of nested brackets
-                ni_o = string.find('[', i + 1)
-                while ni_o != -1 and string.find('[', ni_o) < idx_c:
-                    idx_c = string.index(']', idx_c + 1)
-                    ni_o = string.find('[', ni_o + 1)
-                # add to list of brackets
-                brackets.append((i, idx_c))
+        brackets = get_matching_brackets(string=string)
         to_add = {}
         # add intersection types
         for i, b in enumerate(brackets):
@@ -237,9 +276,23 @@ class HLtoMLTranslator:
         return string
 
     def transform(self,
-                  string: str) -> str:
+                  string: str,
+                  tokens: Optional[TokenizedString] = None) -> str:
+        """Translate a high-level string to mid-level.
+
+        Args:
+            string (str): The high-level string.
+            tokens (Optional[TokenizedString], optional): The tokenized high-level string, used instead of the string if
+            tokenized with the translator alphabet. Defaults to None.
+
+        Returns:
+            str: The mid-level string.
+        """
         logging.getLogger('parser').debug(f'[{__name__}.transform] Transforming {string=}')
-        atoms_list = self._string_as_list(string)
+        if tokens is not None and tokens.trie.keys == self.alphabet.keys():
+            atoms_list = self._tokens_as_list(tokens)
+        else:
+            atoms_list = self._string_as_list(string)
         try:
             new_string = self._to_midlvl(atoms_list)
             logging.getLogger('parser').debug(f'[{__name__}.transform] {new_string=}')
@@ -250,17 +303,121 @@ class HLtoMLTranslator:
             raise e
         return new_string
 
+    def _module_translation(self,
+                            string: str,
+                            atoms_list: List[Dict[str, Any]],
+                            start: int,
+                            end: int,
+                            last_parents: List[str]) -> Tuple[str, Optional[str]]:
+        # the translation of a module only depends on the parents at its start and on the atoms after it through the
+        # first following atom and the first following tile
+        next_atom = (atoms_list[end]['atom'], 'n' in atoms_list[end]) if end < len(atoms_list) else None
+        next_tile = next((atom['atom'] for atom in atoms_list[end:] if atom.get('n', None) is not None), None)
+        key = (string, tuple(last_parents), next_atom, next_tile)
+        cached = self._modules_cache.get(key)
+        if cached is None:
+            ml_string = self._to_midlvl(atoms_list=atoms_list,
+                                        start=start,
+                                        end=end,
+                                        last_parents=last_parents)
+            # intersections can be added to the module on its own only if its brackets are balanced
+            depth = 0
+            for c in ml_string:
+                depth += 1 if c == '[' else -1 if c == ']' else 0
+                if depth < 0:
+                    break
+            ml_intersected = self._add_intersections(ml_string) if depth == 0 else None
+            cached = (ml_string, ml_intersected, tuple(last_parents))
+            self._modules_cache.put(key, cached)
+        else:
+            last_parents[:] = cached[2]
+        return cached[0], cached[1]
+
+    def transform_modules(self,
+                          strings: List[str]) -> str:
+        """Translate the high-level strings of the L-system modules to a single mid-level string.
+        Equivalent to `transform` on the merged string, but each module is translated on its own and cached, so only
+        modules that changed are translated again.
+
+        Args:
+            strings (List[str]): The high-level strings of the modules, in order.
+
+        Returns:
+            str: The mid-level string.
+        """
+        logging.getLogger('parser').debug(f'[{__name__}.transform_modules] Transforming {strings=}')
+        if self._trie.keys != self.alphabet.keys():
+            self._trie = PrefixTrie(keys=self.alphabet.keys())
+            self._atoms_cache.clear()
+            self._modules_cache.clear()
+        atoms_list, bounds = [], [0]
+        for string in strings:
+            module_atoms = self._atoms_cache.get(string)
+            if module_atoms is None:
+                module_atoms = self._string_as_list(string)
+                self._atoms_cache.put(string, module_atoms)
+            atoms_list.extend(module_atoms)
+            bounds.append(len(atoms_list))
+        try:
+            ml_strings, ml_intersected, last_parents = [], [], []
+            for string, start, end in zip(strings, bounds[:-1], bounds[1:]):
+                ml_string, ml_string_intersected = self._module_translation(string=string,
+                                                                            atoms_list=atoms_list,
+                                                                            start=start,
+                                                                            end=end,
+                                                                            last_parents=last_parents)
+                ml_strings.append(ml_string)
+                ml_intersected.append(ml_string_intersected)
+            new_string = ''.join(ml_strings)
+            # stitch the modules: adjacent brackets across a joint are neighbours, so intersections must be recomputed
+            joints = list(accumulate(len(s) for s in ml_strings[:-1]))
+            if all(s is not None for s in ml_intersected) and not any(0 < j < len(new_string) and new_string[j - 1:j + 1] == '][' for j in joints):
+                new_string = ''.join(ml_intersected)
+            else:
+                new_string = self._add_intersections(new_string)
+            logging.getLogger('parser').debug(f'[{__name__}.transform_modules] {new_string=}')
+        except Exception as e:
+            logging.getLogger('parser').error(f'[{__name__}.transform_modules] {strings=} {e=}')
+            raise e
+        return new_string
+
 
 class LLParser(LParser):
+    def __init__(self,
+                 rules: StochasticRules):
+        """Create a low-level parser.
+
+        Args:
+            rules (StochasticRules): The set of expansion rules.
+        """
+        super().__init__(rules=rules)
+        self._trie = PrefixTrie(keys=rules.lhs_alphabet)
+
     def expand(self,
                string: str) -> str:
-        i = 0
-        while i < len(string):
-            for k in reversed(list(self.rules.lhs_alphabet)):
-                if string[i:].startswith(k):
-                    rhs = self.rules.get_rhs(lhs=k)
-                    string = string[:i] + rhs + string[i + len(k):]
-                    i += len(rhs) - 1
-                    break
-            i += 1
-        return string
+        return ''.join([segment for segment, _ in self.expand_segments(string=string)])
+
+    def expand_segments(self,
+                        string: str) -> List[Tuple[str, Optional[str]]]:
+        """Expand a string using the parser rules, keeping track of the expanded atoms.
+
+        Args:
+            string (str): The string to expand.
+
+        Returns:
+            List[Tuple[str, Optional[str]]]: The segments of the expanded string, each with the atom it is the expansion
+            of (`None` for the segments copied from the string).
+        """
+        if self._trie.keys != self.rules.lhs_alphabet:
+            self._trie = PrefixTrie(keys=self.rules.lhs_alphabet)
+        # RHS are not expanded again, so the output is the string with each match replaced
+        segments, last = [], 0
+        matches = list(self._trie.matches(string=string))
+        for (i, k), rhs in zip(matches, self.rules.sample_rhs(lhs=[k for _, k in matches])):
+            if i > last:
+                segments.append((string[last:i], None))
+            segments.append((rhs, k))
+            last = i + len(k)
+        if last < len(string):
+            segments.append((string[last:], None))
+        return segments
@@ -1,13 +1,22 @@
-from typing import Any, Dict, List
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional
 
 import numpy as np
 
 
 class StochasticRules:
-    def __init__(self):
-        """Create a ruleset"""
+    def __init__(self,
+                 rng: Optional[np.random.Generator] = None):
+        """Create a ruleset
+
+        Args:
+            rng (Optional[np.random.Generator], optional): The random generator used to select the RHS. If `None`, the
+            global NumPy random state is used, drawing the same numbers as `np.random.choice`. Defaults to None.
+        """
         self._rules = {}
         self.lhs_alphabet = set()
+        self.rng = rng
+        self._cdfs: Dict[str, List[float]] = {}
 
     def add_rule(self,
                  lhs: str,
@@ -25,6 +34,7 @@ class StochasticRules:
             self._rules[lhs][1].append(p)
         else:
             self._rules[lhs] = ([rhs], [p])
+        self._cdfs.pop(lhs, None)
         lhs = lhs.replace('(x)', '').replace(']', '')
         self.lhs_alphabet.add(lhs)
 
@@ -36,6 +46,7 @@ class StochasticRules:
             lhs (str): The LHS to remove.
         """
         self._rules.pop(lhs)
+        self._cdfs.pop(lhs, None)
         lhs = lhs.replace('(x)', '').replace(']', '')
         self.lhs_alphabet.pop(lhs)
 
@@ -47,6 +58,44 @@ class StochasticRules:
         """
         return list(self._rules.keys())
 
+    def _cdf(self,
+             lhs: str) -> List[float]:
+        """Get the cumulative distribution of the RHS of the given LHS, compiling it on first use as
+        `np.random.choice` does on every call.
+
+        Args:
+            lhs (str): The LHS.
+
+        Raises:
+            ValueError: Raised if the probabilities are negative or do not sum to 1.
+
+        Returns:
+            List[float]: The cumulative probabilities.
+        """
+        cdf = self._cdfs.get(lhs, None)
+        if cdf is None:
+            p = np.asarray(self._rules[lhs][1], dtype=np.float64)
+            if np.any(p < 0):
+                raise ValueError(f'Probabilities of `{lhs}` are not non-negative.')
+            if abs(np.sum(p) - 1.) > np.sqrt(np.finfo(np.float64).eps):
+                raise ValueError(f'Probabilities of `{lhs}` do not sum to 1.')
+            cdf = p.cumsum()
+            cdf /= cdf[-1]
+            cdf = self._cdfs[lhs] = cdf.tolist()
+        return cdf
+
+    def _uniforms(self,
+                  n: Optional[int] = None) -> Any:
+        """Draw uniform random numbers in `[0, 1)` from the generator of the ruleset.
+
+        Args:
+            n (Optional[int], optional): The number of random numbers. If `None`, a single float is returned. Defaults to None.
+
+        Returns:
+            Any: The random number(s).
+        """
+        return np.random.random_sample(n) if self.rng is None else self.rng.random(n)
+
     def get_rhs(self,
                 lhs: str) -> str:
         """Get the RHS of the given LHS according to the selection probability.
@@ -57,8 +106,47 @@ class StochasticRules:
         Returns:
             str: The RHS.
         """
+        return self._rules[lhs][0][bisect_right(self._cdf(lhs=lhs), self._uniforms())]
+
+    def sample_rhs(self,
+                   lhs: List[str]) -> List[str]:
+        """Get the RHS of each of the given LHS according to the selection probability, drawing all random numbers
+        at once. The selection is the same as calling `get_rhs` on each LHS in order.
+
+        Args:
+            lhs (List[str]): The LHS.
+
+        Returns:
+            List[str]: The RHS.
+        """
+        if not lhs:
+            return []
+        return [self._rules[k][0][bisect_right(self._cdf(lhs=k), u)] for k, u in zip(lhs, self._uniforms(len(lhs)).tolist())]
+
+    def get_deterministic_rhs(self,
+                              lhs: str) -> Optional[str]:
+        """Get the RHS of the given LHS if it is the only one that can be selected.
+
+        Args:
+            lhs (str): The LHS.
+
+        Returns:
+            Optional[str]: The RHS, or `None` if the LHS has more than one RHS.
+        """
         rhs, p = self._rules[lhs]
-        return np.random.choice(rhs, p=p)
+        return rhs[0] if len(rhs) == 1 and np.isclose(p[0], 1.) else None
+
+    def get_all_rhs(self,
+                    lhs: str) -> List[str]:
+        """Get all the RHS of the given LHS.
+
+        Args:
+            lhs (str): The LHS.
+
+        Returns:
+            List[str]: The list of RHSs.
+        """
+        return list(self._rules[lhs][0])
 
     def validate(self):
         """Ensure all probabilities for each LHS sum up to 1."""
@@ -76,8 +164,9 @@ class StochasticRules:
         }
 
     @staticmethod
-    def from_json(my_args: Dict[str, Any]) -> 'StochasticRules':
-        sr = StochasticRules()
+    def from_json(my_args: Dict[str, Any],
+                  rng: Optional[np.random.Generator] = None) -> 'StochasticRules':
+        sr = StochasticRules(rng=rng)
         sr._rules = my_args['rules']
         sr.lhs_alphabet = set(my_args['lhs_alphabet'])
         return sr
@@ -94,13 +183,18 @@ class RuleMaker:
         with open(ruleset, 'r') as f:
             self.ruleset = f.readlines()
 
-    def get_rules(self) -> StochasticRules:
+    def get_rules(self,
+                  rng: Optional[np.random.Generator] = None) -> StochasticRules:
         """Create a ruleset.
 
+        Args:
+            rng (Optional[np.random.Generator], optional): The random generator used by the ruleset. If `None`, the
+            global NumPy random state is used. Defaults to None.
+
         Returns:
             StochasticRules: The ruleset.
         """
-        rules = StochasticRules()
+        rules = StochasticRules(rng=rng)
         for rule in self.ruleset:
             if rule.startswith('#'):  # comment in configuration file
                 pass
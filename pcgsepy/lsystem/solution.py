@@ -1,22 +1,25 @@
 from functools import cached_property
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
 from pcgsepy.common.vecs import Vec
+from pcgsepy.lsystem.tokens import TokenizedString
 
 from ..structure import Structure
 
 
 class CandidateSolution:
-    __slots__ = ['string', '_content', 'age', 'b_descs', 'c_fitness', 'fitness', 'hls_mod',
+    __slots__ = ['_string', '_tokens', '_content', 'age', 'b_descs', 'c_fitness', 'fitness', 'hls_mod',
                  'is_feasible', 'll_string', 'n_feas_offspring', 'n_offspring', 'ncv',
-                 'parents', 'representation', 'base_color', 'n_blocks']
+                 'parents', 'representation', 'base_color', 'n_blocks', 'content_hash']
     
     def __init__(self,
-                 string: str,
-                 content: Optional[Structure] = None):
-        self.string: str = string
+                 string: Optional[str] = None,
+                 content: Optional[Structure] = None,
+                 tokens: Optional[TokenizedString] = None):
+        self._string: Optional[str] = string
+        self._tokens: Optional[TokenizedString] = tokens
         self._content: Structure = content
         
         self.age: int = 0
@@ -33,6 +36,16 @@ class CandidateSolution:
         self.representation: List[float] = []
         self.base_color = Vec.v3f(x=0.45, y=0.45, z=0.45)  # default block color is #737373
         self.n_blocks = 0
+        self.content_hash: Optional[int] = None  # hash of the content when it was set (i.e.: before adding the hull)
+
+    def __setstate__(self,
+                     state: Union[Dict[str, Any], Tuple[Optional[Dict[str, Any]], Dict[str, Any]]]) -> None:
+        # solutions pickled before the tokens and the content hash were added store `string` and lack their slots
+        state = {**(state[0] or {}), **state[1]} if isinstance(state, tuple) else state
+        for k in CandidateSolution.__slots__:
+            setattr(self, k, state.get(k, None))
+        if '_string' not in state:
+            self._string = state.get('string', None)
 
     def __str__(self) -> str:
         return f'{self.string}; fitness: {self.c_fitness}; is_feasible: {self.is_feasible}'
@@ -49,6 +62,34 @@ class CandidateSolution:
     def __hash__(self):
         return hash(self.string)
 
+    @property
+    def string(self) -> str:
+        # rendered only when needed if the solution was produced as tokens
+        if self._string is None and self._tokens is not None:
+            self._string = self._tokens.to_string()
+        return self._string
+
+    @string.setter
+    def string(self,
+               string: str) -> None:
+        self._string = string
+        self._tokens = None
+
+    @property
+    def tokens(self) -> Optional[TokenizedString]:
+        """Get the tokenized string of the solution, if it has been set.
+
+        Returns:
+            Optional[TokenizedString]: The tokenized string.
+        """
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self,
+               tokens: TokenizedString) -> None:
+        self._tokens = tokens
+        self._string = None
+
     def set_content(self,
                     content: Structure):
         """Set the content of the solution.
@@ -64,6 +105,7 @@ class CandidateSolution:
         else:
             self._content = content
             self.n_blocks = len(content._blocks)
+            self.content_hash = content.content_hash
 
     @property
     def content(self) -> Structure:
@@ -107,7 +149,8 @@ class CandidateSolution:
             'n_offspring': self.n_offspring,
             'ncv': self.ncv,
             'parents': [p.to_json() for p in self.parents],
-            'representation': self.representation
+            'representation': self.representation,
+            'content_hash': self.content_hash
         }
     
     @staticmethod
@@ -126,6 +169,7 @@ class CandidateSolution:
         cs.ncv = my_args['ncv']
         cs.parents = [CandidateSolution.from_json(args=p) for p in my_args['parents']]
         cs.representation = my_args['representation']
+        cs.content_hash = my_args.get('content_hash', None)
         return cs
 
 
@@ -157,7 +201,10 @@ def merge_solutions(lcs: List[CandidateSolution],
             CandidateSolution: The merged solution
         """
         assert len(lcs) == len(modules_names), f'Each solution should be produced by a module! Passed {len(lcs)} solutions and {len(modules_names)} modules.'
-        m_cs = CandidateSolution(string=string_merging(ls=[cs.string for cs in lcs]))
+        if all(cs.tokens is not None for cs in lcs):
+            m_cs = CandidateSolution(tokens=TokenizedString.concatenate(tss=[cs.tokens for cs in lcs]))
+        else:
+            m_cs = CandidateSolution(string=string_merging(ls=[cs.string for cs in lcs]))
         for i, (cs, default_m) in enumerate(zip(lcs, modules_active)):
             m_cs.hls_mod[modules_names[i]] = {'string': cs.string,
                                               'mutable': default_m}
@@ -1,15 +1,35 @@
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 
+from pcgsepy.common.str_utils import PrefixTrie
+from pcgsepy.config import BEAM_POLICY, BEAM_WIDTH, REQ_TILES
 from pcgsepy.lsystem.rules import StochasticRules
+from pcgsepy.lsystem.tokens import TokenizedString
 
 from .constraints import ConstraintHandler, ConstraintTime, ConstraintLevel
 from .parser import HLParser, HLtoMLTranslator, LParser, LLParser
 from .solution import CandidateSolution
 
 
+# Policies to choose the strings kept by the beam
+_beam_policies = ['random', 'coverage']
+
+
+def _coverage_score(cs: CandidateSolution) -> Tuple[int, int]:
+    """Score a solution by its string only: the number of required tiles it has, then its number of distinct atoms.
+
+    Args:
+        cs (CandidateSolution): The solution.
+
+    Returns:
+        Tuple[int, int]: The score (higher is better).
+    """
+    n_atoms = len(np.unique(cs.tokens.atoms)) if cs.tokens is not None else 0
+    return sum([tile in cs.string for tile in REQ_TILES]), n_atoms
+
+
 class LSolver:
 
     def __init__(self,
@@ -21,7 +41,10 @@ class LSolver:
         self.constraints = []
         self.inner_loops_during = 5
         self.inner_loops_end = 5
+        self.beam_width = BEAM_WIDTH
+        self.beam_policy = BEAM_POLICY
         self.translator = None
+        self._trie = PrefixTrie(keys=self.atoms_alphabet.keys())
         if isinstance(self.parser, HLParser):
             self.translator = HLtoMLTranslator(
                 alphabet=self.atoms_alphabet,
@@ -34,8 +57,20 @@ class LSolver:
                            n: int,
                            dc_check: bool = False) -> Optional[CandidateSolution]:
         logging.getLogger('solver').debug(f'[{__name__}._forward_expansion] Expanding {cs.string=}.')
-        for i in range(n):
-            cs.string = self.parser.expand(string=cs.string)
+        if isinstance(self.parser, HLParser):
+            # high-level strings are expanded as tokens and rendered only when needed
+            tokens = cs.tokens
+            if tokens is None or tokens.trie.keys != self.atoms_alphabet.keys():
+                if self._trie.keys != self.atoms_alphabet.keys():
+                    self._trie = PrefixTrie(keys=self.atoms_alphabet.keys())
+                tokens = TokenizedString.from_string(string=cs.string,
+                                                     trie=self._trie)
+            for i in range(n):
+                tokens = self.parser.expand_tokens(tokens=tokens)
+            cs.tokens = tokens
+        else:
+            for i in range(n):
+                cs.string = self.parser.expand(string=cs.string)
         if dc_check and len([c for c in self.constraints if c.when == ConstraintTime.DURING]) > 0:
             if not self._check_constraints(cs=cs,
                                            when=ConstraintTime.DURING)[ConstraintLevel.HARD_CONSTRAINT][0]:
@@ -46,29 +81,109 @@ class LSolver:
                            cs: CandidateSolution,
                            when: ConstraintTime,
                            keep_track: bool = False) -> Dict[ConstraintLevel, List[Union[bool, int]]]:
+        """Check the constraints of the solver on a solution.
+        Hard constraints are checked before soft ones; within a level, constraints that do not need the content are
+        checked first, then by increasing cost. Unless `keep_track` is set, checking stops at the first failure of a
+        level, and at the first hard failure altogether (the soft constraints are then reported as satisfied).
+
+        Args:
+            cs (CandidateSolution): The solution.
+            when (ConstraintTime): When the constraints are checked.
+            keep_track (bool, optional): Whether to check all constraints and count the violations. Defaults to False.
+
+        Returns:
+            Dict[ConstraintLevel, List[Union[bool, int]]]: Whether the constraints of each level are satisfied, and
+            the number of violations (hard constraints count 1, soft constraints 0.5).
+        """
         logging.getLogger('solver').debug(f'[{__name__}._check_constraints] Checking constraints on {cs.string=}.')
         sat = {
             ConstraintLevel.SOFT_CONSTRAINT: [True, 0],
             ConstraintLevel.HARD_CONSTRAINT: [True, 0],
         }
-        for lev in sat.keys():
-            for c in self.constraints:
-                if c.when == when and c.level == lev:
-                    s = c.constraint(cs=cs,
-                                     extra_args=c.extra_args)
-                    logging.getLogger('solver').debug(f'[{__name__}._forward_expansion] \t{c}:\t{s}.')
+        constraints = sorted([c for c in self.constraints if c.when == when], key=lambda c: (c.needs_content, c.cost))
+        for lev in [ConstraintLevel.HARD_CONSTRAINT, ConstraintLevel.SOFT_CONSTRAINT]:
+            for c in constraints:
+                if c.level == lev:
+                    s = c.evaluate(cs=cs)
+                    logging.getLogger('solver').debug(f'[{__name__}._check_constraints] \t{c}:\t{s}.')
                     sat[lev][0] &= s
                     if keep_track:
                         sat[lev][1] += (
                             1 if lev == ConstraintLevel.HARD_CONSTRAINT else
                             0.5) if not s else 0
+                    elif not s:
+                        break
+            if not keep_track and not sat[ConstraintLevel.HARD_CONSTRAINT][0]:
+                break
         return sat
 
+    def constraints_stats(self) -> List[Dict[str, Any]]:
+        """Get the counters of the constraints of the solver (see `ConstraintHandler.stats`).
+
+        Returns:
+            List[Dict[str, Any]]: The counters of each constraint, with its description under `constraint`.
+        """
+        return [{'constraint': str(c), **c.stats} for c in self.constraints]
+
+    def _beam_select(self,
+                     solutions: List[CandidateSolution],
+                     beam_width: int,
+                     beam_policy: str) -> List[CandidateSolution]:
+        """Keep at most `beam_width` solutions, chosen according to the policy.
+
+        Args:
+            solutions (List[CandidateSolution]): The solutions.
+            beam_width (int): The maximum number of solutions kept. If not positive, all solutions are kept.
+            beam_policy (str): The policy: `random` samples without replacement, `coverage` keeps the best scoring
+            strings according to `_coverage_score`.
+
+        Raises:
+            ValueError: Raised if the policy is unrecognized.
+
+        Returns:
+            List[CandidateSolution]: The kept solutions.
+        """
+        if beam_policy not in _beam_policies:
+            raise ValueError(f'Unrecognized beam policy {beam_policy}; expected one of {_beam_policies}.')
+        if beam_width <= 0:
+            return solutions
+        # the solutions come from a set, so they are sorted to make the selection and the order of the following
+        # expansions depend only on the random state
+        solutions = sorted(solutions, key=lambda cs: cs.string)
+        if len(solutions) <= beam_width:
+            return solutions
+        if beam_policy == 'random':
+            idxs = np.random.choice(len(solutions), size=beam_width, replace=False)
+            return [solutions[i] for i in sorted(idxs.tolist())]
+        # ties are broken by string so the selection does not depend on the order of the solutions
+        scores = {cs: _coverage_score(cs=cs) for cs in solutions}
+        return sorted(solutions, key=lambda cs: (-scores[cs][0], -scores[cs][1], cs.string))[:beam_width]
+
     def solve(self,
               string: str,
               iterations: int,
               strings_per_iteration: int = 1,
-              check_sat: bool = True) -> List[CandidateSolution]:
+              check_sat: bool = True,
+              beam_width: Optional[int] = None,
+              beam_policy: Optional[str] = None) -> List[CandidateSolution]:
+        """Expand a string for a number of iterations, keeping the strings that satisfy the hard constraints.
+
+        Args:
+            string (str): The starting string.
+            iterations (int): The number of iterations to expand for.
+            strings_per_iteration (int, optional): The number of expansions of each string at each iteration. Defaults to 1.
+            check_sat (bool, optional): Whether to check the constraints. Defaults to True.
+            beam_width (Optional[int], optional): The maximum number of strings kept after each iteration, so the work
+            grows linearly with the iterations instead of exponentially. If not positive, all strings are kept.
+            Defaults to the solver's `beam_width`.
+            beam_policy (Optional[str], optional): How the kept strings are chosen (see `_beam_select`). Defaults to the
+            solver's `beam_policy`.
+
+        Returns:
+            List[CandidateSolution]: The solutions.
+        """
+        beam_width = self.beam_width if beam_width is None else beam_width
+        beam_policy = self.beam_policy if beam_policy is None else beam_policy
         all_solutions = [CandidateSolution(string=string)]
         # forward expansion + DURING constraints check
         for i in range(iterations):
@@ -76,7 +191,7 @@ class LSolver:
             new_all_solutions = []
             for cs in all_solutions:
                 for _ in range(strings_per_iteration):
-                    new_cs = CandidateSolution(string=cs.string[:])
+                    new_cs = CandidateSolution(string=cs.string[:]) if cs.tokens is None else CandidateSolution(tokens=cs.tokens)
                     new_cs = self._forward_expansion(cs=new_cs,
                                                      n=1,
                                                      dc_check=check_sat and i > 0)
@@ -84,6 +199,9 @@ class LSolver:
                         new_all_solutions.append(new_cs)
             all_solutions = new_all_solutions
             all_solutions = list(set(all_solutions))  # remove duplicates
+            all_solutions = self._beam_select(solutions=all_solutions,
+                                              beam_width=beam_width,
+                                              beam_policy=beam_policy)
 
         # END constraints check + possible backtracking
         if check_sat and len([c for c in self.constraints if c.when == ConstraintTime.END]) > 0:
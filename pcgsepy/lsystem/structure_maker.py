@@ -1,55 +1,347 @@
-from ..structure import Structure, Block
-from ..common.vecs import Vec, orientation_from_str, orientation_from_vec
+from ..common.api_call import block_types as block_types_registry
+from ..structure import Structure, Block, IntersectionException
+from ..common.vecs import Orientation, Vec, composition_table, orientation_from_str, rotate_orientation, rotation_code
+from ..common.vecs import rotation_matrices as orientation_rotation_matrices
 from .actions import rotation_matrices, AtomAction
 
 from abc import ABC, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, List, Optional, Tuple, Union
 import re
 
+import numpy as np
+import numpy.typing as npt
+
+
+# Regex of the atoms of a low-level string
+atoms_re = re.compile(r'(\[|\])|(Rot[XYZ]c{1,2}w[XYZ])|((\w+|\W+)(\(.{1,3}\)))')
+
+# Operations of a compiled low-level string
+OP_PLACE, OP_MOVE, OP_ROTATE, OP_PUSH, OP_POP = range(5)
+
+_orientations = list(Orientation)
+_orientation_idxs = {o: i for i, o in enumerate(_orientations)}
+# Orientation code of each rotation atom and of no rotation
+_rotation_codes = {rot: rotation_code(matrix=m) for rot, m in rotation_matrices.items()}
+_identity_code = rotation_code(matrix=np.eye(3, dtype=np.int64))
+# Unit move of each orientation, rotated by each orientation code
+_rotated_moves: List[List[Tuple[int, int, int]]] = [[tuple((m @ np.asarray(o.value.as_tuple(), dtype=np.int64)).tolist()) for o in _orientations] for m in orientation_rotation_matrices]
+
+
+def _match_atom(match: re.Match) -> Tuple[str, List[str]]:
+	g1, g2, _, g4, g5 = match.groups()
+	if g1 is not None:
+		return g1, ['']
+	elif g2 is not None:
+		return g2, ['']
+	else:
+		return g4, g5.replace('(','').replace(')','').split(',')
+
+
+def _parse_atoms(string: str,
+				 strict: bool = True) -> Optional[List[Tuple[str, List[str]]]]:
+	"""Parse a low-level string in atoms and parameters.
+
+	Args:
+		string (str): The string.
+		strict (bool, optional): Whether all characters must be part of an atom. Defaults to True.
+
+	Returns:
+		Optional[List[Tuple[str, List[str]]]]: The atoms and their parameters, or `None` if strict and some characters are
+		not part of any atom (so the string may be parsed differently when joined to others).
+	"""
+	atoms, end = [], 0
+	for match in atoms_re.finditer(string=string):
+		if strict and match.start() != end:
+			return None
+		atoms.append(_match_atom(match=match))
+		end = match.end()
+	return atoms if not strict or end == len(string) else None
+
+
+class StructureProgram:
+	__slots__ = ['ops', 'block_types']
+
+	def __init__(self,
+				 ops: npt.NDArray[np.int32],
+				 block_types: List[str]) -> None:
+		"""Create a compiled low-level string: an array of operations, each with up to three integer arguments.
+		- `OP_PLACE`: block type index, forward and up orientation indices.
+		- `OP_MOVE`: orientation index, number of steps.
+		- `OP_ROTATE`: orientation code of the rotation.
+		- `OP_PUSH`, `OP_POP`: no arguments.
+
+		Args:
+			ops (npt.NDArray[np.int32]): The N×4 operations.
+			block_types (List[str]): The types of the placed blocks.
+		"""
+		self.ops = ops
+		self.block_types = block_types
+
+	def __len__(self) -> int:
+		return len(self.ops)
+
+	@staticmethod
+	def _compile_atom(atom: str,
+					  params: List[str],
+					  atoms_alphabet: Dict[str, Any]) -> Tuple[Optional[str], Tuple[int, int, int, int]]:
+		action, args = atoms_alphabet[atom]['action'], atoms_alphabet[atom]['args']
+		if action == AtomAction.PLACE:
+			return args[0], (OP_PLACE, 0, _orientation_idxs[orientation_from_str[params[0]]], _orientation_idxs[orientation_from_str[params[1]]])
+		elif action == AtomAction.MOVE:
+			return None, (OP_MOVE, _orientation_idxs[args], int(params[0]), 0)
+		elif action == AtomAction.ROTATE:
+			return None, (OP_ROTATE, _rotation_codes[args], 0, 0)
+		elif action == AtomAction.PUSH:
+			return None, (OP_PUSH, 0, 0, 0)
+		elif action == AtomAction.POP:
+			return None, (OP_POP, 0, 0, 0)
+		return None, None
+
+	@classmethod
+	def _from_compiled(cls,
+					   compiled: List[Tuple[Optional[str], Tuple[int, int, int, int]]]) -> 'StructureProgram':
+		ops, block_types, block_types_idxs = [], [], {}
+		for block_type, op in compiled:
+			if op is None:
+				continue
+			if block_type is not None:
+				idx = block_types_idxs.get(block_type, None)
+				if idx is None:
+					idx = block_types_idxs[block_type] = len(block_types)
+					block_types.append(block_type)
+				op = (OP_PLACE, idx, op[2], op[3])
+			ops.append(op)
+		return cls(ops=np.asarray(ops, dtype=np.int32).reshape(-1, 4),
+				   block_types=block_types)
+
+	@classmethod
+	def from_atoms(cls,
+				   atoms: List[Tuple[str, List[str]]],
+				   atoms_alphabet: Dict[str, Any]) -> 'StructureProgram':
+		"""Compile the atoms of a low-level string.
+
+		Args:
+			atoms (List[Tuple[str, List[str]]]): The atoms and their parameters.
+			atoms_alphabet (Dict[str, Any]): The atoms alphabet.
+
+		Returns:
+			StructureProgram: The compiled string.
+		"""
+		return cls._from_compiled(compiled=[cls._compile_atom(atom=atom, params=params, atoms_alphabet=atoms_alphabet) for atom, params in atoms])
+
+	@classmethod
+	def from_string(cls,
+					string: str,
+					atoms_alphabet: Dict[str, Any],
+					strict: bool = False) -> Optional['StructureProgram']:
+		"""Compile a low-level string.
+
+		Args:
+			string (str): The low-level string.
+			atoms_alphabet (Dict[str, Any]): The atoms alphabet.
+			strict (bool, optional): Whether all characters must be part of an atom. Defaults to False.
+
+		Returns:
+			Optional[StructureProgram]: The compiled string, or `None` if strict and the string cannot be parsed completely.
+		"""
+		# low-level strings repeat few distinct atoms, so each is compiled once
+		compiled, memo, end = [], {}, 0
+		for match in atoms_re.finditer(string=string):
+			if strict and match.start() != end:
+				return None
+			text = match.group(0)
+			c = memo.get(text, None)
+			if c is None:
+				atom, params = _match_atom(match=match)
+				c = memo[text] = cls._compile_atom(atom=atom, params=params, atoms_alphabet=atoms_alphabet)
+			compiled.append(c)
+			end = match.end()
+		if strict and end != len(string):
+			return None
+		return cls._from_compiled(compiled=compiled)
+
+
+class TileTemplate:
+	__slots__ = ['offsets', 'block_types', 'orientations', 'displacement', '_rotated']
+
+	def __init__(self,
+				 offsets: npt.NDArray[np.int64],
+				 block_types: List[str],
+				 orientations: List[Tuple[Orientation, Orientation]],
+				 displacement: npt.NDArray[np.int64]) -> None:
+		"""Create the template of a tile: its blocks relative to the position the tile is placed at.
+
+		Args:
+			offsets (npt.NDArray[np.int64]): The N×3 positions of the blocks, relative to the tile position.
+			block_types (List[str]): The N types of the blocks.
+			orientations (List[Tuple[Orientation, Orientation]]): The N forward and up orientations of the blocks.
+			displacement (npt.NDArray[np.int64]): The position after placing the tile, relative to the tile position.
+		"""
+		self.offsets = offsets
+		self.block_types = block_types
+		self.orientations = orientations
+		self.displacement = displacement
+		# offsets, orientations and displacement, by orientation code of the rotation
+		self._rotated: Dict[int, Tuple[List[Tuple[int, int, int]], List[Tuple[Orientation, Orientation]], Tuple[int, int, int]]] = {}
+
+	@classmethod
+	def from_string(cls,
+					string: str,
+					atoms_alphabet: Dict[str, Any]) -> Optional['TileTemplate']:
+		"""Compile the low-level string of a tile in a template.
+
+		Args:
+			string (str): The low-level string of the tile.
+			atoms_alphabet (Dict[str, Any]): The atoms alphabet.
+
+		Returns:
+			Optional[TileTemplate]: The template, or `None` if the string does not only place blocks and move.
+		"""
+		atoms = _parse_atoms(string=string)
+		if atoms is None:
+			return None
+		position = np.zeros(shape=3, dtype=np.int64)
+		offsets, block_types, orientations = [], [], []
+		for atom, params in atoms:
+			if atom not in atoms_alphabet:
+				return None
+			action, args = atoms_alphabet[atom]['action'], atoms_alphabet[atom]['args']
+			if action == AtomAction.PLACE:
+				if not args or len(params) < 2 or params[0] not in orientation_from_str or params[1] not in orientation_from_str:
+					return None
+				offsets.append(position.copy())
+				block_types.append(args[0])
+				orientations.append((orientation_from_str[params[0]], orientation_from_str[params[1]]))
+			elif action == AtomAction.MOVE and params[0].isdigit():
+				position += np.asarray(args.value.as_tuple(), dtype=np.int64) * int(params[0])
+			else:
+				return None
+		return cls(offsets=np.asarray(offsets, dtype=np.int64).reshape(-1, 3),
+				   block_types=block_types,
+				   orientations=orientations,
+				   displacement=position)
+
+	def rotated(self,
+				code: int) -> Tuple[List[Tuple[int, int, int]], List[Tuple[Orientation, Orientation]], Tuple[int, int, int]]:
+		"""Get the template rotated by an orientation code.
+
+		Args:
+			code (int): The orientation code of the rotation.
+
+		Returns:
+			Tuple[List[Tuple[int, int, int]], List[Tuple[Orientation, Orientation]], Tuple[int, int, int]]: The offsets,
+			orientations and displacement of the rotated template.
+		"""
+		rotated = self._rotated.get(code, None)
+		if rotated is None:
+			m = orientation_rotation_matrices[code]
+			rotated = self._rotated[code] = (list(map(tuple, (self.offsets @ m.T).tolist())),
+											  [(rotate_orientation(code=code, orientation=of), rotate_orientation(code=code, orientation=ou)) for of, ou in self.orientations],
+											  tuple((m @ self.displacement).tolist()))
+		return rotated
+
+
+class BlockOccupancy:
+	__slots__ = ['cell_size', '_cells']
+
+	def __init__(self,
+				 cell_size: int) -> None:
+		"""Track the scaled cells covered by the blocks placed so far, to find overlapping blocks as they are placed.
+		Blocks are kept as boxes in a hash of coarse cells of `cell_size` scaled cells, so a block of the grid size costs a
+		single lookup instead of one per scaled cell.
+
+		Args:
+			cell_size (int): The size of the coarse cells, in scaled cells (usually the grid size).
+		"""
+		self.cell_size = cell_size
+		self._cells: Dict[Tuple[int, int, int], List[Tuple[int, int, int, int, int, int]]] = {}
+
+	def add(self,
+			position: Tuple[int, int, int],
+			size: Tuple[int, int, int]) -> bool:
+		"""Add a block.
+
+		Args:
+			position (Tuple[int, int, int]): The position of the block, in scaled cells.
+			size (Tuple[int, int, int]): The scaled size of the block.
+
+		Returns:
+			bool: Whether the block covers any cell already covered by another block.
+		"""
+		(i0, j0, k0), (si, sj, sk) = position, size
+		i1, j1, k1 = i0 + si, j0 + sj, k0 + sk
+		box = (i0, j0, k0, i1, j1, k1)
+		c = self.cell_size
+		overlaps = False
+		for ci in range(i0 // c, (i1 - 1) // c + 1):
+			for cj in range(j0 // c, (j1 - 1) // c + 1):
+				for ck in range(k0 // c, (k1 - 1) // c + 1):
+					boxes = self._cells.setdefault((ci, cj, ck), [])
+					if not overlaps:
+						for a0, b0, c0, a1, b1, c1 in boxes:
+							if i0 < a1 and a0 < i1 and j0 < b1 and b0 < j1 and k0 < c1 and c0 < k1:
+								overlaps = True
+								break
+					boxes.append(box)
+		return overlaps
+
 
 class StructureMaker(ABC):
 
 	def __init__(self, atoms_alphabet, position: Vec):
-		self.pattern = re.compile(r'(\[|\])|(Rot[XYZ]c{1,2}w[XYZ])|((\w+|\W+)(\(.{1,3}\)))')
+		self.pattern = atoms_re
 		self.atoms_alphabet = atoms_alphabet
-		self._calls = {
-			AtomAction.PLACE: self._place,
-			AtomAction.MOVE: self._move,
-			AtomAction.ROTATE: self._rotate,
-			AtomAction.PUSH: self._push,
-			AtomAction.POP: self._pop
-		}
 		self.position = position
-		self.rotations = []
+		# orientation codes of the rotations composed up to each level of the stack
+		self.rotations: List[int] = []
 		self.position_history = []
 
-	def _apply_rotation(self, arr: Vec) -> Vec:
-		arr = arr.as_array()
-		for rot in reversed(self.rotations):
-			arr = rot.dot(arr)
-		return Vec.from_np(arr)
-
-	def _rotate(self, action_args: Any) -> None:
-		self.rotations.append(rotation_matrices[action_args['action_args']])
-
-	def _move(self, action_args: Any) -> None:
-		dpos = action_args['action_args'].value
-		n = int(action_args['parameters'][0])
-		if self.rotations:
-			dpos = self._apply_rotation(arr=dpos)
-		for _ in range(n):
-			self.position = self.position.sum(dpos)
-
-	def _push(self, action_args: Any) -> None:
-		self.position_history.append(self.position)
-
-	def _pop(self, action_args: Any) -> None:
-		self.position = self.position_history.pop(-1)
-		if self.rotations:
-			self.rotations.pop(-1)
+	def _run(self, programs: List[Union[StructureProgram, TileTemplate]]) -> None:
+		x, y, z = self.position.as_tuple()
+		positions = [p.as_tuple() for p in self.position_history]
+		rotations = self.rotations
+		code = rotations[-1] if rotations else _identity_code
+		for program in programs:
+			if isinstance(program, TileTemplate):
+				offsets, orientations, (dx, dy, dz) = program.rotated(code=code)
+				for (ox, oy, oz), block_type, (orientation_forward, orientation_up) in zip(offsets, program.block_types, orientations):
+					self._place(block_type=block_type,
+								orientation_forward=orientation_forward,
+								orientation_up=orientation_up,
+								grid_position=(x + ox, y + oy, z + oz))
+				x, y, z = x + dx, y + dy, z + dz
+				continue
+			block_types = program.block_types
+			for op, a, b, c in program.ops.tolist():
+				if op == OP_PLACE:
+					self._place(block_type=block_types[a],
+								orientation_forward=rotate_orientation(code=code, orientation=_orientations[b]),
+								orientation_up=rotate_orientation(code=code, orientation=_orientations[c]),
+								grid_position=(x, y, z))
+				elif op == OP_MOVE:
+					if b > 0:
+						dx, dy, dz = _rotated_moves[code][a]
+						x, y, z = x + dx * b, y + dy * b, z + dz * b
+				elif op == OP_ROTATE:
+					code = composition_table[code][a]
+					rotations.append(code)
+				elif op == OP_PUSH:
+					positions.append((x, y, z))
+				elif op == OP_POP:
+					x, y, z = positions.pop(-1)
+					# each pop also drops the last rotation, if any
+					if rotations:
+						rotations.pop(-1)
+					code = rotations[-1] if rotations else _identity_code
+		self.position = Vec.v3i(x, y, z)
+		self.position_history = [Vec.v3i(*p) for p in positions]
 
 	@abstractmethod
-	def _place(self, action_args: Any) -> None:
+	def _place(self,
+			   block_type: str,
+			   orientation_forward: Orientation,
+			   orientation_up: Orientation,
+			   grid_position: Tuple[int, int, int]) -> None:
 		pass
 
 	@abstractmethod
@@ -62,39 +354,105 @@ class StructureMaker(ABC):
 
 class LLStructureMaker(StructureMaker):
 
-	def _place(self, action_args: Any) -> None:
-		orientation_forward, orientation_up = action_args['parameters'][0], action_args['parameters'][1]
-		orientation_forward = orientation_from_str[orientation_forward]
-		orientation_up = orientation_from_str[orientation_up]
-		if self.rotations:
-			orientation_forward = orientation_from_vec(self._apply_rotation(arr=orientation_forward.value))
-			orientation_up = orientation_from_vec(self._apply_rotation(arr=orientation_up.value))
-		block = Block(block_type=action_args['action_args'][0],
+	def __init__(self,
+				 atoms_alphabet,
+				 position: Vec,
+				 abort_on_intersection: bool = False):
+		"""Create a maker of structures from low-level strings.
+		Overlapping blocks are found while the structure is filled, so the structure of a new solution knows whether it
+		has intersections without building its scaled array.
+
+		Args:
+			atoms_alphabet: The atoms alphabet.
+			position (Vec): The starting position.
+			abort_on_intersection (bool, optional): Whether to stop filling the structure at the first overlapping block,
+			raising an `IntersectionException` (the structure keeps the blocks placed until then). Defaults to False.
+		"""
+		super().__init__(atoms_alphabet=atoms_alphabet,
+						 position=position)
+		self.abort_on_intersection = abort_on_intersection
+		self.occupancy: Optional[BlockOccupancy] = None
+		self.has_intersections = False
+
+	def _place(self,
+			   block_type: str,
+			   orientation_forward: Orientation,
+			   orientation_up: Orientation,
+			   grid_position: Tuple[int, int, int]) -> None:
+		block = Block(block_type=block_type,
 					  orientation_forward=orientation_forward,
 					  orientation_up=orientation_up)
+		if self.occupancy is not None and self.occupancy.add(position=grid_position,
+															  size=self._scaled_sizes[block.type_id]):
+			self.has_intersections = True
+			if self.abort_on_intersection:
+				raise IntersectionException(f'Block {block_type} at {grid_position} intersects another block.')
 		self.structure.add_block(block=block,
-								 grid_position=self.position.as_tuple())
+								 grid_position=grid_position)
+
+	def _fill(self,
+			  structure: Structure,
+			  programs: List[Union[StructureProgram, TileTemplate]]) -> Structure:
+		self.structure = structure
+		# overlaps can only be tracked if all blocks are placed by this maker
+		self.occupancy = BlockOccupancy(cell_size=structure.grid_size) if not structure._blocks else None
+		self._scaled_sizes = block_types_registry.scaled_size.tolist()
+		self.has_intersections = False
+		try:
+			self._run(programs=programs)
+		finally:
+			# a structure left partial by an intersection is still made consistent
+			if self.occupancy is not None:
+				# any overlap while filling is either kept or replaced by a block at the same position, which
+				# `Structure.add_block` flags as well
+				structure._has_intersections = self.has_intersections
+			self.structure.sanify()
+		return self.structure
 
 	def fill_structure(self,
 					   structure: Structure,
 					   string: str,
 					   additional_args: Dict[str, Any] = {}) -> Structure:
 		self.additional_args = additional_args
-		self.structure = structure
-		for g1, g2, _, g4, g5 in [match.groups() for match in self.pattern.finditer(string=string)]:
-			if g1 is not None:
-				atom, params = (g1, '')
-			elif g2 is not None:
-				atom, params = (g2, '')
-			else:
-				atom, params = (g4, g5)
-			params = params.replace('(','').replace(')','').split(',')
-			action, args = self.atoms_alphabet[atom]['action'], self.atoms_alphabet[atom]['args']
-			self._calls[action]({
-				'action_args': args,
-    			'parameters': params,
-				'string': atom
-				})
-		self.structure.sanify()
-		
-		return self.structure
+		return self._fill(structure=structure,
+						  programs=[StructureProgram.from_string(string=string,
+															 atoms_alphabet=self.atoms_alphabet)])
+
+	def fill_structure_from_segments(self,
+									 structure: Structure,
+									 segments: List[Tuple[str, Optional[str]]],
+									 templates: Dict[str, TileTemplate],
+									 programs: Dict[str, StructureProgram] = {},
+									 additional_args: Dict[str, Any] = {}) -> Optional[Structure]:
+		"""Fill the structure from the segments of a low-level string, as produced by `LLParser.expand_segments`.
+		Tiles with a template are stamped, while the rest of the string is compiled and run as in `fill_structure`.
+
+		Args:
+			structure (Structure): The structure.
+			segments (List[Tuple[str, Optional[str]]]): The segments of the low-level string.
+			templates (Dict[str, TileTemplate]): The templates of the tiles.
+			programs (Dict[str, StructureProgram], optional): Already compiled segments, by string. They must have been
+			compiled as strict. Defaults to {}.
+			additional_args (Dict[str, Any], optional): Additional arguments. Defaults to {}.
+
+		Returns:
+			Optional[Structure]: The filled structure, or `None` if the segments cannot be parsed on their own (the
+			structure is left untouched and `fill_structure` should be used instead).
+		"""
+		compiled = []
+		for n, (string, tile) in enumerate(segments):
+			program = templates.get(tile, None) if tile is not None else None
+			if program is None:
+				program = programs.get(string, None)
+			if program is None:
+				program = StructureProgram.from_string(string=string,
+													   atoms_alphabet=self.atoms_alphabet,
+													   strict=True)
+			# an atom could span two segments unless each segment is parsed completely and no parameters are closed
+			# right after the start of the next segment
+			if program is None or (n + 1 < len(segments) and ')' in segments[n + 1][0][:2]):
+				return None
+			compiled.append(program)
+		self.additional_args = additional_args
+		return self._fill(structure=structure,
+						  programs=compiled)
@@ -0,0 +1,315 @@
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+import numpy.typing as npt
+
+from pcgsepy.common.str_utils import PrefixTrie
+from pcgsepy.config import PL_HIGH, PL_LOW
+
+
+# Interned atoms, shared by all tokenized strings
+_atom_ids: Dict[str, int] = {}
+_atom_names: List[str] = []
+
+
+def intern_atom(atom: str) -> int:
+    """Get the id of an atom, assigning a new one if the atom has not been seen yet.
+
+    Args:
+        atom (str): The atom.
+
+    Returns:
+        int: The id of the atom.
+    """
+    atom_id = _atom_ids.get(atom, None)
+    if atom_id is None:
+        atom_id = _atom_ids[atom] = len(_atom_names)
+        _atom_names.append(atom)
+    return atom_id
+
+
+def atom_name(atom_id: int) -> str:
+    """Get the atom of an id.
+
+    Args:
+        atom_id (int): The id of the atom.
+
+    Returns:
+        str: The atom.
+    """
+    return _atom_names[atom_id]
+
+
+OPEN_BRACKET = intern_atom('[')
+CLOSE_BRACKET = intern_atom(']')
+
+# Parameter value of atoms without parameter
+NO_PARAM = -1
+
+
+def tokenize(string: str,
+             trie: PrefixTrie) -> Tuple[List[str], List[Optional[str]]]:
+    """Split a string in atoms by longest match, each with the (raw) parameter that follows it, if any.
+    Characters that do not start any atom are kept as single-character atoms without parameter.
+
+    Args:
+        string (str): The string.
+        trie (PrefixTrie): The trie of the atoms.
+
+    Returns:
+        Tuple[List[str], List[Optional[str]]]: The atoms and their parameters.
+    """
+    atoms, params = [], []
+    i, n = 0, len(string)
+    while i < n:
+        k = trie.longest_match(string=string, start=i)
+        if k is None:
+            atoms.append(string[i])
+            params.append(None)
+            i += 1
+        else:
+            i += len(k)
+            p = None
+            if i < n and string[i] == '(':
+                j = string.index(')', i + 1)
+                p = string[i + 1:j]
+                i = j + 1
+            atoms.append(k)
+            params.append(p)
+    return atoms, params
+
+
+class TokenizedString:
+    __slots__ = ['atoms', 'params', 'trie', '_brackets']
+
+    def __init__(self,
+                 atoms: npt.NDArray[np.int32],
+                 params: npt.NDArray[np.int64],
+                 trie: PrefixTrie) -> None:
+        """Create a tokenized string: the ids of its atoms and their numerical parameters (`NO_PARAM` if missing).
+        Tokenized strings are immutable: operations return new instances.
+
+        Args:
+            atoms (npt.NDArray[np.int32]): The ids of the atoms.
+            params (npt.NDArray[np.int64]): The parameters of the atoms.
+            trie (PrefixTrie): The trie of the atoms the string was tokenized with.
+        """
+        self.atoms = atoms
+        self.params = params
+        self.trie = trie
+        self._brackets: Optional[npt.NDArray[np.int32]] = None
+
+    @classmethod
+    def from_string(cls,
+                    string: str,
+                    trie: PrefixTrie) -> 'TokenizedString':
+        """Tokenize a string.
+
+        Args:
+            string (str): The string.
+            trie (PrefixTrie): The trie of the atoms.
+
+        Raises:
+            ValueError: Raised if a parameter is not a non-negative integer.
+
+        Returns:
+            TokenizedString: The tokenized string.
+        """
+        atoms, params = tokenize(string=string, trie=trie)
+        return cls.from_lists(atoms=[intern_atom(atom) for atom in atoms],
+                              params=[NO_PARAM if p is None else int(p) for p in params],
+                              trie=trie)
+
+    @classmethod
+    def from_lists(cls,
+                   atoms: List[int],
+                   params: List[int],
+                   trie: PrefixTrie) -> 'TokenizedString':
+        """Create a tokenized string from lists of atoms ids and parameters.
+
+        Args:
+            atoms (List[int]): The ids of the atoms.
+            params (List[int]): The parameters of the atoms.
+            trie (PrefixTrie): The trie of the atoms.
+
+        Returns:
+            TokenizedString: The tokenized string.
+        """
+        return cls(atoms=np.asarray(atoms, dtype=np.int32),
+                   params=np.asarray(params, dtype=np.int64),
+                   trie=trie)
+
+    @staticmethod
+    def concatenate(tss: Iterable['TokenizedString']) -> 'TokenizedString':
+        """Concatenate tokenized strings, as `string_merging` does for strings.
+
+        Args:
+            tss (Iterable[TokenizedString]): The tokenized strings. They must share the same trie.
+
+        Raises:
+            ValueError: Raised if no string is passed or the strings have different tries.
+
+        Returns:
+            TokenizedString: The concatenated tokenized string.
+        """
+        tss = list(tss)
+        if not tss:
+            raise ValueError('Cannot concatenate an empty list of tokenized strings.')
+        if any(ts.trie.keys != tss[0].trie.keys for ts in tss[1:]):
+            raise ValueError('Cannot concatenate strings tokenized with different atoms.')
+        return TokenizedString(atoms=np.concatenate([ts.atoms for ts in tss]),
+                               params=np.concatenate([ts.params for ts in tss]),
+                               trie=tss[0].trie)
+
+    def __len__(self) -> int:
+        return len(self.atoms)
+
+    def __eq__(self,
+               other: 'TokenizedString') -> bool:
+        if isinstance(other, TokenizedString):
+            return np.array_equal(self.atoms, other.atoms) and np.array_equal(self.params, other.params)
+        return False
+
+    def __hash__(self) -> int:
+        return hash((self.atoms.tobytes(), self.params.tobytes()))
+
+    def __repr__(self) -> str:
+        return f'TokenizedString({self.to_string()!r})'
+
+    def atoms_names(self) -> List[str]:
+        """Get the atoms of the string.
+
+        Returns:
+            List[str]: The atoms.
+        """
+        return [_atom_names[a] for a in self.atoms.tolist()]
+
+    def to_string(self) -> str:
+        """Render the string.
+
+        Returns:
+            str: The string.
+        """
+        return ''.join([_atom_names[a] if p == NO_PARAM else f'{_atom_names[a]}({p})'
+                        for a, p in zip(self.atoms.tolist(), self.params.tolist())])
+
+    @property
+    def brackets(self) -> npt.NDArray[np.int32]:
+        """Get the index of the matching bracket of each atom (`-1` if the atom is not a bracket).
+        Unmatched closing brackets are ignored, as in `get_matching_brackets`.
+
+        Raises:
+            ValueError: Raised if an opening bracket is not closed.
+
+        Returns:
+            npt.NDArray[np.int32]: The indices of the matching brackets.
+        """
+        if self._brackets is None:
+            brackets = np.full(shape=len(self.atoms), fill_value=-1, dtype=np.int32)
+            stack = []
+            is_open = self.atoms == OPEN_BRACKET
+            for i in np.flatnonzero(is_open | (self.atoms == CLOSE_BRACKET)).tolist():
+                if is_open[i]:
+                    stack.append(i)
+                elif stack:
+                    j = stack.pop()
+                    brackets[i], brackets[j] = j, i
+            if stack:
+                raise ValueError(f'Unmatched opening bracket at token {stack[-1]}.')
+            brackets.flags.writeable = False
+            self._brackets = brackets
+        return self._brackets
+
+    def matching_brackets(self) -> List[Tuple[int, int]]:
+        """Get the indices of the matching brackets pairs, sorted by opening bracket.
+
+        Returns:
+            List[Tuple[int, int]]: The list of pair indexes.
+        """
+        opening = np.flatnonzero(self.atoms == OPEN_BRACKET)
+        return list(zip(opening.tolist(), self.brackets[opening].tolist()))
+
+
+# Numerical parameters placeholders in the rules
+_placeholders = ['x', 'X', 'Y']
+# Parameter of a LHS token that matches any single digit
+_ANY_DIGIT = -2
+
+
+class TokenRules:
+    def __init__(self,
+                 lhs: List[str],
+                 trie: PrefixTrie) -> None:
+        """Compile the LHS of a rule set as sequences of tokens, indexed by their first atom.
+        The LHS are tried as in `CompiledRules`: longest first, then in rule set order.
+
+        Args:
+            lhs (List[str]): The LHS of the rule set, in order.
+            trie (PrefixTrie): The trie of the atoms.
+        """
+        self.trie = trie
+        self._by_first: Dict[int, List[Tuple[str, List[Tuple[int, int]]]]] = {}
+        for i in sorted(range(len(lhs)), key=lambda i: -len(lhs[i])):
+            atoms, params = tokenize(string=lhs[i], trie=trie)
+            pattern = [(intern_atom(atom), NO_PARAM if p is None else _ANY_DIGIT if p in _placeholders else int(p)) for atom, p in zip(atoms, params)]
+            self._by_first.setdefault(pattern[0][0], []).append((lhs[i], pattern))
+        self._templates: Dict[str, Tuple[List[int], List[Union[int, str]]]] = {}
+
+    def matches(self,
+                ts: TokenizedString) -> List[Tuple[int, int, str, Optional[int]]]:
+        """Get the non-overlapping matches of the LHS in the tokenized string, sorted by position.
+
+        Args:
+            ts (TokenizedString): The tokenized string.
+
+        Returns:
+            List[Tuple[int, int, str, Optional[int]]]: The start and end token, the LHS and the first digit of the
+            parameters of each match (`None` if the match has no parameters).
+        """
+        atoms, params = ts.atoms.tolist(), ts.params.tolist()
+        matches = []
+        i, n = 0, len(atoms)
+        while i < n:
+            for lhs, pattern in self._by_first.get(atoms[i], []):
+                end = i + len(pattern)
+                if end <= n and all(atoms[j] == a and (params[j] == p or (p == _ANY_DIGIT and 0 <= params[j] <= 9)) for j, (a, p) in zip(range(i, end), pattern)):
+                    digit = next((int(str(p)[0]) for p in params[i:end] if p != NO_PARAM), None)
+                    matches.append((i, end, lhs, digit))
+                    i = end
+                    break
+            else:
+                i += 1
+        return matches
+
+    def fill_parameters(self,
+                        rhs: str,
+                        digit: Optional[int],
+                        rng: Optional[np.random.Generator] = None) -> Tuple[List[int], List[int]]:
+        """Tokenize the RHS, replacing the numerical parameters placeholders as `CompiledRules.fill_parameters`.
+
+        Args:
+            rhs (str): The RHS.
+            digit (Optional[int]): The first digit of the parameters of the matched LHS.
+            rng (Optional[np.random.Generator], optional): The random generator used to sample `X`. If `None`, the global NumPy random state is used. Defaults to None.
+
+        Raises:
+            ValueError: Raised if the RHS uses the LHS parameter but the matched LHS has none.
+
+        Returns:
+            Tuple[List[int], List[int]]: The atoms and the parameters of the RHS.
+        """
+        template = self._templates.get(rhs, None)
+        if template is None:
+            atoms, params = tokenize(string=rhs, trie=self.trie)
+            template = self._templates[rhs] = ([intern_atom(atom) for atom in atoms],
+                                               [NO_PARAM if p is None else p if p in _placeholders else int(p) for p in params])
+        atoms, params = template
+        if not any(isinstance(p, str) for p in params):
+            return atoms, params
+        rhs_n = np.random.randint(PL_LOW, PL_HIGH) if rng is None else int(rng.integers(PL_LOW, PL_HIGH))
+        if digit is None and any(p in ('x', 'Y') for p in params):
+            raise ValueError(f'Rule {rhs} requires a parameter in its LHS.')
+        values = {'x': digit,
+                  'X': rhs_n,
+                  'Y': max(1, digit - rhs_n) if digit is not None else None}
+        return atoms, [values[p] if isinstance(p, str) else p for p in params]
@@ -1,6 +1,6 @@
 from typing import Any, Dict, Tuple
-import numpy as np
 
+from pcgsepy.common.symmetry import symmetry_score
 from pcgsepy.lsystem.solution import CandidateSolution
 
 
@@ -89,26 +89,8 @@ def symmetry(cs: CandidateSolution):
     structure = cs.content
     pivot_blocktype = 'MyObjectBuilder_Cockpit_OpenCockpitLarge'
     midpoint = [x for x in structure._blocks.values() if x.block_type == pivot_blocktype][0].position.scale(1 / structure.grid_size).to_veci()
-    arr = structure.as_grid_array
-    
-    # along x
-    x_shape = max(midpoint.x, arr.shape[0] - midpoint.x)
-    upper = np.zeros((x_shape, arr.shape[1], arr.shape[2]))
-    lower = np.zeros((x_shape, arr.shape[1], arr.shape[2]))
-    upper[np.nonzero(np.flip(arr[midpoint.x:, :, :], 1))] = np.flip(arr[midpoint.x:, :, :], 1)[np.nonzero(np.flip(arr[midpoint.x:, :, :], 1))]
-    lower[np.nonzero(arr[:midpoint.x - 1, :, :])] = arr[np.nonzero(arr[:midpoint.x - 1, :, :])]
-    err_x = abs(np.sum(upper - lower))
-    
-    # along z
-    z_shape = max(midpoint.z, arr.shape[2] - midpoint.z)
-    upper = np.zeros((arr.shape[0], arr.shape[1], z_shape))
-    lower = np.zeros((arr.shape[0], arr.shape[1], z_shape))
-    tmp = np.flip(arr[:, :, midpoint.z:], 2)
-    upper[np.nonzero(np.flip(arr[:, :, midpoint.z:], 2))] = np.flip(arr[:, :, midpoint.z:], 2)[np.nonzero(np.flip(arr[:, :, midpoint.z:], 2))]
-    lower[np.nonzero(arr[:, :, :midpoint.z - 1])] = arr[np.nonzero(arr[:, :, :midpoint.z - 1])]
-    err_z = abs(np.sum(upper - lower))
-        
-    return 1 - (min(err_x, err_z) / np.sum(arr))
+    return symmetry_score(arr=structure.as_grid_array,
+                          midpoint=midpoint.as_tuple())
 
 
 behavior_funcs = {
@@ -11,7 +11,8 @@ from joblib import Parallel, delayed
 from pcgsepy.common.jsonifier import json_dumps, json_loads
 from pcgsepy.config import (ALIGNMENT_INTERVAL, BIN_POP_SIZE, CS_MAX_AGE,
                             EPSILON_F, MAX_X_SIZE, MAX_Y_SIZE, MAX_Z_SIZE,
-                            N_ITERATIONS, N_RETRIES, POP_SIZE, USE_TORCH)
+                            N_ITERATIONS, N_RETRIES, POP_SIZE,
+                            SKIP_DUPLICATE_CONTENT, USE_TORCH)
 from pcgsepy.evo.fitness import (Fitness, box_filling_fitness,
                                  func_blocks_fitness, mame_fitness,
                                  mami_fitness)
@@ -269,6 +270,8 @@ class MAPElites:
         self._set_behavior_descriptors(cs=cs)
         # set age
         cs.age = CS_MAX_AGE
+        # solutions may be kept in the archive, so reduce their memory footprint
+        cs.content.compact()
         return cs
 
     def _prepare_cs_content(self,
@@ -489,19 +492,23 @@ class MAPElites:
         self.lsystem.disable_sat_check()
         with trange(n_retries, desc='Initialization ') as iterations:
             for i in iterations:
-                solutions = self.lsystem.apply_rules(starting_strings=['head', 'body', 'tail'],
-                                                     iterations=[1, N_ITERATIONS, 1],
-                                                     create_structures=True,
-                                                     make_graph=False)
-                subdivide_solutions(lcs=solutions,
-                                    lsystem=self.lsystem)
-                for cs in solutions:
-                    if cs.is_feasible and len(feasible_pop) < pop_size and cs not in feasible_pop:
-                        if self.hull_builder is not None:
-                            self.hull_builder.add_external_hull(structure=cs._content)
-                        feasible_pop.append(self._assign_fitness(cs=cs))
-                    elif not cs.is_feasible and len(infeasible_pop) < pop_size and cs not in feasible_pop:
-                        infeasible_pop.append(self._assign_fitness(cs=cs))
+                # solutions are merged and built one at a time, so no structure is built once both populations are full
+                for cs in self.lsystem.iter_solutions(starting_strings=['head', 'body', 'tail'],
+                                                      iterations=[1, N_ITERATIONS, 1],
+                                                      create_structures=True,
+                                                      make_graph=False):
+                    solutions = [cs]
+                    subdivide_solutions(lcs=solutions,
+                                        lsystem=self.lsystem)
+                    for cs in solutions:
+                        if cs.is_feasible and len(feasible_pop) < pop_size and cs not in feasible_pop:
+                            if self.hull_builder is not None:
+                                self.hull_builder.add_external_hull(structure=cs._content)
+                            feasible_pop.append(self._assign_fitness(cs=cs))
+                        elif not cs.is_feasible and len(infeasible_pop) < pop_size and cs not in feasible_pop:
+                            infeasible_pop.append(self._assign_fitness(cs=cs))
+                    if len(feasible_pop) == pop_size and len(infeasible_pop) == pop_size:
+                        break
                 iterations.set_postfix(ordered_dict={
                     'fpop-size': f'{len(feasible_pop)}/{pop_size}',
                     'ipop-size': f'{len(infeasible_pop)}/{pop_size}'
@@ -517,6 +524,25 @@ class MAPElites:
         if self.emitter is not None and self.emitter.requires_init:
             self.emitter.init_emitter(bins=self.bins)
 
+    def _remove_duplicate_contents(self,
+                                   lcs: List[CandidateSolution]) -> List[CandidateSolution]:
+        """Remove the solutions whose content is the same as another solution's, either in the list or in the archive.
+
+        Args:
+            lcs (List[CandidateSolution]): The list of solutions.
+
+        Returns:
+            List[CandidateSolution]: The solutions with new content.
+        """
+        seen = set([cs.content_hash for cbin in self.bins.flatten().tolist() for cs in [*cbin._feasible, *cbin._infeasible]])
+        unique_lcs = []
+        for cs in lcs:
+            if cs.content_hash not in seen:
+                seen.add(cs.content_hash)
+                unique_lcs.append(cs)
+        logging.getLogger('mapelites').debug(msg=f'[{__name__}._remove_duplicate_contents] Removed {len(lcs) - len(unique_lcs)} solutions with duplicate content.')
+        return unique_lcs
+
     def _step(self,
               populations: List[List[CandidateSolution]],
               gen: int) -> List[CandidateSolution]:
@@ -547,6 +573,8 @@ class MAPElites:
                     new_pool = list(map(lambda cs: self.lsystem._add_ll_strings(cs=cs), new_pool))
                     new_pool = list(map(lambda cs: self.lsystem._set_structure(cs=cs,
                                                                                make_graph=False), new_pool))
+                    if SKIP_DUPLICATE_CONTENT:
+                        new_pool = self._remove_duplicate_contents(lcs=new_pool)
                     logging.getLogger('mapelites').debug(msg=f'[{__name__}._step] {len(new_pool)=}')
                     subdivide_solutions(lcs=new_pool,
                                         lsystem=self.lsystem)
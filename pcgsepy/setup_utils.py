@@ -1,8 +1,9 @@
 import copy
 import json
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional
 
 import matplotlib
+import numpy as np
 from matplotlib import pyplot as plt
 
 from pcgsepy.common.vecs import Vec, orientation_from_str
@@ -44,11 +45,14 @@ def setup_matplotlib(type3_fix: bool = True,
         plt.rc('figure', titlesize=BIGGER_SIZE)  # fontsize of the figure title
 
 
-def get_default_lsystem(used_ll_blocks: List[str]) -> LSystem:
+def get_default_lsystem(used_ll_blocks: List[str],
+                        rng: Optional[np.random.Generator] = None) -> LSystem:
     """Get the default L-system.
 
     Args:
         used_ll_blocks (List[str]): List of game blocks used.
+        rng (Optional[np.random.Generator], optional): The random generator used by the rulesets, e.g. to give parallel
+        workers independent and reproducible streams. If `None`, the global NumPy random state is used. Defaults to None.
 
     Returns:
         LSystem: The default L-system.
@@ -80,8 +84,8 @@ def get_default_lsystem(used_ll_blocks: List[str]) -> LSystem:
     ll_alphabet.update({k: {"action": AtomAction.PLACE, "args": [k]}
                        for k in used_ll_blocks})
     # create the rulesets
-    hl_rules = RuleMaker(ruleset='hlrules_sm').get_rules()
-    ll_rules = RuleMaker(ruleset='llrules').get_rules()
+    hl_rules = RuleMaker(ruleset='hlrules_sm').get_rules(rng=rng)
+    ll_rules = RuleMaker(ruleset='llrules').get_rules(rng=rng)
     # create the parsers
     hl_parser = HLParser(rules=hl_rules)
     ll_parser = LLParser(rules=ll_rules)
@@ -1,18 +1,19 @@
 import json
 import os
-from copy import deepcopy
-from functools import cached_property
-from typing import Dict, List, Set, Tuple
+from collections.abc import MutableMapping
+from itertools import chain
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
 
 import matplotlib.pyplot as plt
 import numpy as np
 import numpy.typing as npt
 
-from pcgsepy.common.api_call import block_definitions
-from pcgsepy.common.vecs import Orientation, Vec
-
-# Sizes of blocks in grid spaces
-_blocks_sizes = {'Small': 1, 'Normal': 2, 'Large': 5}
+from pcgsepy.common.api_call import (_base_blocks, _blocks_sizes,
+                                     _transparent_blocks, block_definitions,
+                                     block_types, clean_label)
+from pcgsepy.common.vecs import Orientation, Vec, VecArray
+from pcgsepy.common.voxelgrid import ChunkedVoxelGrid
+from pcgsepy.config import MAX_DENSE_VOXELS
 
 
 grid_to_coords = 0.5
@@ -49,7 +50,54 @@ class MountPoint:
         return str(self.__dict__)
 
 
+class BlockMetadata:
+    __slots__ = ['cube_size', 'size', 'mass', 'scaled_size', 'volume', 'center', 'mountpoints', 'definition_id']
+
+    def __init__(self,
+                 block_type: str) -> None:
+        """Create the metadata of a block type, as provided by the API. Metadata is shared by all blocks of the same type
+        and must not be modified.
+
+        Args:
+            block_type (str): The type of the block (unique type from Space Engineers API).
+        """
+        definition = block_definitions[block_type]
+        self.cube_size: str = definition['cube_size']
+        self.size: Vec = Vec.from_json(definition['size'])
+        self.mass: float = float(definition['mass'])
+        self.scaled_size: Vec = self.size.scale(_blocks_sizes[self.cube_size])
+        self.volume: float = self.scaled_size.bbox()
+        self.center: Vec = self.scaled_size.scale(v=0.5)
+        self.mountpoints: List[MountPoint] = [MountPoint(face=v['Normal'],
+                                                         start=v['Start'],
+                                                         end=v['End'],
+                                                         exclusion_mask=v['ExclusionMask'],
+                                                         properties_mask=v['PropertiesMask'],
+                                                         block_size=self.scaled_size) for v in definition['mountpoints']]
+        self.definition_id: Dict[str, str] = definition['definition_id']
+
+
+# Metadata of the block types, indexed by type id and created on first use
+_blocks_metadata: Dict[int, BlockMetadata] = {}
+
+
+def get_block_metadata(type_id: int) -> BlockMetadata:
+    """Get the shared metadata of a block type.
+
+    Args:
+        type_id (int): The id of the block type.
+
+    Returns:
+        BlockMetadata: The metadata.
+    """
+    if type_id not in _blocks_metadata:
+        _blocks_metadata[type_id] = BlockMetadata(block_type=block_types.get_type(type_id))
+    return _blocks_metadata[type_id]
+
+
 class Block:
+    __slots__ = ['block_type', 'type_id', 'orientation_forward', 'orientation_up', 'position', 'color', '_meta']
+
     def __init__(self,
                  block_type: str,
                  orientation_forward: Orientation = Orientation.FORWARD,
@@ -64,83 +112,106 @@ class Block:
             position (Vec, optional): The position the block. Defaults to `Vec.v3f(0., 0., 0.)`.
         """
         self.block_type = block_type
+        self.type_id = block_types.get_id(block_type)
         self.orientation_forward = orientation_forward.value
         self.orientation_up = orientation_up.value
         self.position = position
-        self.definition_id = block_definitions[self.block_type]['definition_id']
         self.color = Vec.v3f(x=0.45, y=0.45, z=0.45)  # default block color is #737373
-    
-    @cached_property
-    def cube_size(self) -> float:
+        self._meta = get_block_metadata(type_id=self.type_id)
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # metadata is shared, so it is not serialized
+        return {k: getattr(self, k) for k in Block.__slots__ if k != '_meta'}
+
+    def __setstate__(self,
+                     state: Union[Dict[str, Any], Tuple[Optional[Dict[str, Any]], Dict[str, Any]]]) -> None:
+        # blocks pickled before `__slots__` hold their `__dict__`, with the definition id and the cached properties
+        # that are now read from the shared metadata
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for k, v in state.items():
+            if k in Block.__slots__ and k != '_meta':
+                setattr(self, k, v)
+        if state.get('type_id', None) is None:
+            self.type_id = block_types.get_id(self.block_type)
+        self._meta = get_block_metadata(type_id=self.type_id)
+
+    @property
+    def definition_id(self) -> Dict[str, str]:
+        """Get the definition id of the block, as provided by the API.
+
+        Returns:
+            Dict[str, str]: The definition id.
+        """
+        return self._meta.definition_id
+
+    @property
+    def cube_size(self) -> str:
         """Get the size of the cube block, as provided by the API.
 
         Returns:
-            float: The size of the cube block.
+            str: The size of the cube block.
         """
-        return block_definitions[self.block_type]['cube_size']
-    
-    @cached_property
+        return self._meta.cube_size
+
+    @property
     def size(self) -> Vec:
         """Get the size of the block, as provided by the API.
 
         Returns:
             float: The size of the block.
         """
-        return Vec.from_json(block_definitions[self.block_type]['size'])
-    
-    @cached_property
+        return self._meta.size
+
+    @property
     def mass(self) -> float:
         """Get the mass of the block, as provided by the API.
 
         Returns:
             float: The mass of the block.
         """
-        return float(block_definitions[self.block_type]['mass'])
-    
-    @cached_property
+        return self._meta.mass
+
+    @property
     def scaled_size(self) -> Vec:
         """Get the scaled size of the block.
 
         Returns:
             float: The scaled size of the block.
         """
-        return self.size.scale(_blocks_sizes[self.cube_size])
+        return self._meta.scaled_size
 
-    @cached_property
+    @property
     def volume(self) -> float:
         """Compute the volume of the block.
 
         Returns:
             float: The volume of the block.
         """
-        return self.scaled_size.bbox()
-    
-    @cached_property
+        return self._meta.volume
+
+    @property
     def center(self) -> Vec:
         """Get the center point of the block.
 
         Returns:
             Vec: The center point of the vector.
         """
-        return self.scaled_size.scale(v=0.5)
-    
-    @cached_property
+        return self._meta.center
+
+    @property
     def mountpoints(self) -> List[MountPoint]:
-        """Generate the mountpoints of the block.
+        """Get the mountpoints of the block.
 
         Returns:
             List[MountPoint]: The list of mountpoints, one per face.
         """
-        return [MountPoint(face=v['Normal'],
-                           start=v['Start'],
-                           end=v['End'],
-                           exclusion_mask=v['ExclusionMask'],
-                           properties_mask=v['PropertiesMask'],
-                           block_size=self.scaled_size) for v in block_definitions[self.block_type]['mountpoints']]
+        return self._meta.mountpoints
 
     def duplicate(self,
                   new_pos: Vec) -> "Block":
         """Duplicate the current block with a new position.
+        The duplicate shares the orientation and color vectors of the block.
 
         Args:
             new_pos (Vec): The new position.
@@ -148,8 +219,14 @@ class Block:
         Returns:
             Block: The duplicated block.
         """
-        new_block = deepcopy(self)
+        new_block = Block.__new__(Block)
+        new_block.block_type = self.block_type
+        new_block.type_id = self.type_id
+        new_block.orientation_forward = self.orientation_forward
+        new_block.orientation_up = self.orientation_up
         new_block.position = new_pos
+        new_block.color = self.color
+        new_block._meta = self._meta
         return new_block
 
     def __str__(self) -> str:
@@ -159,6 +236,257 @@ class Block:
         return str(self)
 
 
+# Orientation vectors, indexed as stored in `CompactBlocks`
+_orientation_vecs = [o.value for o in Orientation]
+_orientation_idxs = {o.value.as_tuple(): i for i, o in enumerate(Orientation)}
+
+
+class _BlockView(Block):
+    __slots__ = ['_storage', '_row']
+
+    def __init__(self,
+                 storage: "CompactBlocks",
+                 row: int) -> None:
+        """Create a view on a block stored in a `CompactBlocks` storage.
+        Only the color can be modified through the view; views are invalidated when blocks are removed from the storage.
+
+        Args:
+            storage (CompactBlocks): The storage.
+            row (int): The row of the block in the storage.
+        """
+        self._storage = storage
+        self._row = row
+
+    @property
+    def type_id(self) -> int:
+        return int(self._storage._type_ids[self._row])
+
+    @property
+    def block_type(self) -> str:
+        return block_types.types[self._storage._type_ids[self._row]]
+
+    @property
+    def _meta(self) -> BlockMetadata:
+        return get_block_metadata(type_id=self.type_id)
+
+    @property
+    def orientation_forward(self) -> Vec:
+        return _orientation_vecs[self._storage._orientations[self._row] // len(_orientation_vecs)]
+
+    @property
+    def orientation_up(self) -> Vec:
+        return _orientation_vecs[self._storage._orientations[self._row] % len(_orientation_vecs)]
+
+    @property
+    def position(self) -> Vec:
+        x, y, z = self._storage._positions[self._row].tolist()
+        position = Vec.v3i(x, y, z)
+        return position if self._storage.origin is None else self._storage.origin.sum(position)
+
+    @property
+    def color(self) -> Vec:
+        return self._storage.palette[self._storage._colors[self._row]]
+
+    @color.setter
+    def color(self,
+              color: Vec) -> None:
+        self._storage._colors[self._row] = self._storage._palette_index(color=color)
+
+    def duplicate(self,
+                  new_pos: Vec) -> Block:
+        """Duplicate the viewed block with a new position. The duplicate is a standalone `Block`.
+
+        Args:
+            new_pos (Vec): The new position.
+
+        Returns:
+            Block: The duplicated block.
+        """
+        orientations = list(Orientation)
+        code = self._storage._orientations[self._row]
+        new_block = Block(block_type=self.block_type,
+                          orientation_forward=orientations[code // len(orientations)],
+                          orientation_up=orientations[code % len(orientations)],
+                          position=new_pos)
+        new_block.color = self.color
+        return new_block
+
+
+class CompactBlocks(MutableMapping):
+    __slots__ = ['_positions', '_type_ids', '_orientations', '_colors', '_n', '_index', 'palette', 'origin']
+
+    def __init__(self,
+                 blocks: Optional[Dict[Tuple[int, int, int], Block]] = None) -> None:
+        """Create a compact, struct-of-arrays storage of blocks.
+        Grid positions are stored as `int16`, block types as `uint16` ids, orientations as a `uint8` code and colors
+        as `uint8` indices in a palette. It can be used in place of the `Structure`'s blocks dictionary: blocks are
+        returned as lightweight views on the arrays.
+
+        Args:
+            blocks (Optional[Dict[Tuple[int, int, int], Block]], optional): The initial blocks. Defaults to `None`.
+        """
+        self._positions: npt.NDArray[np.int16] = np.zeros(shape=(0, 3), dtype=np.int16)
+        self._type_ids: npt.NDArray[np.uint16] = np.zeros(shape=0, dtype=np.uint16)
+        self._orientations: npt.NDArray[np.uint8] = np.zeros(shape=0, dtype=np.uint8)
+        self._colors: npt.NDArray[np.uint8] = np.zeros(shape=0, dtype=np.uint8)
+        self._n: int = 0
+        self._index: Optional[Dict[Tuple[int, int, int], int]] = None
+        self.palette: List[Vec] = []
+        self.origin: Optional[Vec] = None
+        if blocks:
+            self._reserve(n=len(blocks))
+            for k, block in blocks.items():
+                self[k] = block
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the lookup index is rebuilt on demand
+        return {'positions': self.positions, 'type_ids': self.type_ids, 'orientations': self._orientations[:self._n],
+                'colors': self._colors[:self._n], 'palette': self.palette, 'origin': self.origin}
+
+    def __setstate__(self,
+                     state: Dict[str, Any]) -> None:
+        self._positions = state['positions'].copy()
+        self._type_ids = state['type_ids'].copy()
+        self._orientations = state['orientations'].copy()
+        self._colors = state['colors'].copy()
+        self._n = len(self._type_ids)
+        self._index = None
+        self.palette = state['palette']
+        self.origin = state['origin']
+
+    @property
+    def positions(self) -> npt.NDArray[np.int16]:
+        """Get the grid positions of the blocks.
+
+        Returns:
+            npt.NDArray[np.int16]: The N×3 positions.
+        """
+        return self._positions[:self._n]
+
+    @property
+    def type_ids(self) -> npt.NDArray[np.uint16]:
+        """Get the type ids of the blocks.
+
+        Returns:
+            npt.NDArray[np.uint16]: The N type ids.
+        """
+        return self._type_ids[:self._n]
+
+    def _reserve(self,
+                 n: int) -> None:
+        """Grow the arrays to fit at least `n` blocks.
+
+        Args:
+            n (int): The number of blocks.
+        """
+        if n > len(self._type_ids):
+            capacity = max(n, 2 * len(self._type_ids), 16)
+            self._positions = np.resize(self._positions, (capacity, 3))
+            self._type_ids = np.resize(self._type_ids, capacity)
+            self._orientations = np.resize(self._orientations, capacity)
+            self._colors = np.resize(self._colors, capacity)
+
+    def _palette_index(self,
+                       color: Vec) -> int:
+        """Get the index of the color in the palette, adding it if needed.
+
+        Args:
+            color (Vec): The color.
+
+        Returns:
+            int: The index of the color.
+        """
+        if color not in self.palette:
+            assert len(self.palette) < 256, 'Too many colors in the palette.'
+            self.palette.append(color)
+        return self.palette.index(color)
+
+    def _row(self,
+             key: Tuple[int, int, int]) -> Optional[int]:
+        """Get the row of the block at the given grid position.
+
+        Args:
+            key (Tuple[int, int, int]): The grid position.
+
+        Returns:
+            Optional[int]: The row, or `None` if there is no block.
+        """
+        if self._index is None:
+            self._index = dict(zip(map(tuple, self.positions.tolist()), range(self._n)))
+        return self._index.get(tuple(key), None)
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __iter__(self) -> Iterator[Tuple[int, int, int]]:
+        return iter(map(tuple, self.positions.tolist()))
+
+    def __contains__(self,
+                     key: Tuple[int, int, int]) -> bool:
+        return self._row(key=key) is not None
+
+    def __getitem__(self,
+                    key: Tuple[int, int, int]) -> Block:
+        row = self._row(key=key)
+        if row is None:
+            raise KeyError(key)
+        return _BlockView(storage=self, row=row)
+
+    def __setitem__(self,
+                    key: Tuple[int, int, int],
+                    block: Block) -> None:
+        row = self._row(key=key)
+        if row is None:
+            self._reserve(n=self._n + 1)
+            row = self._n
+            self._n += 1
+            self._positions[row] = key
+            self._index[tuple(key)] = row
+        self._type_ids[row] = block.type_id
+        self._orientations[row] = _orientation_idxs[block.orientation_forward.as_tuple()] * len(_orientation_vecs) + _orientation_idxs[block.orientation_up.as_tuple()]
+        self._colors[row] = self._palette_index(color=block.color)
+
+    def __delitem__(self,
+                     key: Tuple[int, int, int]) -> None:
+        row = self._row(key=key)
+        if row is None:
+            raise KeyError(key)
+        keep = np.arange(self._n) != row
+        self._positions = self.positions[keep]
+        self._type_ids = self.type_ids[keep]
+        self._orientations = self._orientations[:self._n][keep]
+        self._colors = self._colors[:self._n][keep]
+        self._n -= 1
+        self._index = None
+
+    def values(self) -> List[Block]:
+        return [_BlockView(storage=self, row=row) for row in range(self._n)]
+
+    def items(self) -> List[Tuple[Tuple[int, int, int], Block]]:
+        return list(zip(self, self.values()))
+
+    def set_positions(self,
+                      positions: npt.NDArray[np.int64]) -> None:
+        """Move all blocks to new grid positions.
+
+        Args:
+            positions (npt.NDArray[np.int64]): The N×3 new positions, in storage order.
+        """
+        self._positions[:self._n] = positions
+        self._index = None
+
+    def set_colors(self,
+                   mask: npt.NDArray[np.bool_],
+                   color: Vec) -> None:
+        """Set the color of the selected blocks.
+
+        Args:
+            mask (npt.NDArray[np.bool_]): The N boolean mask of the blocks to color.
+            color (Vec): The color.
+        """
+        self._colors[:self._n][mask] = self._palette_index(color=color)
+
+
 class IntersectionException(Exception):
     """
     Exception to throw when an intersection occurs.
@@ -175,8 +503,7 @@ def _is_base_block(block_type: str) -> bool:
     Returns:
         bool: Whether the block is a base block.
     """
-    return block_type in ['LargeBlockArmorCorner', 'LargeBlockArmorSlope',
-                          'LargeBlockArmorCornerInv', 'LargeBlockArmorBlock']
+    return block_type in _base_blocks
 
 
 def _is_transparent_block(block_type: str) -> bool:
@@ -188,17 +515,312 @@ def _is_transparent_block(block_type: str) -> bool:
     Returns:
         bool: Whether the block is a transparent block.
     """
-    return block_type in ["Window1x1Slope", "Window1x1Flat"]
+    return block_type in _transparent_blocks
+
+
+def _rasterize_blocks(shape: Tuple[int, int, int],
+                      positions: npt.NDArray[np.int64],
+                      sizes: npt.NDArray[np.int64]) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], bool]:
+    """Compute the cells covered by the blocks, without allocating an array of the given shape.
+    Each block covers the cells from its position up to its size (clipped at the array bounds), blocks placed later
+    overwrite earlier ones, and a collision is reported if any cell is covered by more than one block.
+
+    Args:
+        shape (Tuple[int, int, int]): The shape of the array.
+        positions (npt.NDArray[np.int64]): The N×3 positions of the blocks, in placement order.
+        sizes (npt.NDArray[np.int64]): The N×3 sizes of the blocks, in cells.
+
+    Returns:
+        Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64], bool]: The flat indices of the covered cells, the block
+        owning each of them, and whether any collision occurred.
+    """
+    if len(positions) == 0:
+        return np.zeros(shape=0, dtype=np.int64), np.zeros(shape=0, dtype=np.int64), False
+    cells, owners = [], []
+    # blocks with the same size share the same offsets, so expand them together
+    unique_sizes, inverse = np.unique(sizes, axis=0, return_inverse=True)
+    for n, size in enumerate(unique_sizes):
+        idxs = np.flatnonzero(inverse == n)
+        offsets = np.indices(size).reshape(3, -1).T
+        cells.append((positions[idxs, np.newaxis, :] + offsets[np.newaxis, :, :]).reshape(-1, 3))
+        owners.append(np.repeat(idxs, len(offsets)))
+    cells, owners = np.concatenate(cells), np.concatenate(owners)
+    within = np.all((cells >= 0) & (cells < shape), axis=1)
+    flat = np.ravel_multi_index(cells[within].T, shape)
+    owners = owners[within]
+    sorted_flat = np.sort(flat)
+    has_collisions = bool(np.any(sorted_flat[1:] == sorted_flat[:-1]))
+    if has_collisions:
+        # keep the last block written in each cell
+        order = np.argsort(owners, kind='stable')
+        flat, owners = flat[order][::-1], owners[order][::-1]
+        flat, last = np.unique(flat, return_index=True)
+        owners = owners[last]
+    return flat, owners, has_collisions
+
+
+def _iter_block_cells(shape: Tuple[int, int, int],
+                      positions: npt.NDArray[np.int64],
+                      sizes: npt.NDArray[np.int64]) -> Iterator[Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]]:
+    """Iterate over the cells covered by the blocks, one offset within the blocks at a time, so that at most one cell
+    per block is held in memory. Blocks crossing the array bounds are clipped.
+
+    Args:
+        shape (Tuple[int, int, int]): The shape of the array.
+        positions (npt.NDArray[np.int64]): The N×3 positions of the blocks, in placement order.
+        sizes (npt.NDArray[np.int64]): The N×3 sizes of the blocks, in cells.
+
+    Yields:
+        Iterator[Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]]: The flat indices of the covered cells and the
+        block owning each of them.
+    """
+    if len(positions) == 0:
+        return
+    strides = np.asarray([shape[1] * shape[2], shape[2], 1])
+    clipped = np.any((positions < 0) | (positions + sizes > shape), axis=1)
+    # blocks with the same size share the same offsets, so scatter them together
+    unique_sizes, inverse = np.unique(sizes, axis=0, return_inverse=True)
+    for n, size in enumerate(unique_sizes):
+        inner, outer = np.flatnonzero((inverse == n) & ~clipped), np.flatnonzero((inverse == n) & clipped)
+        base = positions[inner] @ strides
+        for offset in np.indices(size).reshape(3, -1).T:
+            if len(inner) > 0:
+                yield base + offset @ strides, inner
+            if len(outer) > 0:
+                cells = positions[outer] + offset
+                within = np.all((cells >= 0) & (cells < shape), axis=1)
+                yield cells[within] @ strides, outer[within]
+
+
+def _scatter_blocks(shape: Tuple[int, int, int],
+                    positions: npt.NDArray[np.int64],
+                    sizes: npt.NDArray[np.int64],
+                    values: npt.NDArray[np.uint16],
+                    sparse: bool = False) -> Tuple[Union[npt.NDArray[np.uint16], ChunkedVoxelGrid], bool]:
+    """Scatter the blocks in a new array.
+    The dense array is filled one offset within the blocks at a time, counting the writes per cell with `np.add.at` to
+    detect collisions; the sparse grid is filled from the sorted covered cells, without a bbox-sized count array.
+
+    Args:
+        shape (Tuple[int, int, int]): The shape of the array.
+        positions (npt.NDArray[np.int64]): The N×3 positions of the blocks, in placement order.
+        sizes (npt.NDArray[np.int64]): The N×3 sizes of the blocks, in cells.
+        values (npt.NDArray[np.uint16]): The N values to write for each block.
+        sparse (bool, optional): Whether to scatter the blocks in a `ChunkedVoxelGrid`. Defaults to `False`.
+
+    Returns:
+        Tuple[Union[npt.NDArray[np.uint16], ChunkedVoxelGrid], bool]: The filled array and whether any collision occurred.
+    """
+    if sparse:
+        flat, owners, has_collisions = _rasterize_blocks(shape=shape,
+                                                         positions=positions,
+                                                         sizes=sizes)
+        arr = ChunkedVoxelGrid.from_cells(shape=shape,
+                                          cells=np.stack(np.unravel_index(flat, shape), axis=1),
+                                          values=values[owners],
+                                          dtype=np.uint16)
+        return arr, has_collisions
+    arr = np.zeros(shape=shape, dtype=np.uint16)
+    counts = np.zeros(shape=arr.size, dtype=np.uint16)
+    for flat, owners in _iter_block_cells(shape=shape, positions=positions, sizes=sizes):
+        np.add.at(counts, flat, 1)
+        arr.flat[flat] = values[owners]
+    has_collisions = bool(np.any(counts > 1))
+    if has_collisions:
+        # keep the last block written in each of the shared cells
+        shared_flat, shared_owners = [], []
+        for flat, owners in _iter_block_cells(shape=shape, positions=positions, sizes=sizes):
+            shared = counts[flat] > 1
+            shared_flat.append(flat[shared])
+            shared_owners.append(owners[shared])
+        flat, owners = np.concatenate(shared_flat), np.concatenate(shared_owners)
+        order = np.argsort(owners, kind='stable')
+        flat, owners = flat[order][::-1], owners[order][::-1]
+        flat, last = np.unique(flat, return_index=True)
+        arr.flat[flat] = values[owners[last]]
+    return arr, has_collisions
+
+
+def _enclosed_air_mask(arr: npt.NDArray[np.uint16]) -> npt.NDArray[np.bool8]:
+    """Compute the mask of empty cells that have a non-empty cell on both sides along all three axes.
+    Uses cumulative any-scans along each axis in both directions, so it runs in linear time.
+
+    Args:
+        arr (npt.NDArray[np.uint16]): The 3D array.
+
+    Returns:
+        npt.NDArray[np.bool8]: The boolean mask of enclosed empty cells.
+    """
+    occupied = arr != 0
+    mask = ~occupied
+    for axis in range(3):
+        mask &= np.logical_or.accumulate(occupied, axis=axis)
+        mask &= np.flip(np.logical_or.accumulate(np.flip(occupied, axis=axis), axis=axis), axis=axis)
+    return mask
+
+
+# Transforms of the grid positions applied by `Structure.rotate`, indexed by (axis, number of ccw rotations)
+_rotation_transforms = {
+    (0, 1): np.asarray([[1, 0, 0], [0, 0, -1], [0, -1, 0]]),
+    (0, 2): np.asarray([[1, 0, 0], [0, -1, 0], [0, 0, 1]]),
+    (0, 3): np.asarray([[1, 0, 0], [0, 0, -1], [0, 1, 0]]),
+    (1, 1): np.asarray([[0, 0, 1], [0, 1, 0], [1, 0, 0]]),
+    (1, 2): np.asarray([[-1, 0, 0], [0, 1, 0], [0, 0, -1]]),
+    (1, 3): np.asarray([[0, 0, -1], [0, 1, 0], [-1, 0, 0]]),
+    (2, 1): np.asarray([[0, 1, 0], [-1, 0, 0], [0, 0, 1]]),
+    (2, 2): np.asarray([[-1, 0, 0], [0, -1, 0], [0, 0, 1]]),
+    (2, 3): np.asarray([[0, -1, 0], [1, 0, 0], [0, 0, 1]])
+}
+
+
+def _splitmix64(x: npt.NDArray[np.uint64]) -> npt.NDArray[np.uint64]:
+    """Apply the SplitMix64 finalizer to each element, mixing all bits of the input.
+
+    Args:
+        x (npt.NDArray[np.uint64]): The input values.
+
+    Returns:
+        npt.NDArray[np.uint64]: The mixed values.
+    """
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+def _block_hashes(positions: npt.NDArray[np.int64],
+                  type_ids: npt.NDArray[np.int64],
+                  orientations: npt.NDArray[np.int64]) -> npt.NDArray[np.uint64]:
+    """Compute the Zobrist keys of blocks: 64-bit pseudo-random values determined by position, type and orientation.
+    The content hash of a structure is the XOR of the keys of its blocks.
+
+    Args:
+        positions (npt.NDArray[np.int64]): The N×3 grid positions of the blocks.
+        type_ids (npt.NDArray[np.int64]): The N type ids of the blocks.
+        orientations (npt.NDArray[np.int64]): The N orientation codes of the blocks.
+
+    Returns:
+        npt.NDArray[np.uint64]: The N keys.
+    """
+    p = (positions.astype(np.int64) & 0xFFFF).astype(np.uint64).reshape(-1, 3)
+    packed = (p[:, 0] << np.uint64(32)) | (p[:, 1] << np.uint64(16)) | p[:, 2]
+    block_code = (type_ids.astype(np.uint64) << np.uint64(8)) | orientations.astype(np.uint64)
+    return _splitmix64(_splitmix64(packed) ^ block_code)
+
+
+def _orientation_code(block: Block) -> int:
+    """Get the orientation code of a block, as stored in `CompactBlocks`.
+
+    Args:
+        block (Block): The block.
+
+    Returns:
+        int: The orientation code.
+    """
+    return _orientation_idxs[block.orientation_forward.as_tuple()] * len(_orientation_vecs) + _orientation_idxs[block.orientation_up.as_tuple()]
+
+
+def _transform_grid(arr: npt.NDArray[Any],
+                    transform: npt.NDArray[np.int64]) -> npt.NDArray[Any]:
+    """Apply a signed permutation of the axes to a 3D array, as done to the grid positions by `Structure.rotate`.
+
+    Args:
+        arr (npt.NDArray[Any]): The 3D array.
+        transform (npt.NDArray[np.int64]): The 3×3 signed permutation matrix.
+
+    Returns:
+        npt.NDArray[Any]: The transformed array (a view of the input array).
+    """
+    axes = np.argmax(np.abs(transform), axis=1)
+    arr = np.transpose(arr, axes=axes)
+    flipped = tuple(np.flatnonzero(transform[np.arange(3), axes] < 0).tolist())
+    return np.flip(arr, axis=flipped) if flipped else arr
+
+
+class StructureStats:
+    __slots__ = ['type_counts', 'n_blocks', 'mass', 'volume', 'functional_volume', 'min_position', 'max_position']
+
+    def __init__(self,
+                 positions: npt.NDArray[np.int64],
+                 type_ids: npt.NDArray[np.int64]) -> None:
+        """Compute the aggregate statistics of a structure's blocks in a single vectorized pass.
+
+        Args:
+            positions (npt.NDArray[np.int64]): The N×3 grid positions of the blocks.
+            type_ids (npt.NDArray[np.int64]): The N type ids of the blocks.
+        """
+        self.type_counts: npt.NDArray[np.int64] = np.bincount(type_ids, minlength=len(block_types))
+        self.n_blocks: int = len(type_ids)
+        self.mass: float = float(self.type_counts @ block_types.mass)
+        self.volume: int = int(self.type_counts @ block_types.volume)
+        self.functional_volume: int = int(self.type_counts @ (block_types.volume * block_types.is_functional))
+        self.min_position: npt.NDArray[np.int64] = positions.min(axis=0) if self.n_blocks > 0 else np.zeros(shape=3, dtype=np.int64)
+        self.max_position: npt.NDArray[np.int64] = positions.max(axis=0, initial=0)
+
+    def add(self,
+            position: Tuple[int, int, int],
+            type_id: int) -> None:
+        """Account for a new block.
+
+        Args:
+            position (Tuple[int, int, int]): The grid position of the block.
+            type_id (int): The type id of the block.
+        """
+        self.type_counts[type_id] += 1
+        self.mass += block_types.mass[type_id]
+        self.volume += int(block_types.volume[type_id])
+        if block_types.is_functional[type_id]:
+            self.functional_volume += int(block_types.volume[type_id])
+        self.min_position = np.minimum(self.min_position, position) if self.n_blocks > 0 else np.asarray(position, dtype=np.int64)
+        self.max_position = np.maximum(self.max_position, position)
+        self.n_blocks += 1
+
+    def replace(self,
+                old_type_id: int,
+                new_type_id: int) -> None:
+        """Account for a block replaced by another one in the same position.
+
+        Args:
+            old_type_id (int): The type id of the removed block.
+            new_type_id (int): The type id of the new block.
+        """
+        self.type_counts[old_type_id] -= 1
+        self.type_counts[new_type_id] += 1
+        self.mass += block_types.mass[new_type_id] - block_types.mass[old_type_id]
+        self.volume += int(block_types.volume[new_type_id] - block_types.volume[old_type_id])
+        self.functional_volume += int(block_types.volume[new_type_id] * block_types.is_functional[new_type_id] - block_types.volume[old_type_id] * block_types.is_functional[old_type_id])
+
+    def count(self,
+              block_type: str) -> int:
+        """Count the blocks with the given block type.
+
+        Args:
+            block_type (str): The block type.
+
+        Returns:
+            int: The number of blocks.
+        """
+        return int(self.type_counts[block_types.get_id(block_type)]) if block_type in block_types else 0
+
+    @property
+    def armor_blocks(self) -> int:
+        """Count the armor blocks.
+
+        Returns:
+            int: The number of armor blocks.
+        """
+        return int(self.type_counts @ block_types.is_armor)
 
 
 class Structure:
     __slots__ = ['origin_coords', 'orientation_forward', 'orientation_up', 'grid_size', '_blocks',
-                 '_has_intersections', '_scaled_arr', '_air_gridmask', '_arr']
+                 '_has_intersections', '_scaled_arr', '_air_gridmask', '_arr', '_stats', '_content_hash']
     
     def __init__(self, origin: Vec,
                  orientation_forward: Vec,
                  orientation_up: Vec,
-                 grid_size: int = 5) -> None:
+                 grid_size: int = 5,
+                 compact: bool = False) -> None:
         """Create a Structure object. A Structure is similar to the `GridBlocks` in Space Engineers' API.
 
         Args:
@@ -206,21 +828,50 @@ class Structure:
             orientation_forward (Vec): The Forward orientation of the structure as a `Vec` object.
             orientation_up (Vec): The Up orientation of the structure as a `Vec` object.
             grid_size (int): The size of the grid. Defaults to `5.`.
+            compact (bool): Whether to store the blocks in a `CompactBlocks` storage. Defaults to `False`.
         """
         self.origin_coords = origin
         self.orientation_forward = orientation_forward
         self.orientation_up = orientation_up
         self.grid_size = grid_size
 
-        self._blocks: Dict[Tuple(int, int, int), Block] = {}
+        self._blocks: Dict[Tuple(int, int, int), Block] = CompactBlocks() if compact else {}
         self._has_intersections: bool = None
-        self._scaled_arr: npt.NDArray[np.uint16] = None
+        self._scaled_arr: Union[npt.NDArray[np.uint16], ChunkedVoxelGrid] = None
         self._air_gridmask: npt.NDArray[np.bool8] = None
         self._arr: npt.NDArray[np.uint16] = None
+        self._stats: StructureStats = None
+        self._content_hash: int = None
+
+    def __setstate__(self,
+                     state: Union[Dict[str, Any], Tuple[Optional[Dict[str, Any]], Dict[str, Any]]]) -> None:
+        # structures pickled before the statistics and the content hash were cached lack their slots
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for k in Structure.__slots__:
+            setattr(self, k, state.get(k, None))
 
     def __repr__(self) -> str:
         return f'{self.grid_size}x Structure with {len(self._blocks.keys())} blocks'
     
+    @property
+    def is_compact(self) -> bool:
+        """Check if the blocks are stored in a `CompactBlocks` storage.
+
+        Returns:
+            bool: Whether the storage is compact.
+        """
+        return isinstance(self._blocks, CompactBlocks)
+
+    def compact(self) -> None:
+        """Move the blocks to a `CompactBlocks` storage, reducing the memory used by the structure."""
+        if not self.is_compact:
+            blocks = CompactBlocks(blocks=self._blocks)
+            # the blocks only include the origin in their positions once `_rebase` moved them, so the views must too
+            if any(block.position.as_tuple() != grid_position for grid_position, block in self._blocks.items()):
+                blocks.origin = self.origin_coords
+            self._blocks = blocks
+
     def add_block(self,
                   block: Block,
                   grid_position: Tuple[int, int, int]) -> None:
@@ -237,11 +888,148 @@ class Structure:
         i, j, k = grid_position
         block.position = Vec.v3i(i, j, k)
         
+        if self._content_hash is not None:
+            self._update_content_hash(grid_position=(i, j, k),
+                                      block=block)
+        
         if grid_position in self._blocks.keys():
             self._has_intersections = True
+            if self._stats is not None:
+                self._stats.replace(old_type_id=self._blocks[(i, j, k)].type_id,
+                                    new_type_id=block.type_id)
+            # the cells of the replaced block may be covered by other blocks too
+            self._scaled_arr = None
+            self._arr = None
+            self._air_gridmask = None
+        else:
+            if self._stats is not None:
+                self._stats.add(position=(i, j, k),
+                                type_id=block.type_id)
+            self._update_arrays(grid_position=(i, j, k),
+                                type_id=block.type_id)
+            if self._has_intersections is False and not isinstance(self._scaled_arr, np.ndarray):
+                # the new block cannot be checked against the others, so check again on the next access
+                self._has_intersections = None
         
         self._blocks[(i, j, k)] = block
     
+    def replace_block(self,
+                      block: Block,
+                      grid_position: Tuple[int, int, int]) -> None:
+        """Replace the block at the given position with another block.
+        Unlike `add_block`, this does not flag the structure as intersecting.
+
+        Args:
+            block (Block): The new block.
+            grid_position (Tuple[int, int, int]): The position in the grid of the block to replace.
+        """
+        i, j, k = grid_position
+        block.position = Vec.v3i(i, j, k)
+        old_type_id = self._blocks[(i, j, k)].type_id
+        if self._content_hash is not None:
+            self._update_content_hash(grid_position=(i, j, k),
+                                      block=block)
+        if self._stats is not None:
+            self._stats.replace(old_type_id=old_type_id,
+                                new_type_id=block.type_id)
+        self._blocks[(i, j, k)] = block
+        if isinstance(self._scaled_arr, np.ndarray) and self._has_intersections is False:
+            # no other block covers the cells of the replaced one, so they can be cleared
+            self._scaled_arr[self._block_slice(grid_position=(i, j, k), size=block_types.scaled_size[old_type_id])] = 0
+            region = self._scaled_arr[self._block_slice(grid_position=(i, j, k), size=block_types.scaled_size[block.type_id])]
+            if np.any(region):
+                self._has_intersections = True
+            region[...] = block.type_id + 1
+        else:
+            self._scaled_arr = None
+            if self._has_intersections is False:
+                self._has_intersections = None
+        if self._arr is not None:
+            # the occupied grid cells do not change, so the internal air mask is still valid
+            self._arr[self._grid_cell(grid_position=(i, j, k))] = block.type_id + 1
+    
+    def _update_content_hash(self,
+                             grid_position: Tuple[int, int, int],
+                             block: Block) -> None:
+        """Update the content hash for a block placed at the given position, replacing the existing block if any.
+
+        Args:
+            grid_position (Tuple[int, int, int]): The position of the block.
+            block (Block): The new block.
+        """
+        placed = [(block.type_id, _orientation_code(block=block))]
+        if grid_position in self._blocks:
+            old_block = self._blocks[grid_position]
+            placed.append((old_block.type_id, _orientation_code(block=old_block)))
+        type_ids, orientations = np.asarray(placed, dtype=np.int64).T
+        keys = _block_hashes(positions=np.asarray([grid_position] * len(placed), dtype=np.int64),
+                             type_ids=type_ids,
+                             orientations=orientations)
+        self._content_hash ^= int(np.bitwise_xor.reduce(keys))
+
+    def _block_slice(self,
+                     grid_position: Tuple[int, int, int],
+                     size: npt.NDArray[np.int64]) -> Tuple[slice, slice, slice]:
+        """Get the slice of the scaled array covered by a block (clipped at the array bounds when used).
+
+        Args:
+            grid_position (Tuple[int, int, int]): The position of the block.
+            size (npt.NDArray[np.int64]): The scaled size of the block.
+
+        Returns:
+            Tuple[slice, slice, slice]: The slice.
+        """
+        return tuple(slice(p, p + s) for p, s in zip(grid_position, size.tolist()))
+
+    def _grid_cell(self,
+                   grid_position: Tuple[int, int, int]) -> Tuple[int, int, int]:
+        """Get the cell of the grid-sized array of a block.
+
+        Args:
+            grid_position (Tuple[int, int, int]): The position of the block.
+
+        Returns:
+            Tuple[int, int, int]: The cell.
+        """
+        i, j, k = np.rint(np.asarray(grid_position) * (1 / self.grid_size)).astype(np.int64).tolist()
+        return i, j, k
+
+    def _update_arrays(self,
+                       grid_position: Tuple[int, int, int],
+                       type_id: int) -> None:
+        """Write a new block in the cached arrays, updating only the cells it covers.
+        Arrays that would change shape (or are sparse) are dropped and rebuilt on the next access instead.
+
+        Args:
+            grid_position (Tuple[int, int, int]): The position of the new block.
+            type_id (int): The type id of the new block.
+        """
+        if self._scaled_arr is None and self._arr is None:
+            return
+        position = np.asarray(grid_position)
+        if np.any(position < 0):
+            self._scaled_arr = None
+            self._arr = None
+            self._air_gridmask = None
+            return
+        if self._scaled_arr is not None:
+            if isinstance(self._scaled_arr, np.ndarray) and np.all(position + self.grid_size <= self._scaled_arr.shape):
+                region = self._scaled_arr[self._block_slice(grid_position=grid_position, size=block_types.scaled_size[type_id])]
+                if np.any(region):
+                    self._has_intersections = True
+                region[...] = type_id + 1
+            else:
+                self._scaled_arr = None
+        if self._arr is not None:
+            cell = self._grid_cell(grid_position=grid_position)
+            if np.all(np.asarray(cell) < self._arr.shape):
+                if self._arr[cell] != 0:
+                    self._has_intersections = True
+                self._arr[cell] = type_id + 1
+            else:
+                self._arr = None
+        self._air_gridmask = None
+    
     def set_color(self,
                   color: Vec) -> None:
         """Set the color of the base blocks in the structure.
@@ -249,10 +1037,75 @@ class Structure:
         Args:
             color (Vec): The color as RGB values vector.
         """
-        for block in self._blocks.values():
-            if _is_base_block(block_type=self._clean_label(a=block.block_type)):
-                block.color = color
+        if self.is_compact:
+            self._blocks.set_colors(mask=block_types.is_base[self._blocks.type_ids],
+                                    color=color)
+        else:
+            for block in self._blocks.values():
+                if _is_base_block(block_type=self._clean_label(a=block.block_type)):
+                    block.color = color
     
+    def _positions_array(self) -> npt.NDArray[np.int64]:
+        """Get the grid positions of the blocks as an array, in placement order.
+
+        Returns:
+            npt.NDArray[np.int64]: The N×3 positions.
+        """
+        if self.is_compact:
+            return self._blocks.positions.astype(np.int64)
+        return np.fromiter(chain.from_iterable(self._blocks.keys()), dtype=np.int64, count=3 * len(self._blocks)).reshape(-1, 3)
+
+    def _orientations_array(self) -> npt.NDArray[np.int64]:
+        """Get the orientation codes of the blocks as an array, in placement order.
+
+        Returns:
+            npt.NDArray[np.int64]: The N orientation codes.
+        """
+        if self.is_compact:
+            return self._blocks._orientations[:len(self._blocks)].astype(np.int64)
+        return np.fromiter((_orientation_code(block=b) for b in self._blocks.values()), dtype=np.int64, count=len(self._blocks))
+
+    @property
+    def content_hash(self) -> int:
+        """Get the 64-bit Zobrist hash of the blocks in the structure, over their position, type and orientation.
+        Structures with the same blocks have the same hash, regardless of the order the blocks were placed in.
+
+        Returns:
+            int: The content hash.
+        """
+        if self._content_hash is None:
+            positions, type_ids = self._blocks_arrays()
+            keys = _block_hashes(positions=positions,
+                                 type_ids=type_ids,
+                                 orientations=self._orientations_array())
+            self._content_hash = int(np.bitwise_xor.reduce(keys)) if len(keys) > 0 else 0
+        return self._content_hash
+
+    def _blocks_arrays(self) -> Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]:
+        """Get the positions and type ids of the blocks as arrays, in placement order.
+
+        Returns:
+            Tuple[npt.NDArray[np.int64], npt.NDArray[np.int64]]: The N×3 positions and the N type ids.
+        """
+        positions = self._positions_array()
+        if self.is_compact:
+            return positions, self._blocks.type_ids.astype(np.int64)
+        type_ids = np.fromiter((b.type_id for b in self._blocks.values()), dtype=np.int64, count=len(self._blocks))
+        return positions, type_ids
+
+    @property
+    def stats(self) -> StructureStats:
+        """Get the aggregate statistics of the blocks in the structure.
+
+        Returns:
+            StructureStats: The statistics.
+        """
+        if self._stats is None:
+            positions, type_ids = self._blocks_arrays()
+            self._stats = StructureStats(positions=positions,
+                                         type_ids=type_ids)
+        return self._stats
+
     @property
     def _max_dims(self) -> Tuple[int, int, int]:
         """Compute the maximum dimension of the Structure.
@@ -260,14 +1113,7 @@ class Structure:
         Returns:
             Tuple[int, int, int]: The XYZ maximum dimensions
         """
-        max_x, max_y, max_z = 0, 0, 0
-        for x, y, z in self._blocks.keys():
-            if x > max_x:
-                max_x = x
-            if y > max_y:
-                max_y = y
-            if z > max_z:
-                max_z = z
+        max_x, max_y, max_z = self.stats.max_position.tolist()
         return max_x, max_y, max_z
 
     @property
@@ -277,31 +1123,28 @@ class Structure:
         Returns:
             Tuple[int, int, int]: The XYZ minimum dimensions.
         """
-        min_x, min_y, min_z = self._max_dims
-        for x, y, z in self._blocks.keys():
-            if x < min_x:
-                min_x = x
-            if y < min_y:
-                min_y = y
-            if z < min_z:
-                min_z = z
+        min_x, min_y, min_z = self.stats.min_position.tolist()
         return min_x, min_y, min_z
 
     @property
-    def as_array(self) -> npt.NDArray[np.uint16]:
+    def as_array(self) -> Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]:
         """Convert the structure to its equivalent NumPy array.
         Each point in the XYZ matrix represents the block type.
+        If the array would have more than `MAX_DENSE_VOXELS` cells, a `ChunkedVoxelGrid` is returned instead.
 
         Returns:
-            npt.NDArray[np.uint16]: The 3D NumPy array.
+            Union[npt.NDArray[np.uint16], ChunkedVoxelGrid]: The 3D NumPy array (or its sparse equivalent).
         """
         if self._scaled_arr is None:
-            self._scaled_arr = np.zeros(shape=Vec.from_tuple(self._max_dims).add(v=self.grid_size).as_tuple(), dtype=np.uint16)
-            for (i, j, k), block in self._blocks.items():
-                r = block.scaled_size
-                if np.sum(self._scaled_arr[i:i + r.x, j:j + r.y, k:k + r.z]) != 0:
-                    self._has_intersections = True
-                self._scaled_arr[i:i + r.x, j:j + r.y, k:k + r.z] = list(block_definitions.keys()).index(block.block_type) + 1
+            positions, type_ids = self._blocks_arrays()
+            shape = tuple(positions.max(axis=0, initial=0) + self.grid_size)
+            self._scaled_arr, has_collisions = _scatter_blocks(shape=shape,
+                                                               positions=positions,
+                                                               sizes=block_types.scaled_size[type_ids],
+                                                               values=(type_ids + 1).astype(np.uint16),
+                                                               sparse=np.prod(shape) > MAX_DENSE_VOXELS)
+            if has_collisions:
+                self._has_intersections = True
         return self._scaled_arr
 
     @property
@@ -313,12 +1156,15 @@ class Structure:
             npt.NDArray[np.uint16]: The 3D NumPy grid-sized array.
         """
         if self._arr is None:
-            self._arr = np.zeros(shape=Vec.from_tuple(self._max_dims).scale(v=1 / self.grid_size).to_veci().add(v=1).as_tuple(), dtype=np.uint16)
-            for r, block in self._blocks.items():
-                r = Vec.from_tuple(r).scale(v=1 / self.grid_size).to_veci().as_tuple()
-                if np.sum(self._arr[r]) != 0:
-                    self._has_intersections = True
-                self._arr[r] = list(block_definitions.keys()).index(block.block_type) + 1
+            positions, type_ids = self._blocks_arrays()
+            shape = tuple(np.rint(positions.max(axis=0, initial=0) * (1 / self.grid_size)).astype(np.int64) + 1)
+            # as in indexing, negative grid positions wrap around
+            self._arr, has_collisions = _scatter_blocks(shape=shape,
+                                                        positions=np.rint(positions * (1 / self.grid_size)).astype(np.int64) % shape,
+                                                        sizes=np.ones_like(positions),
+                                                        values=(type_ids + 1).astype(np.uint16))
+            if has_collisions:
+                self._has_intersections = True
         return self._arr
 
     @property
@@ -341,7 +1187,7 @@ class Structure:
         Returns:
             float: The volume of the grid.
         """
-        return sum([b.volume for b in self._blocks.values()])
+        return self.stats.volume
     
     @property
     def mass(self) -> float:
@@ -350,7 +1196,7 @@ class Structure:
         Returns:
             float: The mass of the grid.
         """
-        return np.round(sum([b.mass for b in self._blocks.values()]), 2)
+        return np.round(self.stats.mass, 2)
     
     @property
     def blocks_count(self) -> Tuple[int, int]:
@@ -359,8 +1205,8 @@ class Structure:
         Returns:
             Tuple[int, int]: The number of armor and non-armor blocks.
         """
-        armor_blocks = sum([1 if 'armor' in x.block_type.lower() else 0 for x in self._blocks.values()])
-        return armor_blocks, len(self._blocks) - armor_blocks
+        armor_blocks = self.stats.armor_blocks
+        return armor_blocks, self.stats.n_blocks - armor_blocks
     
     def unique_blocks_count(self,
                             block_type: str) -> int:
@@ -372,7 +1218,7 @@ class Structure:
         Returns:
             int: The number of blocks with the given block type.
         """
-        return sum([1 if x.block_type == block_type else 0 for x in self._blocks.values()])
+        return self.stats.count(block_type=block_type)
     
     @property
     def air_blocks_gridmask(self) -> npt.NDArray[np.bool8]:
@@ -382,53 +1228,54 @@ class Structure:
             npt.NDArray[np.bool8]: A boolean array where `True` elements are internal air blocks in the grid array.
         """
         if self._air_gridmask is None:
-            self._air_gridmask = np.zeros_like(self.as_grid_array, dtype=np.bool8)
-            # Old code, reliable but very slow
-            # ds = [Vec.v3i(1, 0, 0), Vec.v3i(0, 1, 0), Vec.v3i(0, 0, 1),
-            #     Vec.v3i(-1, 0, 0), Vec.v3i(0, -1, 0), Vec.v3i(0, 0, -1)]
-            # # get existing blocks indices
-            # blocks_idxs = [Vec.from_tuple(k).scale(v=1 / self.grid_size).to_veci() for k in self._blocks.keys()]
-            # # get all indices attached to the blocks indices
-            # next_to_idxs = [b.sum(d) for d in ds for b in blocks_idxs if b.sum(d) not in blocks_idxs]
-            # # internal air cotner blocks have at least 3 blocks next to them
-            # internal_air = [Vec.from_tuple(t) for t in  list({b.as_tuple() : next_to_idxs.count(b) for b in next_to_idxs if next_to_idxs.count(b) > 2}.keys())]
-            # # checking loop
-            # past = blocks_idxs
-            # while internal_air:
-            #     to_check = []
-            #     for idx in internal_air:
-            #         if 0 <= idx.x < self._air_gridmask.shape[0] and 0 <= idx.y < self._air_gridmask.shape[1] and 0 <= idx.z < self._air_gridmask.shape[2] and\
-            #             not self._air_gridmask[idx.as_tuple()]:
-            #                 past.append(idx)
-            #                 if self._blocks.get(idx.scale(self.grid_size).as_tuple(), None) is None:
-            #                     self._air_gridmask[idx.as_tuple()] = True
-            #                     to_check.extend([idx.sum(d) for d in ds if idx.sum(d) not in past])
-            #     internal_air = list(set(to_check))
-            # new code, faster but less readable
-            i1, j1, k1 = self.as_grid_array.shape
-            for (i, j, k) in zip(*np.nonzero(self.as_grid_array == 0)):
-                # basically, check for every empty block index if it's surrounded on all 6 sides by at least a block
-                self._air_gridmask[i, j, k] = np.sum(self.as_grid_array[0:i, j, k]) != 0 and \
-                    np.sum(self.as_grid_array[i:i1, j, k]) != 0 and \
-                    np.sum(self.as_grid_array[i, 0:j, k]) != 0 and \
-                    np.sum(self.as_grid_array[i, j:j1, k]) != 0 and \
-                    np.sum(self.as_grid_array[i, j, 0:k]) != 0 and \
-                    np.sum(self.as_grid_array[i, j, k:k1]) != 0
+            # an empty cell is internal air if there is a block on both sides of it along every axis
+            self._air_gridmask = _enclosed_air_mask(arr=self.as_grid_array)
         return self._air_gridmask
     
-    def sanify(self) -> None:
-        """Correct the structure's blocks to be >=0 on every axis."""
-        min_x, min_y, min_z = self._min_dims
-        updated_blocks = {}
-        for x, y, z in self._blocks.keys():
-            block = self._blocks[(x, y, z)]
-            new_pos = Vec.v3i(x=x - min_x, y=y - min_y, z=z - min_z)
-            block.position = self.origin_coords.sum(new_pos)
-            updated_blocks[new_pos.as_tuple()] = block
-        self._blocks = updated_blocks
+    def _rebase(self,
+                positions: npt.NDArray[np.int64]) -> None:
+        """Move the blocks to the given grid positions, shifted so that they are >=0 on every axis.
+
+        Args:
+            positions (npt.NDArray[np.int64]): The N×3 new positions, in placement order.
+        """
+        if len(positions) > 0:
+            positions = positions - positions.min(axis=0)
+        if self._stats is not None:
+            self._stats.min_position = np.zeros(shape=3, dtype=np.int64)
+            self._stats.max_position = positions.max(axis=0, initial=0)
+        if self.is_compact:
+            self._blocks.set_positions(positions=positions)
+            self._blocks.origin = self.origin_coords
+        else:
+            keys = list(map(tuple, positions.tolist()))
+            for position, block in zip(VecArray(positions).sum(self.origin_coords).as_vecs(), self._blocks.values()):
+                block.position = position
+            self._blocks = dict(zip(keys, self._blocks.values()))
         self._scaled_arr = None
         self._arr = None
         self._air_gridmask = None
+        self._content_hash = None
+
+    def sanify(self) -> None:
+        """Correct the structure's blocks to be >=0 on every axis."""
+        positions = self._positions_array()
+        scaled_arr, arr, air_gridmask, content_hash = self._scaled_arr, self._arr, self._air_gridmask, self._content_hash
+        self._rebase(positions=positions)
+        offset = positions.min(axis=0) if len(positions) > 0 else np.zeros(shape=3, dtype=np.int64)
+        if not np.any(offset):
+            self._content_hash = content_hash
+        if np.all(offset >= 0):
+            # a translation towards the origin only removes empty leading cells from the cached arrays
+            i, j, k = offset.tolist()
+            if isinstance(scaled_arr, np.ndarray):
+                self._scaled_arr = scaled_arr[i:, j:, k:]
+            elif not np.any(offset):
+                self._scaled_arr = scaled_arr
+            if not np.any(positions % self.grid_size):
+                i, j, k = (offset // self.grid_size).tolist()
+                self._arr = arr[i:, j:, k:] if arr is not None else None
+                self._air_gridmask = air_gridmask[i:, j:, k:] if air_gridmask is not None else None
 
     def update(self, origin: Vec,
                orientation_forward: Vec,
@@ -456,29 +1303,17 @@ class Structure:
             along (int): The axis to rotate along (0, 1, 2).
             k (int): How many times to rotate for in the ccw direction.
         """
-        rotated_blocks = {}
-        along = along % 3
         k = k % 4
         if k > 0:
-            for idx, block in self._blocks.items():
-                x, y, z = idx
-                if along == 0:
-                    if k == 1: p1 = Vec(x=x, y=-z, z=-y)
-                    elif k == 2: p1 = Vec(x=x, y=-y, z=z)
-                    elif k == 3: p1 = Vec(x=x, y=-z, z=y)
-                elif along == 1:
-                    if k == 1: p1 = Vec(x=z, y=y, z=x)
-                    elif k == 2: p1 = Vec(x=-x, y=y, z=-z)
-                    elif k == 3: p1 = Vec(x=-z, y=y, z=-x)
-                elif along == 2:
-                    if k == 1: p1 = Vec(x=y, y=-x, z=z)
-                    elif k == 2: p1 = Vec(x=-x, y=-y, z=z)
-                    elif k == 3: p1 = Vec(x=-y, y=x, z=z)
-                rot_idx = p1.as_tuple()
-                rotated_blocks[rot_idx] = block
-            self._blocks = rotated_blocks
-            self.sanify()
-    
+            positions = self._positions_array()
+            arr, air_gridmask = self._arr, self._air_gridmask
+            transform = _rotation_transforms[(along % 3, k)]
+            self._rebase(positions=positions @ transform.T)
+            # block sizes are not rotated, so only the grid-sized arrays can be rotated as well
+            if len(positions) > 0 and not np.any(positions.min(axis=0)) and not np.any(positions % self.grid_size):
+                self._arr = _transform_grid(arr=arr, transform=transform) if arr is not None else None
+                self._air_gridmask = _transform_grid(arr=air_gridmask, transform=transform) if air_gridmask is not None else None
+
     def get_all_blocks(self,
                        to_place: bool = True,
                        scaled: bool = False) -> List[Block]:
@@ -492,10 +1327,9 @@ class Structure:
             List[Block]: The list of all blocks.
         """
         all_blocks = list(self._blocks.values())
-        if to_place:
-            return [b.duplicate(b.position.scale(grid_to_coords)) for b in all_blocks]
-        elif scaled:
-            return [b.duplicate(b.position.scale(1 / self.grid_size)) for b in all_blocks]
+        if to_place or scaled:
+            positions = VecArray.from_vecs(b.position for b in all_blocks).scale(grid_to_coords if to_place else 1 / self.grid_size)
+            return [b.duplicate(position) for b, position in zip(all_blocks, positions.as_vecs())]
         else:
             return all_blocks
 
@@ -509,17 +1343,7 @@ class Structure:
         Returns:
             str: The label without prefix.
         """
-        for d in [
-            'MyObjectBuilder_CubeBlock_',
-            'MyObjectBuilder_Gyro_',
-            'MyObjectBuilder_Reactor_',
-            'MyObjectBuilder_CargoContainer_',
-            'MyObjectBuilder_Cockpit_',
-            'MyObjectBuilder_Thrust_',
-            'MyObjectBuilder_InteriorLight_'
-        ]:
-            a = a.replace(d, '')
-        return a
+        return clean_label(a=a)
 
     def show(self,
              title: str,
@@ -543,7 +1367,7 @@ class Structure:
         scatter = ax.scatter(x, y, z, c=cs, cmap='jet', linewidth=0.1)
         legend = scatter.legend_elements(num=len(np.unique(structure[(x, y, z)])) - 1)
         for i, v in zip(range(len(legend[1])), np.unique(structure[(x, y, z)])):
-            legend[1][i] = self._clean_label(list(block_definitions.keys())[v - 1])
+            legend[1][i] = block_types.clean_label[v - 1]
         ax.legend(*legend,
                   bbox_to_anchor=(1.2, 1),
                   loc="upper left",